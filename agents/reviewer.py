@@ -12,6 +12,7 @@ import json
 import time
 from typing import Any, Dict, List, Optional
 
+from cancellation import CancelToken
 from config import Config, get_llm_config
 from llm_client import OpenAICompatibleClient, create_client
 from logger import log
@@ -51,8 +52,12 @@ Output MUST be valid JSON with this exact schema:
 class CodeReviewer:
     """Strong parent-agent that performs the final code review."""
 
-    def __init__(self, client: Optional[OpenAICompatibleClient] = None):
-        cfg = get_llm_config()
+    def __init__(
+        self,
+        client: Optional[OpenAICompatibleClient] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        cfg = config or get_llm_config()
         self.client = client or create_client(cfg)
         self.model = cfg["model"]
 
@@ -64,6 +69,8 @@ class CodeReviewer:
         team_rules: str,
         intent: str,
         impact_analysis: str = "",
+        cancel_token: Optional[CancelToken] = None,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         """Execute the review and return structured results."""
 
@@ -95,6 +102,8 @@ class CodeReviewer:
                 temperature=Config.REVIEW_TEMPERATURE,
                 max_tokens=Config.MAX_REVIEW_TOKENS,
                 response_format={"type": "json_object"},
+                cancel_token=cancel_token,
+                timeout=timeout,
             )
             duration = time.time() - start
             log.info(
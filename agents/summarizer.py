@@ -5,11 +5,13 @@ a compact structural summary for the parent reviewer agent.
 """
 
 import json
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from cancellation import CancelToken
 from config import Config, get_sub_llm_config
 from llm_client import OpenAICompatibleClient, create_client
 from logger import log
+from result_cache import ResultCache, content_hash
 
 
 _FILE_SUMMARY_SYSTEM = """You are a code analysis assistant. Read a source code file and produce a compact JSON summary.
@@ -36,12 +38,25 @@ class FileSummarizer:
         cfg = get_sub_llm_config()
         self.client = client or create_client(cfg)
         self.model = cfg["model"]
+        self.cache = ResultCache("summary")
 
-    def summarize(self, file_path: str, content: str) -> Dict:
+    def summarize(
+        self,
+        file_path: str,
+        content: str,
+        cancel_token: Optional[CancelToken] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict:
         """Generate a structured summary for a single file."""
         if not content or not content.strip():
             return self._empty_result(file_path)
 
+        cache_key = f"{self.model}:{file_path}:{content_hash(content)}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            log.info(f"  [Summarizer] {file_path} -> cached")
+            return cached
+
         loc = content.count("\n")
         max_chars = 40000
         truncated = len(content) > max_chars
@@ -66,6 +81,8 @@ class FileSummarizer:
                 temperature=Config.SUB_TEMPERATURE,
                 max_tokens=2048,
                 response_format={"type": "json_object"},
+                cancel_token=cancel_token,
+                timeout=timeout,
             )
             summary = json.loads(resp.content)
             summary["file_path"] = file_path
@@ -75,6 +92,7 @@ class FileSummarizer:
                 f"  [Summarizer] {file_path} "
                 f"-> {len(summary.get('key_functions', []))} funcs"
             )
+            self.cache.put(cache_key, summary)
             return summary
         except json.JSONDecodeError:
             log.warning(
@@ -85,6 +103,31 @@ class FileSummarizer:
             log.error(f"  [Summarizer] Error on {file_path}: {e}")
             return self._empty_result(file_path, loc)
 
+    def cached(self, file_path: str, content: str) -> Optional[Dict]:
+        """Cached LLM summary for this exact content, if any (no LLM call)."""
+        return self.cache.get(f"{self.model}:{file_path}:{content_hash(content)}")
+
+    def graph_summary(
+        self, file_path: str, content: str, nodes: List[Dict[str, Any]]
+    ) -> Dict:
+        """Zero-token summary built from knowledge-graph nodes of the file."""
+        funcs = [
+            f"{n['parent_name']}.{n['name']}" if n.get("parent_name") else n["name"]
+            for n in nodes
+            if n.get("kind") in ("Function", "Method")
+        ]
+        types = [
+            n["name"] for n in nodes
+            if n.get("kind") in ("Class", "Struct", "Interface", "Trait", "Type")
+        ]
+        imports = [n["name"] for n in nodes if n.get("kind") == "Import"]
+        purpose = "Graph-derived summary (LLM summary skipped)"
+        if types:
+            purpose += f"; defines {', '.join(types[:5])}"
+        result = self._empty_result(file_path, content.count("\n"))
+        result.update(purpose=purpose, key_functions=funcs[:20], dependencies=imports[:20])
+        return result
+
     def _empty_result(self, file_path: str = "", loc: int = 0) -> Dict:
         return {
             "file_path": file_path,
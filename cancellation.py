@@ -0,0 +1,51 @@
+"""
+Cooperative cancellation for review runs.
+
+A newer review of the same branch/PR supersedes the running one: the
+owner of the run (e.g. a job-queue worker) calls `CancelToken.cancel()`,
+the pipeline aborts at the next stage boundary and in-flight LLM calls
+return immediately. Caches written so far (summaries, linter results,
+graph updates) are kept for the newer run.
+"""
+
+import threading
+from typing import Callable, Optional
+
+
+class ReviewCancelled(BaseException):
+    """Raised when a review run has been cancelled / superseded.
+
+    Derives from BaseException (like KeyboardInterrupt) so the broad
+    `except Exception` fallbacks in the stages do not swallow it.
+    """
+
+
+class CancelToken:
+    """Thread-safe cancellation flag shared by one review run."""
+
+    def __init__(self, check: Optional[Callable[[], bool]] = None):
+        self._event = threading.Event()
+        self._check = check
+        self.reason = ""
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    def is_cancelled(self) -> bool:
+        if not self._event.is_set() and self._check is not None:
+            try:
+                if self._check():
+                    self.cancel("superseded")
+            except Exception:
+                pass
+        return self._event.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds; True as soon as the run is cancelled."""
+        return self._event.wait(timeout) or self.is_cancelled()
+
+    def raise_if_cancelled(self, where: str = "") -> None:
+        if self.is_cancelled():
+            raise ReviewCancelled(f"{self.reason} ({where})" if where else self.reason)
@@ -0,0 +1,149 @@
+"""
+Stage checkpoints so a crashed or retried review run resumes.
+
+Every stage output of a run (discovery, linter issues, team rules, impact
+data, summaries) is stored in SQLite under (repo, base SHA, head SHA,
+stage). A retry of the same change set (e.g. a CI re-run after the
+reviewer call failed) loads the completed stages and continues at the
+stage that failed. Checkpoints of a run are dropped once it completes.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional
+
+from config import Config
+from logger import log
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    repo TEXT NOT NULL,
+    base_sha TEXT NOT NULL,
+    head_sha TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (repo, base_sha, head_sha, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON checkpoints(created_at);
+"""
+
+
+class CheckpointStore:
+    """SQLite store of per-stage outputs, shared by all runs of a host."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.enabled = Config.ENABLE_CHECKPOINTS
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if not self.enabled:
+            return
+        try:
+            self._conn = sqlite3.connect(
+                db_path or Config.CHECKPOINT_DB, timeout=30, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=30000")
+            self._conn.executescript(_SCHEMA_SQL)
+            self._conn.commit()
+            self.purge(Config.CHECKPOINT_TTL_SEC)
+        except sqlite3.Error as e:
+            log.warning(f"Checkpoints disabled: {e}")
+            self._conn = None
+
+    def run(self, repo: str, base_sha: Optional[str], head_sha: Optional[str]) -> "RunCheckpoint":
+        """Checkpoint handle of one change set; a no-op without both SHAs."""
+        if self._conn is None or not base_sha or not head_sha:
+            return RunCheckpoint(None, (repo, base_sha or "", head_sha or ""))
+        return RunCheckpoint(self, (repo, base_sha, head_sha))
+
+    def get(self, key: tuple, stage: str) -> Optional[Any]:
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM checkpoints "
+                "WHERE repo = ? AND base_sha = ? AND head_sha = ? AND stage = ?",
+                key + (stage,),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: tuple, stage: str, value: Any) -> None:
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints "
+                    "(repo, base_sha, head_sha, stage, value, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (stage, json.dumps(value, ensure_ascii=False), time.time()),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"Checkpoint write failed ({stage}): {e}")
+
+    def clear(self, key: tuple) -> None:
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE repo = ? AND base_sha = ? AND head_sha = ?",
+                key,
+            )
+            self._conn.commit()
+
+    def purge(self, max_age_sec: float) -> None:
+        """Drop checkpoints of runs that were never resumed."""
+        if self._conn is None or max_age_sec <= 0:
+            return
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE created_at < ?", (time.time() - max_age_sec,)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class RunCheckpoint:
+    """Stage checkpoints of one (repo, base SHA, head SHA) change set."""
+
+    def __init__(self, store: Optional[CheckpointStore], key: tuple, prefix: str = ""):
+        self.store = store
+        self.key = key
+        self.prefix = prefix
+        self.resumed: List[str] = []
+
+    def scoped(self, name: str) -> "RunCheckpoint":
+        """View whose stages are namespaced by `name` (e.g. a monorepo partition)."""
+        view = RunCheckpoint(self.store, self.key, f"{self.prefix}{name}/")
+        view.resumed = self.resumed
+        return view
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    def load(self, stage: str) -> Optional[Any]:
+        if self.store is None:
+            return None
+        stage = self.prefix + stage
+        value = self.store.get(self.key, stage)
+        if value is not None:
+            log.info(f"Checkpoint: resuming '{stage}' from {self.key[1][:12]}..{self.key[2][:12]}")
+            self.resumed.append(stage)
+        return value
+
+    def save(self, stage: str, value: Any) -> None:
+        if self.store is not None:
+            self.store.put(self.key, self.prefix + stage, value)
+
+    def clear(self) -> None:
+        if self.store is not None:
+            self.store.clear(self.key)
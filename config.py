@@ -29,9 +29,72 @@ class Config:
     MAX_DIFF_LENGTH: int = int(os.getenv("MAX_DIFF_LENGTH", "100000"))
     MAX_FILES_PER_BATCH: int = int(os.getenv("MAX_FILES_PER_BATCH", "10"))
     MAX_REVIEW_TOKENS: int = int(os.getenv("MAX_REVIEW_TOKENS", "4096"))
+    # Global wall-clock budget for one review run; 0 = no deadline
+    REVIEW_DEADLINE_SEC: float = float(os.getenv("REVIEW_DEADLINE_SEC", "0"))
+
+    # === File Filter (skipped before any stage, listed in the report) ===
+    ENABLE_FILE_FILTER: bool = os.getenv("ENABLE_FILE_FILTER", "true").lower() == "true"
+    REVIEW_SKIP_GLOBS: str = os.getenv(
+        "REVIEW_SKIP_GLOBS",
+        "go.sum,go.mod,*.lock,package-lock.json,pnpm-lock.yaml,*.svg,*.png,assets/*,vendor/*,"
+        "*.pb.go,*_pb2.py,*_pb2_grpc.py,*.pb.h,*.pb.cc,*.min.js,*.min.css,*.map",
+    )
+    REVIEW_MAX_FILE_BYTES: int = int(os.getenv("REVIEW_MAX_FILE_BYTES", "1000000"))
+    REVIEW_MAX_CHANGED_LINES: int = int(os.getenv("REVIEW_MAX_CHANGED_LINES", "5000"))
 
     # === Static Analysis ===
     ENABLE_LINTER: bool = os.getenv("ENABLE_LINTER", "true").lower() == "true"
+    # Linter jobs run on a pool sized to the CPU count (0 = auto)
+    LINT_WORKERS: int = int(os.getenv("LINT_WORKERS", "0"))
+    # Per-tool caps on parallel runs and on total seconds per review ("tool=n,...")
+    LINT_TOOL_CONCURRENCY: str = os.getenv(
+        "LINT_TOOL_CONCURRENCY", "pylint=2,golangci-lint=1,cargo=1,checkstyle=2"
+    )
+    LINT_TOOL_BUDGETS: str = os.getenv("LINT_TOOL_BUDGETS", "pylint=120,checkstyle=120")
+    # Max files per flake8 / pylint / eslint / checkstyle / cppcheck process
+    LINT_BATCH_SIZE: int = int(os.getenv("LINT_BATCH_SIZE", "50"))
+    # Linter findings within this many lines of a change are kept (0 = changed lines only)
+    LINT_CONTEXT_LINES: int = int(os.getenv("LINT_CONTEXT_LINES", "3"))
+    # CI linter reports (SARIF / checkstyle XML / golangci-lint JSON) used instead of
+    # re-running the tools: comma-separated globs, optionally "tool:path"
+    LINT_ARTIFACTS: str = os.getenv("LINT_ARTIFACTS", "")
+    # Reports cover every file of their tool, not only the files they list
+    LINT_ARTIFACTS_COVER_ALL: bool = os.getenv("LINT_ARTIFACTS_COVER_ALL", "false").lower() == "true"
+    # Serve pylint / flake8 from long-lived worker processes (see lint_workers.py)
+    LINT_PERSISTENT_WORKERS: bool = os.getenv("LINT_PERSISTENT_WORKERS", "false").lower() == "true"
+    # A worker is replaced once it grows past this RSS or has served this many runs
+    LINT_WORKER_MAX_RSS_MB: int = int(os.getenv("LINT_WORKER_MAX_RSS_MB", "1024"))
+    LINT_WORKER_MAX_REQUESTS: int = int(os.getenv("LINT_WORKER_MAX_REQUESTS", "500"))
+    # Per-tool data segment caps for linter processes in MB ("tool=n,...")
+    LINT_TOOL_MEMORY_MB: str = os.getenv(
+        "LINT_TOOL_MEMORY_MB", "cppcheck=2048,cargo=8192,golangci-lint=8192,pylint=4096"
+    )
+    # Nice increment and CPU list (e.g. "0-3") for linter processes ("" = all CPUs)
+    LINT_NICE: int = int(os.getenv("LINT_NICE", "10"))
+    LINT_CPU_AFFINITY: str = os.getenv("LINT_CPU_AFFINITY", "")
+    # Linter timeouts: FACTOR x the tool's 90th-percentile runtime, within MIN..MAX seconds
+    LINT_TIMEOUT_FACTOR: float = float(os.getenv("LINT_TIMEOUT_FACTOR", "4"))
+    LINT_TIMEOUT_MIN: float = float(os.getenv("LINT_TIMEOUT_MIN", "20"))
+    LINT_TIMEOUT_MAX: float = float(os.getenv("LINT_TIMEOUT_MAX", "600"))
+
+    # === Result Cache (summaries / linter results reused across runs) ===
+    ENABLE_RESULT_CACHE: bool = os.getenv("ENABLE_RESULT_CACHE", "true").lower() == "true"
+    RESULT_CACHE_DB: str = os.getenv("RESULT_CACHE_DB", "review_cache.db")
+    # Lint results kept per (file, tool); least recently used ones are evicted
+    LINT_CACHE_MAX_ENTRIES: int = int(os.getenv("LINT_CACHE_MAX_ENTRIES", "50000"))
+
+    # === Stage Checkpoints (resume crashed / retried runs) ===
+    ENABLE_CHECKPOINTS: bool = os.getenv("ENABLE_CHECKPOINTS", "true").lower() == "true"
+    CHECKPOINT_DB: str = os.getenv("CHECKPOINT_DB", "review_checkpoints.db")
+    CHECKPOINT_TTL_SEC: int = int(os.getenv("CHECKPOINT_TTL_SEC", str(7 * 24 * 3600)))
+
+    # === Monorepo Partitions ===
+    # Changes spanning several subprojects are reviewed per subproject
+    ENABLE_PARTITIONS: bool = os.getenv("ENABLE_PARTITIONS", "true").lower() == "true"
+    PARTITION_MARKERS: str = os.getenv(
+        "PARTITION_MARKERS", "go.mod,package.json,Cargo.toml,pyproject.toml"
+    )
+    PARTITION_WORKERS: int = int(os.getenv("PARTITION_WORKERS", "4"))
 
     # === Output ===
     OUTPUT_FORMAT: str = os.getenv("OUTPUT_FORMAT", "json")
@@ -48,12 +111,47 @@ class Config:
     # === Knowledge Graph ===
     ENABLE_KG: bool = os.getenv("ENABLE_KG", "true").lower() == "true"
     KG_CACHE_FILE: str = os.getenv("KG_CACHE_FILE", "kg_cache.pkl")
+    # One graph DB per repository (keyed by its git common dir) in this directory
+    KG_DB_DIR: str = os.getenv("KG_DB_DIR", "code_graphs")
+    # Processes parsing files during a full graph build (0 = CPU count, 1 = serial)
+    KG_BUILD_WORKERS: int = int(os.getenv("KG_BUILD_WORKERS", "0"))
 
     # === Git Mode ===
     # "pr" = diff against target branch (default)
     # "patch" = diff HEAD~1..HEAD (single commit / gerrit workflow)
+    # "range" = review every commit of COMMIT_RANGE ("A..B") in one process
     GIT_MODE: str = os.getenv("GIT_MODE", "pr")
     TARGET_BRANCH: str = os.getenv("TARGET_BRANCH", "")
+    COMMIT_RANGE: str = os.getenv("COMMIT_RANGE", "")
+    # Shallow clones are deepened in steps until the merge-base is found
+    GIT_REMOTE: str = os.getenv("GIT_REMOTE", "origin")
+    GIT_DEEPEN_STEP: int = int(os.getenv("GIT_DEEPEN_STEP", "50"))
+    GIT_DEEPEN_MAX_STEPS: int = int(os.getenv("GIT_DEEPEN_MAX_STEPS", "8"))
+    # Read the head revision from the object database instead of a checkout
+    # (always on for bare repositories); HEAD_REF selects the revision
+    REVIEW_FROM_OBJECTS: bool = os.getenv("REVIEW_FROM_OBJECTS", "false").lower() == "true"
+    HEAD_REF: str = os.getenv("HEAD_REF", "")
+
+    # === Incremental Re-review ===
+    # Only review what changed since the last reviewed head of REVIEW_KEY
+    # (defaults to the current branch) and carry forward the other findings.
+    REVIEW_INCREMENTAL: bool = os.getenv("REVIEW_INCREMENTAL", "false").lower() == "true"
+    REVIEW_KEY: str = os.getenv("REVIEW_KEY", "")
+
+    # === Job Queue (multi-repo / multi-PR workers) ===
+    JOB_QUEUE_DB: str = os.getenv("JOB_QUEUE_DB", "review_jobs.db")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_REPO_CONCURRENCY: int = int(os.getenv("JOB_REPO_CONCURRENCY", "2"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BACKOFF_SEC: int = int(os.getenv("JOB_RETRY_BACKOFF_SEC", "30"))
+    JOB_LEASE_SEC: int = int(os.getenv("JOB_LEASE_SEC", "900"))
+    JOB_CANCEL_POLL_SEC: float = float(os.getenv("JOB_CANCEL_POLL_SEC", "2"))
+    # "<branch glob>=<priority>" pairs, first match wins; higher runs first
+    JOB_PRIORITY_RULES: str = os.getenv(
+        "JOB_PRIORITY_RULES", "release/*=100,hotfix/*=90,main=50,master=50"
+    )
+    JOB_RESULTS_DIR: str = os.getenv("JOB_RESULTS_DIR", "review_results")
+    JOB_WORKTREE_DIR: str = os.getenv("JOB_WORKTREE_DIR", ".review_worktrees")
 
 
 # Provider defaults
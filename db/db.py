@@ -63,9 +63,26 @@ class DBManager:
                         file_path VARCHAR(255),
                         verdict VARCHAR(20),
                         ai_report TEXT,
+                        review_key VARCHAR(255),
+                        head_sha VARCHAR(64),
                         created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                     )
                 """)
+                # Tables created before head SHA tracking lack these columns
+                self._ensure_column(cursor, "review_history", "review_key", "VARCHAR(255)")
+                self._ensure_column(cursor, "review_history", "head_sha", "VARCHAR(64)")
+
+                log.info("Checking table: review_file_results...")
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS review_file_results (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        review_id INT NOT NULL,
+                        file_path VARCHAR(512) NOT NULL,
+                        issues MEDIUMTEXT,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        INDEX idx_review_id (review_id)
+                    )
+                """)
             conn.commit()
             log.info("Database tables check completed.")
         except Exception as e:
@@ -74,6 +91,16 @@ class DBManager:
             if conn:
                 conn.close()
 
+    def _ensure_column(self, cursor, table, column, ddl):
+        cursor.execute(
+            "SELECT COUNT(*) AS n FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+            (self.db_name, table, column),
+        )
+        if not cursor.fetchone()["n"]:
+            log.info(f"Adding column {table}.{column}...")
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
     def sync_rules_from_json(self, json_path):
         """Reads JSON and updates the DB. Acts as Single Source of Truth."""
         if not os.path.exists(json_path):
@@ -133,19 +160,64 @@ class DBManager:
                 conn.close()
         return rules_text
 
-    def save_review_record(self, file_path, verdict, report_content):
+    def save_review_record(self, file_path, verdict, report_content,
+                           review_key=None, head_sha=None, file_results=None):
+        """Save a review; `file_results` maps file path -> list of issues."""
         conn = None
+        review_id = None
         try:
             conn = self.get_connection()
             with conn.cursor() as cursor:
-                sql = "INSERT INTO review_history (file_path, verdict, ai_report) VALUES (%s, %s, %s)"
-                cursor.execute(sql, (file_path, verdict, report_content))
+                sql = ("INSERT INTO review_history (file_path, verdict, ai_report, review_key, head_sha) "
+                       "VALUES (%s, %s, %s, %s, %s)")
+                cursor.execute(sql, (file_path, verdict, report_content, review_key, head_sha))
+                review_id = cursor.lastrowid
+                if file_results:
+                    cursor.executemany(
+                        "INSERT INTO review_file_results (review_id, file_path, issues) VALUES (%s, %s, %s)",
+                        [(review_id, fp, json.dumps(issues, ensure_ascii=False))
+                         for fp, issues in file_results.items()],
+                    )
             conn.commit()
-            log.info(f"Review history saved to DB (Verdict: {verdict})")
+            log.info(f"Review history saved to DB (Verdict: {verdict}, head: {(head_sha or '-')[:12]})")
         except Exception as e:
             log.error(f"Failed to save review history: {e}")
         finally:
             if conn:
                 conn.close()
+        return review_id
+
+    def get_last_review(self, review_key):
+        """Latest review of `review_key` that recorded a head SHA, with per-file issues."""
+        conn = None
+        try:
+            conn = self.get_connection()
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id, verdict, ai_report, head_sha FROM review_history "
+                    "WHERE review_key = %s AND head_sha IS NOT NULL ORDER BY id DESC LIMIT 1",
+                    (review_key,),
+                )
+                row = cursor.fetchone()
+                if not row:
+                    return None
+                cursor.execute(
+                    "SELECT file_path, issues FROM review_file_results WHERE review_id = %s",
+                    (row["id"],),
+                )
+                files = {r["file_path"]: json.loads(r["issues"] or "[]") for r in cursor.fetchall()}
+            return {
+                "id": row["id"],
+                "verdict": row["verdict"],
+                "head_sha": row["head_sha"],
+                "report": json.loads(row["ai_report"] or "{}"),
+                "files": files,
+            }
+        except Exception as e:
+            log.error(f"Failed to fetch last review: {e}")
+            return None
+        finally:
+            if conn:
+                conn.close()
 
 db = DBManager()
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Deadline planning for time-boxed reviews (e.g. CI jobs with a hard budget).
+
+The remaining time is split across the stages still to run according to
+STAGE_WEIGHTS. When a stage's share is too small it is downgraded (fast
+linters, shallower impact analysis, graph-based summaries, the smaller
+review model) or skipped, and every such decision is recorded so the
+report shows what was degraded.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from logger import log
+
+# Relative share of the remaining time, in pipeline order
+STAGE_WEIGHTS: Dict[str, float] = {
+    "lint": 1.0,
+    "impact": 0.5,
+    "summarize": 2.0,
+    "review": 4.0,
+}
+
+# Below these stage budgets (seconds) the stage is downgraded / skipped
+LINT_FAST_BELOW = 20.0
+LINT_SKIP_BELOW = 2.0
+IMPACT_SHALLOW_BELOW = 5.0
+IMPACT_SKIP_BELOW = 1.0
+SUMMARY_LLM_EST_SEC = 20.0  # expected cost of one LLM summary
+REVIEW_FAST_MODEL_BELOW = 90.0
+REVIEW_SKIP_BELOW = 10.0
+REVIEW_SAFETY_MARGIN = 5.0  # kept free for persistence / report writing
+
+
+class Deadline:
+    """Wall-clock budget for one review run; `seconds <= 0` means unlimited."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.total = seconds if seconds and seconds > 0 else None
+        self.start = time.monotonic()
+        self.degradations: List[str] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.total is not None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def remaining(self) -> float:
+        if self.total is None:
+            return float("inf")
+        return max(self.total - self.elapsed(), 0.0)
+
+    def budget(self, stage: str) -> float:
+        """Share of the remaining time planned for `stage` (and later stages)."""
+        if self.total is None:
+            return float("inf")
+        stages = list(STAGE_WEIGHTS)
+        later = stages[stages.index(stage):]
+        share = STAGE_WEIGHTS[stage] / sum(STAGE_WEIGHTS[s] for s in later)
+        return self.remaining() * share
+
+    def degrade(self, what: str) -> None:
+        log.warning(f"[Deadline] {what} ({self.remaining():.0f}s left)")
+        self.degradations.append(what)
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "budget_sec": self.total,
+            "elapsed_sec": round(self.elapsed(), 2),
+            "degradations": list(self.degradations),
+        }
@@ -0,0 +1,320 @@
+"""
+Structured diff model built from one `git diff --numstat --patch -z -M` run.
+
+The NUL-delimited numstat section gives exact paths (no quoting, renames
+as old/new pairs) and line counts; the patch section that follows is
+split into per-file blocks, each matched to its numstat entry by the paths
+in its `diff --git` line, and parsed into hunks. A typechange (e.g. a file
+replaced by a symlink) has one numstat entry but two blocks, a delete and
+an add of the same path; both go to one entry with status "T". The output
+is parsed while git is still writing it (with --src-prefix=a/
+--dst-prefix=b/, see GitHelper.get_parsed_diff).
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+_HUNK_RE = re.compile(rb"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_HEADER_RE = re.compile(r"^diff --git a/(.*) b/(.*)$")
+_UNESCAPE = {b"a": 7, b"b": 8, b"t": 9, b"n": 10, b"v": 11, b"f": 12, b"r": 13}
+_READ_SIZE = 1 << 16
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="ignore")
+
+
+@dataclass
+class DiffHunk:
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    header: str
+    lines: List[str] = field(default_factory=list)
+    # New line numbers of the added lines, derived from `lines` (see _index)
+    added: List[int] = field(default_factory=list, init=False, repr=False)
+
+    @classmethod
+    def from_header(cls, header: str, lines: Optional[List[str]] = None) -> "DiffHunk":
+        m = _HUNK_RE.match(header.encode("utf-8"))
+        if not m:
+            raise ValueError(f"Not a hunk header: {header!r}")
+        old_start, old_count, new_start, new_count = (
+            int(g) if g is not None else 1 for g in m.groups()
+        )
+        hunk = cls(old_start, old_count, new_start, new_count, header, list(lines or []))
+        hunk._index()
+        return hunk
+
+    def _index(self) -> None:
+        """Compute the new line numbers of the added lines."""
+        self.added = []
+        new = self.new_start
+        for line in self.lines:
+            tag = line[:1]
+            if tag == "+":
+                self.added.append(new)
+                new += 1
+            elif tag not in ("-", "\\"):  # "\ No newline at end of file"
+                new += 1
+
+
+@dataclass
+class DiffFile:
+    path: str
+    old_path: Optional[str] = None
+    status: str = "M"  # A / D / M / R / C / T (typechange)
+    added: Optional[int] = None  # numstat; None for binary files
+    deleted: Optional[int] = None
+    binary: bool = False
+    header: List[str] = field(default_factory=list)
+    hunks: List[DiffHunk] = field(default_factory=list)
+    # Typechange: the delete block of the old file, before this one
+    prelude: List[str] = field(default_factory=list)
+
+    @property
+    def patch(self) -> str:
+        lines = self.prelude + self.header
+        for h in self.hunks:
+            lines.append(h.header)
+            lines.extend(h.lines)
+        return "\n".join(lines)
+
+    @property
+    def added_lines(self) -> Set[int]:
+        return {n for h in self.hunks for n in h.added}
+
+    @property
+    def deletion_points(self) -> Set[int]:
+        """New line numbers where removed lines used to be (the line now in their place)."""
+        points: Set[int] = set()
+        for h in self.hunks:
+            new = h.new_start
+            for line in h.lines:
+                tag = line[:1]
+                if tag == "-":
+                    points.add(new)
+                elif tag in ("+", " ", ""):
+                    new += 1
+        return points
+
+
+@dataclass
+class ParsedDiff:
+    files: List[DiffFile] = field(default_factory=list)
+
+    @property
+    def paths(self) -> List[str]:
+        """Changed paths (new path for renames; deleted files included)."""
+        return [f.path for f in self.files]
+
+    def get(self, path: str) -> Optional[DiffFile]:
+        for f in self.files:
+            if f.path == path:
+                return f
+        return None
+
+    def for_files(self, paths: Sequence[str]) -> "ParsedDiff":
+        wanted = set(paths)
+        return ParsedDiff([f for f in self.files if f.path in wanted])
+
+    def merge(self, other: "ParsedDiff") -> "ParsedDiff":
+        seen = set(self.paths)
+        return ParsedDiff(self.files + [f for f in other.files if f.path not in seen])
+
+    def text(self) -> str:
+        """Unified diff of all files."""
+        return "\n".join(f.patch for f in self.files)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": [
+                {
+                    "path": f.path, "old_path": f.old_path, "status": f.status,
+                    "added": f.added, "deleted": f.deleted, "binary": f.binary,
+                    "header": f.header, "prelude": f.prelude,
+                    "hunks": [{"header": h.header, "lines": h.lines} for h in f.hunks],
+                }
+                for f in self.files
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ParsedDiff":
+        files = []
+        for d in data.get("files", []):
+            hunks = [DiffHunk.from_header(h["header"], h["lines"]) for h in d.get("hunks", [])]
+            d = {k: v for k, v in d.items() if k != "hunks"}
+            files.append(DiffFile(hunks=hunks, **d))
+        return cls(files)
+
+
+class _StreamReader:
+    """Reads NUL-terminated tokens, then newline-terminated lines, from a pipe."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.buf = b""
+
+    def _fill(self) -> bool:
+        chunk = self.stream.read1(_READ_SIZE) if hasattr(self.stream, "read1") else self.stream.read(_READ_SIZE)
+        if not chunk:
+            return False
+        self.buf += chunk
+        return True
+
+    def token(self) -> Optional[bytes]:
+        while b"\0" not in self.buf:
+            if not self._fill():
+                tok, self.buf = self.buf, b""
+                return tok or None
+        tok, _, self.buf = self.buf.partition(b"\0")
+        return tok
+
+    def lines(self) -> Iterator[bytes]:
+        while True:
+            *complete, self.buf = self.buf.split(b"\n")
+            yield from complete
+            if not self._fill():
+                break
+        if self.buf:
+            yield self.buf
+            self.buf = b""
+
+
+def _read_numstat(reader: _StreamReader) -> List[DiffFile]:
+    files: List[DiffFile] = []
+    while True:
+        tok = reader.token()
+        if not tok:
+            return files  # empty token separates numstat from the patch
+        added, deleted, path = _decode(tok).split("\t", 2)
+        old_path = None
+        if not path:  # rename / copy: "<a>\t<d>\t\0<old>\0<new>\0"
+            old_path = _decode(reader.token() or b"")
+            path = _decode(reader.token() or b"")
+        binary = added == "-"
+        files.append(DiffFile(
+            path=path,
+            old_path=old_path,
+            status="R" if old_path else "M",
+            added=None if binary else int(added),
+            deleted=None if binary else int(deleted),
+            binary=binary,
+        ))
+
+
+def _unquote(data: bytes) -> Tuple[bytes, bytes]:
+    """Split a C-quoted path off the front of `data`: (path, rest)."""
+    out = bytearray()
+    i = 1
+    while i < len(data) and data[i:i + 1] != b'"':
+        c = data[i:i + 1]
+        if c == b"\\" and i + 1 < len(data):
+            nxt = data[i + 1:i + 2]
+            if nxt.isdigit():
+                out.append(int(data[i + 1:i + 4], 8))
+                i += 4
+                continue
+            out += bytes([_UNESCAPE[nxt]]) if nxt in _UNESCAPE else nxt
+            i += 2
+            continue
+        out += c
+        i += 1
+    return bytes(out), data[i + 1:]
+
+
+def _header_paths(raw: bytes) -> Optional[Tuple[str, str]]:
+    """(a/old, b/new) of a `diff --git` line, None when it is ambiguous
+    (unquoted paths containing spaces)."""
+    rest = raw[len(b"diff --git "):]
+    if b'"' not in rest:
+        parts = rest.split(b" ")
+        return (_decode(parts[0]), _decode(parts[1])) if len(parts) == 2 else None
+    paths = []
+    for _ in range(2):
+        if rest.startswith(b'"'):
+            path, rest = _unquote(rest)
+        else:
+            path, _, rest = rest.partition(b" ")
+        paths.append(_decode(path))
+        rest = rest.lstrip(b" ")
+    return paths[0], paths[1]
+
+
+def _block_of(raw: bytes, f: DiffFile) -> bool:
+    """Whether the `diff --git` line `raw` starts the patch block of `f`."""
+    old, new = f"a/{f.old_path or f.path}", f"b/{f.path}"
+    return _decode(raw) == f"diff --git {old} {new}" or _header_paths(raw) == (old, new)
+
+
+def _apply_header(f: DiffFile) -> None:
+    for line in f.header:
+        if line.startswith("new file mode"):
+            f.status = "A"
+        elif line.startswith("deleted file mode"):
+            f.status = "D"
+        elif line.startswith("copy from"):
+            f.status = "C"
+        elif line.startswith("Binary files") or line == "GIT binary patch":
+            f.binary = True
+    if f.prelude:
+        f.status = "T"
+
+
+def parse_diff_stream(stream: BinaryIO) -> ParsedDiff:
+    """Parse `git diff --numstat --patch -z -M` output as it is produced."""
+    reader = _StreamReader(stream)
+    files = _read_numstat(reader)
+    index = 0  # next numstat entry without a patch block
+    current: Optional[DiffFile] = None
+    hunk: Optional[DiffHunk] = None
+    extra: List[DiffFile] = []
+
+    def _close() -> None:
+        if hunk is not None:
+            hunk._index()
+
+    def _next_file(raw: bytes) -> DiffFile:
+        nonlocal index
+        if current is not None and _block_of(raw, current) and any(
+            line.startswith("deleted file mode") for line in current.header
+        ):
+            # Second block of a typechange: keep the delete block as prelude
+            current.prelude, current.header, current.hunks = current.patch.split("\n"), [], []
+            return current
+        for i in range(index, len(files)):
+            if _block_of(raw, files[i]):
+                index = i + 1
+                return files[i]
+        m = _HEADER_RE.match(_decode(raw))
+        f = DiffFile(path=m.group(2) if m else "")
+        extra.append(f)
+        return f
+
+    for raw in reader.lines():
+        if raw.startswith(b"diff --git "):
+            _close()
+            hunk = None
+            current = _next_file(raw)
+            current.header = [_decode(raw)]
+            continue
+        if current is None:
+            continue
+        m = _HUNK_RE.match(raw)
+        if m:
+            _close()
+            hunk = DiffHunk.from_header(_decode(raw))
+            current.hunks.append(hunk)
+        elif hunk is not None and raw[:1] in (b" ", b"+", b"-", b"\\"):
+            hunk.lines.append(_decode(raw))
+        else:
+            current.header.append(_decode(raw))
+    _close()
+
+    parsed = ParsedDiff(files + extra)
+    for f in parsed.files:
+        _apply_header(f)
+    return parsed
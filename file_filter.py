@@ -0,0 +1,110 @@
+"""
+Pre-review filter for binary, generated, vendored and oversized files.
+
+Runs on the parsed diff before any stage sees it. A file is skipped when:
+  - numstat marks it binary, or it changes more than REVIEW_MAX_CHANGED_LINES
+  - its head blob / file is larger than REVIEW_MAX_FILE_BYTES
+  - .gitattributes marks it linguist-generated or linguist-vendored
+  - it matches REVIEW_SKIP_GLOBS (lockfiles, protobuf output, minified
+    assets) at any depth
+  - its content looks generated (a generator's "Code generated ... DO NOT
+    EDIT." / @generated / protoc header) or minified (very long lines), or
+    contains NUL bytes
+Skipped files are reported with the reason instead of being reviewed.
+"""
+
+import fnmatch
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from diff_parser import DiffFile, ParsedDiff
+
+GENERATED_ATTRS = ("linguist-generated", "linguist-vendored")
+
+# Header markers of code generators, matched per line. Only the exact forms
+# tools write: a hand-written "do not edit without ..." comment is no marker
+_GENERATED_MARKERS = re.compile(
+    r"^\s*(?://|#|--|/?\*)\s*Code generated .* DO NOT EDIT\.$"  # go generate convention
+    r"|@generated\b"  # Facebook / Bazel / many JS tools
+    r"|Generated by the protocol buffer compiler\.\s+DO NOT EDIT!"  # protoc
+    r"|^\s*//\s*<auto-generated",  # .NET tools
+    re.MULTILINE,
+)
+_HEADER_LINES = 10
+_MINIFIED_LINE_CHARS = 1000
+
+
+def skip_globs() -> List[str]:
+    return [g.strip() for g in Config.REVIEW_SKIP_GLOBS.split(",") if g.strip()]
+
+
+def _glob_match(path: str, pattern: str) -> bool:
+    """Match at any depth ("go.sum" and "vendor/*" also match "svc/go.sum",
+    "svc/vendor/x.go"); a leading "/" anchors the pattern to the repo root."""
+    if pattern.startswith("/"):
+        return fnmatch.fnmatchcase(path, pattern[1:])
+    return fnmatch.fnmatchcase(path, pattern) or fnmatch.fnmatchcase(path, f"*/{pattern}")
+
+
+def _attr_set(value: Optional[str]) -> bool:
+    return value not in (None, "", "unspecified", "unset", "false")
+
+
+def content_reason(content: str) -> Optional[str]:
+    """Skip reason derived from file content, or None to keep the file."""
+    if "\0" in content[:8192]:
+        return "binary content"
+    header = "\n".join(content.lstrip()[:4096].splitlines()[:_HEADER_LINES])
+    if _GENERATED_MARKERS.search(header):
+        return "generated (file header)"
+    lines = content.splitlines()
+    if lines and max(len(line) for line in lines) > _MINIFIED_LINE_CHARS and len(lines) < 50:
+        return "minified"
+    return None
+
+
+def file_reason(
+    f: DiffFile,
+    size: Optional[int],
+    attrs: Dict[str, str],
+    globs: List[str],
+) -> Optional[str]:
+    """Skip reason from metadata only (no content read), or None."""
+    if f.binary:
+        return "binary"
+    for attr in GENERATED_ATTRS:
+        if _attr_set(attrs.get(attr)):
+            return f"{attr.split('-', 1)[1]} (.gitattributes)"
+    for pattern in globs:
+        if _glob_match(f.path, pattern):
+            return f"matches {pattern}"
+    changed = (f.added or 0) + (f.deleted or 0)
+    if changed > Config.REVIEW_MAX_CHANGED_LINES:
+        return f"{changed} changed lines (limit {Config.REVIEW_MAX_CHANGED_LINES})"
+    if size is not None and size > Config.REVIEW_MAX_FILE_BYTES:
+        return f"{size} bytes (limit {Config.REVIEW_MAX_FILE_BYTES})"
+    return None
+
+
+def filter_diff(
+    diff: ParsedDiff,
+    sizes: Dict[str, Optional[int]],
+    attrs: Dict[str, Dict[str, str]],
+    read_head: Callable[[str], Optional[str]],
+) -> Tuple[ParsedDiff, List[Dict[str, str]]]:
+    """Split `diff` into the reviewable part and a list of {file, reason}."""
+    globs = skip_globs()
+    kept: List[DiffFile] = []
+    skipped: List[Dict[str, str]] = []
+    for f in diff.files:
+        reason = file_reason(f, sizes.get(f.path), attrs.get(f.path, {}), globs)
+        if reason is None and f.status != "D":
+            content = read_head(f.path)
+            if content:
+                reason = content_reason(content)
+        if reason:
+            skipped.append({"file": f.path, "reason": reason})
+        else:
+            kept.append(f)
+    return ParsedDiff(kept), skipped
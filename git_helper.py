@@ -1,14 +1,118 @@
 import subprocess
 import os
-from typing import List, Optional
+import re
+import tempfile
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from config import Config
+from diff_parser import ParsedDiff, parse_diff_stream
+from logger import log
+
+_FULL_SHA = re.compile(r"[0-9a-f]{40}")
+
+class BlobReader:
+    """Long-lived `git cat-file --batch` process serving many blob reads over one pipe.
+
+    Requests for a batch are written from a helper thread while responses
+    are read, so large batches cannot deadlock on full pipe buffers.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["git", "-C", self.repo_path, "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._proc
+
+    def read_many(self, specs: Sequence[str]) -> List[Optional[bytes]]:
+        """Raw contents of `<rev>:<path>` / object specs; None where missing."""
+        if not specs:
+            return []
+        with self._lock:
+            try:
+                return self._read_many(specs)
+            except (BrokenPipeError, OSError, ValueError):
+                self.close()  # restart once on a dead pipe
+                return self._read_many(specs)
+
+    def _read_many(self, specs: Sequence[str]) -> List[Optional[bytes]]:
+        proc = self._start()
+        request = b"".join(s.encode("utf-8") + b"\n" for s in specs)
+
+        def _write() -> None:
+            try:
+                proc.stdin.write(request)
+                proc.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+
+        writer = threading.Thread(target=_write, daemon=True)
+        writer.start()
+        out = proc.stdout
+        results: List[Optional[bytes]] = []
+        for _ in specs:
+            header = out.readline()
+            if not header:
+                raise BrokenPipeError("git cat-file exited")
+            parts = header.split()
+            # "<sha> <type> <size>" or "<spec> missing" / "<spec> ambiguous"
+            if len(parts) != 3 or not parts[2].isdigit():
+                results.append(None)
+                continue
+            data = out.read(int(parts[2]))
+            out.read(1)  # trailing LF
+            results.append(data if parts[1] == b"blob" else None)
+        writer.join()
+        return results
+
+    def close(self) -> None:
+        if self._proc is not None:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=5)
+            except Exception:
+                self._proc.kill()
+            self._proc = None
+
 
 class GitHelper:
     def __init__(self, repo_path: str):
         self.repo_path = repo_path
-        if not os.path.exists(os.path.join(repo_path, ".git")):
+        if not self.is_repository(repo_path):
             raise ValueError(f"Invalid git repository path: {repo_path}")
+        self.blobs = BlobReader(repo_path)
+        # Ref layer memo; cleared whenever a fetch changes refs or history
+        self._default_branch: Optional[str] = None
+        self._shallow: Optional[bool] = None
+        self._shas: Dict[str, Optional[str]] = {}
+        self._merge_bases: Dict[tuple, str] = {}
+
+    @staticmethod
+    def is_repository(path: str) -> bool:
+        """True for work trees, linked worktrees, bare and partial clones."""
+        if not os.path.isdir(path):
+            return False
+        proc = subprocess.run(
+            ["git", "-C", path, "rev-parse", "--git-dir"], capture_output=True
+        )
+        return proc.returncode == 0
+
+    def is_bare(self) -> bool:
+        return self._run_git_cmd(["rev-parse", "--is-bare-repository"]) == "true"
 
-    def _run_git_cmd(self, args: List[str]) -> str:
+    def close(self) -> None:
+        self.blobs.close()
+
+    def _run_git_cmd(self, args: List[str], strip: bool = True) -> str:
         try:
             cmd = ["git", "-C", self.repo_path] + args
             result = subprocess.run(
@@ -18,13 +122,18 @@ class GitHelper:
                 check=True,
                 encoding='utf-8'
             )
-            return result.stdout.strip()
+            return result.stdout.strip() if strip else result.stdout
         except subprocess.CalledProcessError as e:
             print(f"Error running git command: {' '.join(cmd)}")
             print(f"Stderr: {e.stderr}")
             raise e
 
     def get_default_branch(self) -> str:
+        if self._default_branch is None:
+            self._default_branch = self._find_default_branch()
+        return self._default_branch
+
+    def _find_default_branch(self) -> str:
         try:
             branches = self._run_git_cmd(["branch", "-r"]).split('\n')
             for branch in branches:
@@ -36,51 +145,268 @@ class GitHelper:
         except:
             return "main"
 
-    def get_changed_files(self, target_branch: str = None) -> List[str]:
-        if not target_branch:
-            target_branch = self.get_default_branch()
+    def get_parsed_diff(
+        self, base: Optional[str] = None, head: Optional[str] = None
+    ) -> ParsedDiff:
+        """File list, numstat and patch of one change set from a single git run.
 
-        output = self._run_git_cmd(["diff", "--name-only", target_branch])
-        if not output:
-            return []
-        
-        return output.split('\n')
-
-    def get_project_diff(self, target_branch: str = None) -> str:
-        if not target_branch:
-            target_branch = self.get_default_branch()
-
-        exclude_patterns = [
-            ":!go.sum",           
-            ":!go.mod",           
-            ":!*.lock",          
-            ":!*.svg",           
-            ":!*.png",
-            ":!assets/*",        
-            ":!vendor/*"
+        `base` only: working tree vs base (PR mode). `base` and `head`: the
+        two revisions. `head` only: the changes of that single commit (root
+        commits included).
+        """
+        opts = [
+            "--numstat", "--patch", "-z", "-M", "--no-color", "--no-ext-diff",
+            # diff_parser matches blocks by their a/ b/ paths, whatever diff.noprefix says
+            "--src-prefix=a/", "--dst-prefix=b/",
         ]
+        if base is None:
+            args = ["diff-tree", "-r", "--root", "--no-commit-id"] + opts + [head]
+        else:
+            args = ["diff"] + opts + [base] + ([head] if head else []) + ["--"]
+        cmd = ["git", "-C", self.repo_path] + args
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            parsed = parse_diff_stream(proc.stdout)
+        finally:
+            proc.stdout.close()
+            stderr = proc.stderr.read().decode("utf-8", errors="ignore")
+            proc.wait()
+        if proc.returncode != 0:
+            print(f"Error running git command: {' '.join(cmd)}")
+            print(f"Stderr: {stderr}")
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+        return parsed
+
+    def get_current_branch(self) -> str:
+        """Current branch name ("HEAD" when detached)."""
+        return self._run_git_cmd(["rev-parse", "--abbrev-ref", "HEAD"])
+
+    # ===== Ref layer: memoized resolution, merge-base, shallow clones =====
+
+    def resolve_sha(self, rev: str) -> Optional[str]:
+        """Commit SHA of `rev`, or None if it does not resolve.
+
+        Only full SHAs are memoized: HEAD, branches and other symbolic
+        revisions move on checkout, commit or fetch, so they are looked up
+        every time.
+        """
+        if rev in self._shas:
+            return self._shas[rev]
+        proc = subprocess.run(
+            ["git", "-C", self.repo_path, "rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}"],
+            capture_output=True, text=True,
+        )
+        sha = proc.stdout.strip() if proc.returncode == 0 else None
+        if _FULL_SHA.fullmatch(rev):
+            self._shas[rev] = sha
+        return sha
+
+    def is_shallow(self) -> bool:
+        if self._shallow is None:
+            self._shallow = self._run_git_cmd(["rev-parse", "--is-shallow-repository"]) == "true"
+        return self._shallow
+
+    def get_merge_base(self, target: str, head: str = "HEAD") -> str:
+        """Merge-base of `target` and `head`, resolved once per pair of commits.
+
+        On a shallow clone the history is deepened step by step (doubling
+        GIT_DEEPEN_STEP, at most GIT_DEEPEN_MAX_STEPS fetches) only until
+        the merge-base is reachable; a missing target branch is fetched
+        first. Falls back to the target tip, with a warning, if the
+        merge-base is still not found.
+        """
+        target_sha = self.resolve_sha(target)
+        if target_sha is None:
+            target = self._fetch_target(target)
+            target_sha = self.resolve_sha(target)
+            if target_sha is None:
+                raise ValueError(f"Cannot resolve target branch '{target}'")
+        # Keyed by commit, not by name: branches and HEAD move
+        key = (target_sha, self.resolve_sha(head))
+        if key in self._merge_bases:
+            return self._merge_bases[key]
 
-        args = ["diff", target_branch, "--", "."] + exclude_patterns
-        
-        return self._run_git_cmd(args)
+        base = self._merge_base(target_sha, head)
+        step = Config.GIT_DEEPEN_STEP
+        for _ in range(Config.GIT_DEEPEN_MAX_STEPS):
+            if base or not self.is_shallow():
+                break
+            log.info(f"Shallow clone: no merge-base with {target} yet, deepening by {step}")
+            if not self._fetch(["--deepen", str(step)] + self._target_refspec(target)):
+                break
+            base = self._merge_base(target_sha, head)
+            step *= 2
+        if base is None:
+            log.warning(
+                f"No merge-base between {target} and {head}; "
+                f"diffing against the target tip {target_sha[:12]}"
+            )
+            base = target_sha
+        if key[1] is not None:
+            self._merge_bases[key] = base
+        return base
+
+    def _merge_base(self, a: str, b: str) -> Optional[str]:
+        proc = subprocess.run(
+            ["git", "-C", self.repo_path, "merge-base", a, b], capture_output=True, text=True
+        )
+        return proc.stdout.strip() if proc.returncode == 0 else None
 
-    def get_pr_description_context(self) -> str:
-        return self._run_git_cmd(["log", "-1", "--pretty=format:Commit: %h%nAuthor: %an%nDate: %cd%n%nMessage:%n%s%n%b"])
+    def _target_refspec(self, target: str) -> List[str]:
+        """[remote, "<branch>:refs/remotes/<remote>/<branch>"] for a branch target."""
+        remote = Config.GIT_REMOTE
+        if target.startswith("refs/") or self.resolve_sha(target) == target:
+            return [remote]
+        branch = target[len(remote) + 1:] if target.startswith(f"{remote}/") else target
+        return [remote, f"{branch}:refs/remotes/{remote}/{branch}"]
 
-    # ===== Gerrit / Single-commit workflow helpers =====
+    def _fetch_target(self, target: str) -> str:
+        """Fetch a target branch missing from a single-branch clone; returns its ref."""
+        refspec = self._target_refspec(target)
+        if len(refspec) < 2:
+            return target
+        depth = ["--depth", str(Config.GIT_DEEPEN_STEP)] if self.is_shallow() else []
+        log.info(f"Fetching missing target branch {target}")
+        self._fetch(depth + refspec)
+        return refspec[1].split(":", 1)[1]
 
-    def get_latest_commit_files(self) -> List[str]:
-        """Files changed in HEAD (for gerrit/amend workflows)."""
-        output = self._run_git_cmd(
-            ["diff-tree", "--no-commit-id", "--name-only", "-r", "HEAD"]
+    def _fetch(self, args: List[str]) -> bool:
+        proc = subprocess.run(
+            ["git", "-C", self.repo_path, "fetch", "--quiet", "--no-tags"] + args,
+            capture_output=True, text=True,
         )
+        self._shas.clear()
+        self._shallow = None
+        if proc.returncode != 0:
+            log.warning(f"git fetch {' '.join(args)} failed: {proc.stderr.strip()}")
+            return False
+        return True
+
+    def get_repo_id(self) -> str:
+        """Stable identity of the repository, shared by all its worktrees."""
+        common = self._run_git_cmd(["rev-parse", "--git-common-dir"])
+        return os.path.realpath(os.path.join(self.repo_path, common))
+
+    def commit_exists(self, sha: str) -> bool:
+        proc = subprocess.run(
+            ["git", "-C", self.repo_path, "cat-file", "-e", f"{sha}^{{commit}}"],
+            capture_output=True,
+        )
+        return proc.returncode == 0
+
+    def get_pr_description_context(self, commit: str = "HEAD") -> str:
+        return self._run_git_cmd(["log", "-1", "--pretty=format:Commit: %h%nAuthor: %an%nDate: %cd%n%nMessage:%n%s%n%b", commit])
+
+    # ===== Commit-range (batch) helpers =====
+
+    def get_commit_range(self, rev_range: str) -> List[str]:
+        """Non-merge commits of `A..B`, oldest first."""
+        output = self._run_git_cmd(["rev-list", "--reverse", "--no-merges", rev_range])
         if not output:
             return []
-        return [f for f in output.split("\n") if f.strip()]
+        return [c for c in output.split("\n") if c.strip()]
+
+    def get_file_at(self, file_path: str, rev: str) -> Optional[str]:
+        """Exact file content at `rev`, or None if the file does not exist there."""
+        return self.get_files_at(rev, [file_path])[file_path]
 
-    def get_latest_commit_diff(self) -> str:
-        """Diff of HEAD commit only."""
-        return self._run_git_cmd(["show", "HEAD", "--patch", "--"])
+    def get_files_at(self, rev: str, paths: Sequence[str]) -> Dict[str, Optional[str]]:
+        """Contents of many files at `rev` through the cat-file pipe (None if missing)."""
+        # cat-file --batch input is line based; such paths take the slow route
+        odd = [p for p in paths if "\n" in p]
+        plain = [p for p in paths if "\n" not in p]
+        blobs = self.blobs.read_many([f"{rev}:{p}" for p in plain])
+        contents = {
+            p: b.decode("utf-8", errors="ignore") if b is not None else None
+            for p, b in zip(plain, blobs)
+        }
+        for p in odd:
+            proc = subprocess.run(
+                ["git", "-C", self.repo_path, "show", f"{rev}:{p}"], capture_output=True
+            )
+            contents[p] = proc.stdout.decode("utf-8", errors="ignore") if proc.returncode == 0 else None
+        return contents
+
+    def get_head_contents(self, diff: ParsedDiff, head: str) -> Dict[str, Optional[str]]:
+        """Post-change content of every changed file at `head` (None if deleted)."""
+        live = [f.path for f in diff.files if f.status != "D"]
+        contents = self.get_files_at(head, live)
+        return {p: contents.get(p) for p in diff.paths}
+
+    def list_files(self, rev: str) -> List[str]:
+        """All tracked paths in the tree of `rev`."""
+        output = self._run_git_cmd(["ls-tree", "-r", "--name-only", rev])
+        if not output:
+            return []
+        return output.split("\n")
+
+    def get_blob_sizes(self, rev: str, paths: Sequence[str]) -> Dict[str, Optional[int]]:
+        """Object sizes of `paths` at `rev` without reading the blobs."""
+        plain = [p for p in paths if "\n" not in p]
+        proc = subprocess.run(
+            ["git", "-C", self.repo_path, "cat-file", "--batch-check"],
+            input="".join(f"{rev}:{p}\n" for p in plain).encode("utf-8"),
+            capture_output=True,
+        )
+        sizes: Dict[str, Optional[int]] = {p: None for p in paths}
+        for p, line in zip(plain, proc.stdout.decode("utf-8", errors="ignore").splitlines()):
+            parts = line.split()
+            if len(parts) == 3 and parts[1] == "blob" and parts[2].isdigit():
+                sizes[p] = int(parts[2])
+        return sizes
+
+    def get_attributes(
+        self, paths: Sequence[str], names: Sequence[str], rev: Optional[str] = None
+    ) -> Dict[str, Dict[str, str]]:
+        """`git check-attr` values per path ("set", "unset", "unspecified" or a value).
+
+        With `rev`, .gitattributes are read from that revision through a
+        temporary index, so this works without a checkout (and on git
+        versions without `check-attr --source`).
+        """
+        result: Dict[str, Dict[str, str]] = {p: {} for p in paths}
+        if not paths:
+            return result
+        env = None
+        index_path = None
+        cmd = ["git", "-C", self.repo_path, "check-attr", "-z", "--stdin"]
+        if rev:
+            fd, index_path = tempfile.mkstemp(prefix="review_attr_index_")
+            os.close(fd)
+            os.remove(index_path)  # read-tree creates it
+            env = dict(os.environ, GIT_INDEX_FILE=index_path)
+            subprocess.run(
+                ["git", "-C", self.repo_path, "read-tree", rev],
+                env=env, capture_output=True, check=True,
+            )
+            cmd.append("--cached")
+        try:
+            proc = subprocess.run(
+                cmd + list(names),
+                input=b"".join(p.encode("utf-8") + b"\0" for p in paths),
+                env=env, capture_output=True,
+            )
+        finally:
+            if index_path and os.path.exists(index_path):
+                os.remove(index_path)
+        fields = proc.stdout.decode("utf-8", errors="ignore").split("\0")
+        for i in range(0, len(fields) - 2, 3):
+            path, attr, value = fields[i:i + 3]
+            result.setdefault(path, {})[attr] = value
+        return result
+
+    def list_dir_files(self, rev: str, dirs: Sequence[str]) -> List[str]:
+        """Paths of the files directly inside `dirs` ("" = repo root) at `rev`."""
+        if not dirs:
+            return []
+        specs = [f"{d}/" if d else "." for d in dirs]
+        output = self._run_git_cmd(["ls-tree", "--full-tree", rev, "--"] + specs)
+        files = []
+        for line in output.split("\n"):
+            meta, _, path = line.partition("\t")
+            if meta.split(" ")[1:2] == ["blob"]:
+                files.append(path)
+        return files
 
     def get_file_content_at_base(
         self, file_path: str, base: str = None
@@ -88,7 +414,5 @@ class GitHelper:
         """Read file content at base branch/commit (for context comparison)."""
         if not base:
             base = self.get_default_branch()
-        try:
-            return self._run_git_cmd(["show", f"{base}:{file_path}"])
-        except subprocess.CalledProcessError:
-            return ""  # New file in this branch
\ No newline at end of file
+        content = self.get_file_at(file_path, base)
+        return content if content is not None else ""  # New file in this branch
\ No newline at end of file
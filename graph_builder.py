@@ -8,20 +8,32 @@ Multi-language support via tree-sitter-language-pack:
 Inspired by code-review-graph (github.com/tirth8205/code-review-graph):
 - Tree-sitter AST extraction for functions, methods, classes, structs, calls, imports
 - SQLite graph storage with WAL mode
+- Cross-file calls resolved through a global symbol index (symbols table)
 - Impact Radius via SQLite recursive CTE (Blast Radius analysis)
 - Incremental updates via SHA-256 file hashing
+- Full builds parse in a process pool (KG_BUILD_WORKERS), one writer; the
+  sources come from the working tree or a reader (e.g. git objects)
 """
 
 import hashlib
+import itertools
 import json
+import multiprocessing
 import os
 import re
 import sqlite3
+import tempfile
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import (
+    Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple,
+)
 
+from config import Config
 from logger import log
 
 # ---------------------------------------------------------------------------
@@ -103,7 +115,7 @@ class EdgeInfo:
 # SQLite Schema
 # ---------------------------------------------------------------------------
 
-_SCHEMA_SQL = """
+_TABLES_SQL = """
 CREATE TABLE IF NOT EXISTS nodes (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     kind TEXT NOT NULL,
@@ -121,6 +133,9 @@ CREATE TABLE IF NOT EXISTS nodes (
     updated_at REAL NOT NULL
 );
 
+-- target_raw: the target as extracted (bare name, selector or in-file qualified
+-- name); target_qualified: the resolved node when resolved = 1, else target_raw;
+-- target_name: the called identifier (last part of target_raw)
 CREATE TABLE IF NOT EXISTS edges (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     kind TEXT NOT NULL,
@@ -129,19 +144,327 @@ CREATE TABLE IF NOT EXISTS edges (
     file_path TEXT NOT NULL,
     line INTEGER DEFAULT 0,
     extra TEXT DEFAULT '{}',
-    updated_at REAL NOT NULL
+    updated_at REAL NOT NULL,
+    target_raw TEXT,
+    target_name TEXT,
+    resolved INTEGER DEFAULT 0
 );
 
+-- Global symbol index for call resolution. scope: enclosing type ('' for
+-- top-level); package: see _package_of; lang: see _lang_of
+CREATE TABLE IF NOT EXISTS symbols (
+    name TEXT NOT NULL,
+    qualified_name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    scope TEXT NOT NULL DEFAULT '',
+    package TEXT NOT NULL,
+    lang TEXT NOT NULL
+);
+"""
+
+# Columns added to edges after the first release (see GraphStore._migrate)
+_EDGE_COLUMNS: Dict[str, str] = {
+    "target_raw": "TEXT",
+    "target_name": "TEXT",
+    "resolved": "INTEGER DEFAULT 0",
+}
+
+_SCHEMA_SQL = _TABLES_SQL + """
 CREATE INDEX IF NOT EXISTS idx_nodes_file ON nodes(file_path);
-CREATE INDEX IF NOT EXISTS idx_nodes_kind ON nodes(kind);
-CREATE INDEX IF NOT EXISTS idx_nodes_qualified ON nodes(qualified_name);
-CREATE INDEX IF NOT EXISTS idx_edges_source ON edges(source_qualified);
-CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target_qualified);
-CREATE INDEX IF NOT EXISTS idx_edges_kind ON edges(kind);
-CREATE INDEX IF NOT EXISTS idx_edges_target_kind ON edges(target_qualified, kind);
 CREATE INDEX IF NOT EXISTS idx_edges_file ON edges(file_path);
+CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_path);
 """
 
+# Secondary indexes left out while a bulk load fills its scratch DB and
+# built once at the end (the file_path ones stay: replacing a file's rows
+# deletes by file_path)
+_DEFERRED_INDEXES: Dict[str, str] = {
+    "idx_nodes_kind": "nodes(kind)",
+    "idx_nodes_qualified": "nodes(qualified_name)",
+    "idx_edges_source": "edges(source_qualified)",
+    "idx_edges_target": "edges(target_qualified)",
+    "idx_edges_kind": "edges(kind)",
+    "idx_edges_target_kind": "edges(target_qualified, kind)",
+    "idx_edges_target_name": "edges(target_name)",
+    "idx_symbols_name": "symbols(name)",
+}
+_SCHEMA_SQL += "".join(
+    f"CREATE INDEX IF NOT EXISTS {name} ON {target};\n" for name, target in _DEFERRED_INDEXES.items()
+)
+
+# Scratch DB of a bulk load (discarded unless the load completes): no fsync,
+# in-memory rollback journal, big page cache, memory-mapped reads, in-memory
+# temp b-trees for the index build
+_BULK_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+_UPSERT_NODE_SQL = """INSERT INTO nodes
+   (kind, name, qualified_name, file_path, line_start, line_end,
+    parent_name, params, return_type, is_test, file_hash, extra, updated_at)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+   ON CONFLICT(qualified_name) DO UPDATE SET
+     kind=excluded.kind, name=excluded.name,
+     file_path=excluded.file_path, line_start=excluded.line_start,
+     line_end=excluded.line_end, parent_name=excluded.parent_name,
+     params=excluded.params, return_type=excluded.return_type,
+     is_test=excluded.is_test, file_hash=excluded.file_hash,
+     extra=excluded.extra, updated_at=excluded.updated_at
+"""
+_INSERT_EDGE_SQL = """INSERT INTO edges
+   (kind, source_qualified, target_qualified, file_path, line, extra, updated_at,
+    target_raw, target_name, resolved)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+_INSERT_SYMBOL_SQL = """INSERT INTO symbols
+   (name, qualified_name, file_path, kind, scope, package, lang)
+   VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+# Node kinds a call can target
+_SYMBOL_KINDS = frozenset({"Function", "Method", "Class", "Struct", "Interface", "Trait", "Type"})
+
+# (file_path, nodes, edges, file_hash)
+FileGraph = Tuple[str, List[NodeInfo], List[EdgeInfo], str]
+
+
+def _edge_row(edge: EdgeInfo, now: float) -> Tuple[Any, ...]:
+    """_INSERT_EDGE_SQL row. Call targets start unresolved unless the parser
+    qualified them in-file; other kinds already name their target node."""
+    name = None
+    target = edge.target
+    resolved = edge.kind != "IMPORTS_FROM"
+    if edge.kind == "CALLS":
+        name = _split_target(target)[1]
+        in_file = _in_file_target(edge.file_path, target)
+        resolved = in_file is not None
+        target = in_file or target
+    return (
+        edge.kind,
+        edge.source,
+        target,
+        edge.file_path,
+        edge.line,
+        json.dumps(edge.extra) if edge.extra else "{}",
+        now,
+        edge.target,
+        name,
+        int(resolved),
+    )
+
+
+def _symbol_row(name: str, qualified_name: str, file_path: str, kind: str, parent: Optional[str]) -> Tuple[str, ...]:
+    lang = _lang_of(file_path)
+    scope = (parent or _scope_of(qualified_name)) if kind == "Method" else ""
+    return (name, qualified_name, file_path, kind, scope, _package_of(file_path, lang), lang)
+
+
+# ---------------------------------------------------------------------------
+# Call resolution
+# ---------------------------------------------------------------------------
+
+# Parsers store in-file callees as qualified names and everything else as
+# written: "foo", "pkg.Func", "obj.Method", "new Type". The resolver maps
+# those to nodes through the symbols table; what stays ambiguous is left
+# unresolved (resolved = 0) and not followed by impact analysis.
+
+# Languages that share one symbol namespace
+_LANG_FAMILY = {"typescript": "javascript", "tsx": "javascript", "cpp": "c"}
+# Receivers naming the enclosing type
+_SELF_NAMES = frozenset({"self", "cls", "this", "super"})
+# Parsers that record method calls without their receiver
+_BARE_METHOD_LANGS = frozenset({"java", "rust"})
+# Languages where other packages' names are only reachable through imports
+_IMPORT_SCOPED_LANGS = frozenset({"go", "python"})
+
+_CALL_NAME_RE = re.compile(r"[<\[(]")
+
+
+def _lang_of(file_path: str) -> str:
+    lang = MultiLangParser.EXT_TO_LANG.get(Path(file_path).suffix.lower(), "generic")
+    return _LANG_FAMILY.get(lang, lang)
+
+
+def _package_of(file_path: str, lang: str) -> str:
+    """Import unit of a file: its module for Python / JS, else its directory."""
+    if lang == "python":
+        module = os.path.splitext(file_path)[0]
+        return module[: -len("/__init__")] if module.endswith("/__init__") else module
+    if lang == "javascript":
+        return os.path.splitext(file_path)[0]
+    return os.path.dirname(file_path)
+
+
+def _split_target(raw: str) -> Tuple[Optional[str], str]:
+    """Raw call target -> (qualifier or None, called name)."""
+    if raw.startswith("new "):
+        raw = raw[4:]
+    if "::" in raw:
+        return None, raw.rsplit("::", 1)[1].rsplit(".", 1)[-1]
+    qualifier, _, name = raw.rpartition(".")
+    return qualifier or None, _CALL_NAME_RE.split(name, 1)[0].strip()
+
+
+def _in_file_target(file_path: str, raw: str) -> Optional[str]:
+    """The node of a callee the parser resolved within the file, else None."""
+    target = raw[4:] if raw.startswith("new ") else raw
+    return target if target.startswith(f"{file_path}::") else None
+
+
+def _scope_of(qualified_name: str) -> str:
+    """Enclosing type of a method ("f.go::Server.Run" -> "Server")."""
+    local = qualified_name.rpartition("::")[2]
+    return local.rpartition(".")[0]
+
+
+class _Symbol(NamedTuple):
+    qualified_name: str
+    file_path: str
+    scope: str
+    package: str
+
+
+class _CallResolver:
+    """Resolves raw CALLS targets against the symbols table.
+
+    Bare names, in order: same file, the caller's own type (Java / Rust,
+    whose parsers drop the receiver), an imported binding, same package,
+    then unique in the language (not for Go / Python, which need an
+    import; Java / Rust also accept a unique method). Selectors `q.name`:
+    q as an import alias (Go package, Python module or class), a self
+    receiver (or in Go any receiver, assumed of the caller's type), then a
+    type name. Each step only resolves when exactly one symbol matches;
+    calls through variables of unknown type stay unresolved.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._symbols: Dict[Tuple[str, str], List[_Symbol]] = {}
+        self._imports: Dict[str, Dict[str, Tuple[str, str]]] = {}
+
+    def _candidates(self, name: str, lang: str) -> List[_Symbol]:
+        key = (name, lang)
+        if key not in self._symbols:
+            rows = self._conn.execute(
+                "SELECT qualified_name, file_path, scope, package FROM symbols "
+                "WHERE name = ? AND lang = ? ORDER BY qualified_name",
+                key,
+            ).fetchall()
+            self._symbols[key] = [_Symbol(*r) for r in rows]
+        return self._symbols[key]
+
+    def _file_imports(self, file_path: str) -> Dict[str, Tuple[str, str]]:
+        """Local alias -> (module, imported name or "") of a file's imports."""
+        if file_path not in self._imports:
+            imports: Dict[str, Tuple[str, str]] = {}
+            rows = self._conn.execute(
+                "SELECT target_qualified, extra FROM edges "
+                "WHERE file_path = ? AND kind = 'IMPORTS_FROM'",
+                (file_path,),
+            ).fetchall()
+            for target, extra in rows:
+                info = json.loads(extra or "{}")
+                # Go edges stored before aliases were recorded: default name
+                alias = info.get("alias") or target.rstrip("/").rsplit("/", 1)[-1]
+                imports[alias] = (info.get("module") or target, info.get("name", ""))
+            self._imports[file_path] = imports
+        return self._imports[file_path]
+
+    @staticmethod
+    def _unique(candidates: List[_Symbol], **match: str) -> Optional[str]:
+        found = [c for c in candidates if all(getattr(c, k) == v for k, v in match.items())]
+        return found[0].qualified_name if len(found) == 1 else None
+
+    def _in_module(self, candidates: List[_Symbol], module: str, lang: str, file_path: str, scope: str = "") -> Optional[str]:
+        """The symbol of `scope` in the imported `module`."""
+        if lang == "go":
+            # Longest trailing run of path segments shared with the package dir
+            wanted = module.strip("/").split("/")
+            best, found = 0, []
+            for c in candidates:
+                if c.scope != scope:
+                    continue
+                have = c.package.split("/")
+                shared = 0
+                while shared < min(len(have), len(wanted)) and have[-1 - shared] == wanted[-1 - shared]:
+                    shared += 1
+                if shared > best:
+                    best, found = shared, [c]
+                elif shared == best and shared:
+                    found.append(c)
+            return found[0].qualified_name if len(found) == 1 else None
+        if lang != "python":
+            return None
+        dots = len(module) - len(module.lstrip("."))
+        path = module.lstrip(".").replace(".", "/")
+        if dots:
+            base = os.path.dirname(file_path)
+            for _ in range(dots - 1):
+                base = os.path.dirname(base)
+            path = (f"{base}/{path}" if base else path) if path else base
+            found = [c for c in candidates if c.scope == scope and c.package == path]
+        else:
+            found = [
+                c for c in candidates
+                if c.scope == scope and (c.package == path or c.package.endswith("/" + path))
+            ]
+        return found[0].qualified_name if len(found) == 1 else None
+
+    def resolve(self, source: str, file_path: str, raw: str) -> Optional[str]:
+        in_file = _in_file_target(file_path, raw)
+        if in_file is not None:  # already resolved by the parser
+            return in_file
+        lang = _lang_of(file_path)
+        qualifier, name = _split_target(raw)
+        candidates = self._candidates(name, lang) if name else []
+        if not candidates:
+            return None
+        own_scope = _scope_of(source)
+        package = _package_of(file_path, lang)
+        imports = self._file_imports(file_path)
+
+        if qualifier is None:
+            resolved = self._unique(candidates, file_path=file_path, scope="")
+            if resolved is None and own_scope and lang in _BARE_METHOD_LANGS:
+                resolved = self._unique(candidates, package=package, scope=own_scope)
+            if resolved is None and name in imports:
+                module, imported = imports[name]
+                return self._in_module(candidates, module, lang, file_path) if imported == name else None
+            resolved = resolved or self._unique(candidates, package=package, scope="")
+            if resolved is None and lang not in _IMPORT_SCOPED_LANGS:
+                resolved = self._unique(candidates, scope="")
+            if resolved is None and lang in _BARE_METHOD_LANGS:
+                methods = [c for c in candidates if c.scope]
+                resolved = methods[0].qualified_name if len(methods) == 1 else None
+            return resolved
+
+        head, _, rest = qualifier.partition(".")
+        if head in imports:
+            module, imported = imports[head]
+            if lang != "python":
+                return self._in_module(candidates, module, lang, file_path)
+            # from m import x; x.f(): x is a submodule of m or a class in m
+            target = f"{module}{'' if module.endswith('.') else '.'}{imported}" if imported else module
+            if rest:
+                target = f"{target}.{rest}"
+            resolved = self._in_module(candidates, target, lang, file_path)
+            if resolved is None and imported and not rest:
+                resolved = self._in_module(candidates, module, lang, file_path, scope=imported)
+            return resolved
+        if own_scope and (head in _SELF_NAMES or (lang == "go" and qualifier.isidentifier())):
+            resolved = self._unique(candidates, package=package, scope=own_scope)
+            if resolved is not None:
+                return resolved
+        # Type.method(): same package first, then a unique type of that name
+        type_name = qualifier.rpartition(".")[2]
+        return (
+            self._unique(candidates, package=package, scope=type_name)
+            or self._unique(candidates, scope=type_name)
+        )
+
 
 # ---------------------------------------------------------------------------
 # GraphStore
@@ -153,23 +476,78 @@ class GraphStore:
 
     def __init__(self, db_path: str = "code_graph.db"):
         self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self._conn = sqlite3.connect(db_path, check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
         self._conn.execute("PRAGMA journal_mode=WAL")
         self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # durable enough with WAL
         self._init_schema()
+        # Files stored and symbol names added / removed since the last
+        # resolve_calls(): the call edges that need (re-)resolving
+        self._dirty_files: Set[str] = set()
+        self._dirty_names: Set[str] = set()
 
     def _init_schema(self) -> None:
+        has_symbols = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'symbols'"
+        ).fetchone() is not None
+        self._conn.executescript(_TABLES_SQL)
+        self._migrate(has_symbols)
         self._conn.executescript(_SCHEMA_SQL)
         self._conn.commit()
 
+    def _migrate(self, has_symbols: bool) -> None:
+        """Bring a graph written before the symbol index up to date.
+
+        Old edges keep target_name NULL, which makes the next resolve_calls()
+        resolve every call edge.
+        """
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(edges)")}
+        added = [c for c in _EDGE_COLUMNS if c not in columns]
+        for column in added:
+            self._conn.execute(f"ALTER TABLE edges ADD COLUMN {column} {_EDGE_COLUMNS[column]}")
+        if added:
+            self._conn.execute(
+                "UPDATE edges SET target_raw = target_qualified, "
+                "resolved = (kind NOT IN ('CALLS', 'IMPORTS_FROM'))"
+            )
+        if not has_symbols:
+            rows = self._conn.execute(
+                f"SELECT * FROM nodes WHERE kind IN ({','.join('?' for _ in _SYMBOL_KINDS)})",
+                sorted(_SYMBOL_KINDS),
+            ).fetchall()
+            self._conn.executemany(
+                _INSERT_SYMBOL_SQL,
+                [_symbol_row(r["name"], r["qualified_name"], r["file_path"], r["kind"], r["parent_name"]) for r in rows],
+            )
+        self._conn.commit()
+
     def close(self) -> None:
         self._conn.close()
 
-    def remove_file_data(self, file_path: str) -> None:
+    def _delete_file_rows(self, file_path: str) -> None:
+        self._dirty_names.update(
+            r[0] for r in self._conn.execute("SELECT name FROM symbols WHERE file_path = ?", (file_path,))
+        )
         self._conn.execute("DELETE FROM nodes WHERE file_path = ?", (file_path,))
         self._conn.execute("DELETE FROM edges WHERE file_path = ?", (file_path,))
-        self._conn.commit()
+        self._conn.execute("DELETE FROM symbols WHERE file_path = ?", (file_path,))
+
+    def remove_file_data(self, file_path: str) -> None:
+        self.remove_files([file_path])
+
+    def remove_files(self, file_paths: List[str]) -> None:
+        """Delete the graph data of several files in one transaction."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for file_path in file_paths:
+                self._delete_file_rows(file_path)
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
 
     def store_file_nodes_edges(
         self,
@@ -178,68 +556,158 @@ class GraphStore:
         edges: List[EdgeInfo],
         fhash: str = "",
     ) -> None:
+        self.store_files([(file_path, nodes, edges, fhash)])
+
+    def store_files(self, files: List[FileGraph]) -> None:
+        """Replace the graph data of several files in one transaction."""
         now = time.time()
         self._conn.execute("BEGIN IMMEDIATE")
         try:
-            self.remove_file_data(file_path)
-            for node in nodes:
-                extra = json.dumps(node.extra) if node.extra else "{}"
-                self._conn.execute(
-                    """INSERT INTO nodes
-                       (kind, name, qualified_name, file_path, line_start, line_end,
-                        parent_name, params, return_type, is_test, file_hash, extra, updated_at)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                       ON CONFLICT(qualified_name) DO UPDATE SET
-                         kind=excluded.kind, name=excluded.name,
-                         file_path=excluded.file_path, line_start=excluded.line_start,
-                         line_end=excluded.line_end, parent_name=excluded.parent_name,
-                         params=excluded.params, return_type=excluded.return_type,
-                         is_test=excluded.is_test, file_hash=excluded.file_hash,
-                         extra=excluded.extra, updated_at=excluded.updated_at
-                    """,
-                    (
-                        node.kind,
-                        node.name,
-                        node.qualified_name,
-                        node.file_path,
-                        node.line_start,
-                        node.line_end,
-                        node.parent_name,
-                        node.params,
-                        node.return_type,
-                        int(node.is_test),
-                        fhash,
-                        extra,
-                        now,
-                    ),
-                )
-            for edge in edges:
-                extra = json.dumps(edge.extra) if edge.extra else "{}"
-                self._conn.execute(
-                    """INSERT INTO edges
-                       (kind, source_qualified, target_qualified, file_path, line, extra, updated_at)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        edge.kind,
-                        edge.source,
-                        edge.target,
-                        edge.file_path,
-                        edge.line,
-                        extra,
-                        now,
-                    ),
+            for file_path, nodes, edges, fhash in files:
+                self._delete_file_rows(file_path)
+                self._conn.executemany(
+                    _UPSERT_NODE_SQL,
+                    [
+                        (
+                            node.kind,
+                            node.name,
+                            node.qualified_name,
+                            node.file_path,
+                            node.line_start,
+                            node.line_end,
+                            node.parent_name,
+                            node.params,
+                            node.return_type,
+                            int(node.is_test),
+                            fhash,
+                            json.dumps(node.extra) if node.extra else "{}",
+                            now,
+                        )
+                        for node in nodes
+                    ],
                 )
+                self._conn.executemany(_INSERT_EDGE_SQL, [_edge_row(edge, now) for edge in edges])
+                symbols = [
+                    _symbol_row(node.name, node.qualified_name, node.file_path, node.kind, node.parent_name)
+                    for node in nodes
+                    if node.kind in _SYMBOL_KINDS
+                ]
+                self._conn.executemany(_INSERT_SYMBOL_SQL, symbols)
+                self._dirty_names.update(row[0] for row in symbols)
+                self._dirty_files.add(file_path)
             self._conn.commit()
         except BaseException:
             self._conn.rollback()
             raise
 
+    @contextmanager
+    def bulk_load(self) -> Iterator["GraphStore"]:
+        """Bulk ingestion mode for filling an empty graph (full builds).
+
+        Writes go to a scratch DB next to the graph, with _BULK_PRAGMAS and
+        without the _DEFERRED_INDEXES. When the load completes the indexes
+        are built there and the result is copied into the graph in one step
+        (SQLite backup API), so concurrent readers, and the graph after a
+        crash, see either the old graph or the complete new one. On error
+        the scratch DB is dropped. A graph that is not empty is updated in
+        place as usual.
+        """
+        if self._conn.execute("SELECT 1 FROM nodes LIMIT 1").fetchone() is not None:
+            yield self
+            return
+        fd, scratch = tempfile.mkstemp(
+            prefix=f"{os.path.basename(self.db_path)}.",
+            suffix=".building",
+            dir=os.path.dirname(os.path.abspath(self.db_path)),
+        )
+        os.close(fd)
+        graph = self._conn
+        self._conn = sqlite3.connect(scratch, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        try:
+            for pragma in _BULK_PRAGMAS:
+                self._conn.execute(pragma)
+            self._init_schema()
+            for name in _DEFERRED_INDEXES:
+                self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+            self._conn.commit()
+            yield self
+            started = time.time()
+            self._conn.executescript(_SCHEMA_SQL)
+            self._conn.backup(graph)
+            log.info("[KG] Indexed and installed the bulk-loaded graph in %.1fs", time.time() - started)
+        finally:
+            self._conn.close()
+            self._conn = graph
+            for path in (scratch, f"{scratch}-journal"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def resolve_calls(self, all_edges: bool = False) -> Dict[str, int]:
+        """Resolve call targets to qualified names (see _CallResolver).
+
+        Incremental by default: the call edges of files stored since the
+        last pass, plus edges calling a name that was defined or removed
+        since then. Every call edge with `all_edges`, or after a migration.
+        """
+        all_edges = all_edges or self._conn.execute(
+            "SELECT 1 FROM edges WHERE kind = 'CALLS' AND target_name IS NULL LIMIT 1"
+        ).fetchone() is not None
+        columns = "id, source_qualified, file_path, target_raw"
+        if all_edges:
+            rows = self._conn.execute(f"SELECT {columns} FROM edges WHERE kind = 'CALLS'").fetchall()
+        else:
+            by_id: Dict[int, sqlite3.Row] = {}
+            for column, values in (("file_path", self._dirty_files), ("target_name", self._dirty_names)):
+                values = sorted(values)
+                for i in range(0, len(values), 450):
+                    batch = values[i : i + 450]
+                    placeholders = ",".join("?" for _ in batch)
+                    for r in self._conn.execute(
+                        f"SELECT {columns} FROM edges WHERE kind = 'CALLS' AND {column} IN ({placeholders})",
+                        batch,
+                    ):
+                        by_id[r["id"]] = r
+            rows = list(by_id.values())
+        self._dirty_files.clear()
+        self._dirty_names.clear()
+
+        resolver = _CallResolver(self._conn)
+        updates = []
+        for r in rows:
+            raw = r["target_raw"]
+            target = resolver.resolve(r["source_qualified"], r["file_path"], raw)
+            updates.append((target or raw, int(target is not None), _split_target(raw)[1], r["id"]))
+        resolved = sum(u[1] for u in updates)
+        if updates:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE edges SET target_qualified = ?, resolved = ?, target_name = ? WHERE id = ?",
+                    updates,
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            log.info("[KG] Resolved %d/%d call edges", resolved, len(updates))
+        return {"calls_checked": len(updates), "calls_resolved": resolved}
+
     def get_nodes_by_file(self, file_path: str) -> List[Dict[str, Any]]:
         rows = self._conn.execute(
             "SELECT * FROM nodes WHERE file_path = ?", (file_path,)
         ).fetchall()
         return [dict(r) for r in rows]
 
+    def get_file_hashes(self) -> Dict[str, str]:
+        """file_path -> file_hash of every file in the graph."""
+        rows = self._conn.execute(
+            "SELECT file_path, MAX(file_hash) FROM nodes GROUP BY file_path"
+        ).fetchall()
+        return {r[0]: r[1] or "" for r in rows}
+
     def get_all_files(self) -> List[str]:
         rows = self._conn.execute(
             "SELECT DISTINCT file_path FROM nodes WHERE kind = 'File'"
@@ -296,6 +764,8 @@ class GraphStore:
             self._conn.execute(
                 "INSERT OR IGNORE INTO _impact_seeds (qn) VALUES (?)", (s,)
             )
+        # End the implicit transaction so later BEGIN IMMEDIATE writes work
+        self._conn.commit()
 
         cte_sql = """
         WITH RECURSIVE impacted(node_qn, depth) AS (
@@ -306,12 +776,14 @@ class GraphStore:
             JOIN edges e ON e.source_qualified = i.node_qn
             WHERE i.depth < ?
               AND e.kind IN ('CALLS', 'CONTAINS', 'INHERITS', 'IMPLEMENTS')
+              AND e.resolved = 1
             UNION
             SELECT e.source_qualified, i.depth + 1
             FROM impacted i
             JOIN edges e ON e.target_qualified = i.node_qn
             WHERE i.depth < ?
               AND e.kind IN ('CALLS', 'CONTAINS', 'INHERITS', 'IMPLEMENTS')
+              AND e.resolved = 1
         )
         SELECT DISTINCT node_qn, MIN(depth) AS min_depth
         FROM impacted
@@ -555,7 +1027,7 @@ class MultiLangParser:
             ls = spec.start_point[0] + 1
             qname = f"{fp}::{alias}"
             nodes.append(NodeInfo(kind="Import", name=alias, file_path=fp, line_start=ls, line_end=ls, qualified_name=qname))
-            edges.append(EdgeInfo(kind="IMPORTS_FROM", source=fp, target=path_text, file_path=fp, line=ls))
+            edges.append(EdgeInfo(kind="IMPORTS_FROM", source=fp, target=path_text, file_path=fp, line=ls, extra={"alias": alias}))
 
     def _extract_calls_go(self, node, src, fp, parent_qn, declared):
         edges: List[EdgeInfo] = []
@@ -598,6 +1070,8 @@ class MultiLangParser:
                 self._py_function(actual, file_path, source_bytes, nodes, edges, declared)
             elif actual.type == "class_definition":
                 self._py_class(actual, file_path, source_bytes, nodes, edges, declared)
+            elif actual.type in ("import_statement", "import_from_statement"):
+                self._py_import(actual, file_path, source_bytes, edges)
             else:
                 for c in node.children:
                     walk(c)
@@ -627,6 +1101,28 @@ class MultiLangParser:
         if body:
             edges.extend(self._extract_calls_py(body, src, fp, qname, declared))
 
+    def _py_import(self, node, fp, src, edges):
+        """IMPORTS_FROM edges; extra carries the local alias, the module it is
+        bound to and, for `from m import x`, the imported name."""
+        ls = node.start_point[0] + 1
+        module_node = node.child_by_field_name("module_name")
+        from_module = _node_text(module_node, src) if module_node else ""
+        for name_node in node.children_by_field_name("name"):
+            if name_node.type == "aliased_import":
+                imported = _node_text(name_node.child_by_field_name("name"), src)
+                alias = _node_text(name_node.child_by_field_name("alias"), src)
+            else:
+                imported = alias = _node_text(name_node, src)
+            if node.type == "import_from_statement":
+                extra = {"alias": alias, "module": from_module, "name": imported}
+                target = from_module
+            else:
+                # `import a.b` binds `a`; `import a.b as x` binds `x` to a.b
+                bound = imported if alias != imported else imported.split(".")[0]
+                extra = {"alias": alias.split(".")[0], "module": bound}
+                target = imported
+            edges.append(EdgeInfo(kind="IMPORTS_FROM", source=fp, target=target, file_path=fp, line=ls, extra=extra))
+
     def _py_class(self, node, fp, src, nodes, edges, declared):
         name_node = node.child_by_field_name("name")
         if not name_node:
@@ -985,7 +1481,7 @@ class MultiLangParser:
         n = NodeInfo(kind=kind, name=name, file_path=fp, line_start=ls, line_end=node.end_point[0] + 1, qualified_name=qname, parent_name=parent, params=params)
         nodes.append(n)
         declared[name] = qname
-        container = cls if cls else fp
+        container = f"{fp}::{cls}" if cls else fp
         edges.append(EdgeInfo(kind="CONTAINS", source=container, target=qname, file_path=fp, line=ls))
         body = node.child_by_field_name("body")
         if body:
@@ -1150,53 +1646,242 @@ class RegexFallbackParser:
         return nodes, edges
 
 
+# ---------------------------------------------------------------------------
+# Parallel parsing
+# ---------------------------------------------------------------------------
+
+# Below this many files a process pool costs more than it saves
+_PARALLEL_MIN_FILES = 200
+# Parsed files written per transaction during a full build
+_STORE_BATCH_FILES = 256
+# Files per pool task, and tasks in flight per worker (bounds buffered results)
+_PARSE_CHUNK = 32
+_CHUNKS_IN_FLIGHT = 4
+# Files per ContentReader call during a full build from contents
+_READ_BATCH = 500
+
+_worker_parser: Optional[MultiLangParser] = None
+# Pool workers start from a clean interpreter rather than a fork of this
+# process: tree-sitter-language-pack runs native threads (grammar downloads)
+# that a forked child can deadlock on
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# (file_path, file_hash, nodes, edges, error); nodes is None when the file is
+# unchanged (hash matches the graph) or could not be read / parsed
+ParsedFile = Tuple[str, str, Optional[List[NodeInfo]], Optional[List[EdgeInfo]], Optional[str]]
+# (file_path, known_hash, contents); contents None: read the file under the root
+ParseJob = Tuple[str, Optional[str], Optional[bytes]]
+# Contents of many repo-relative paths (missing files left out)
+ContentReader = Callable[[List[str]], Dict[str, bytes]]
+
+
+def _parse_source(
+    parser: MultiLangParser, file_path: str, raw: bytes, known_hash: Optional[str]
+) -> ParsedFile:
+    try:
+        fhash = hashlib.sha256(raw).hexdigest()
+        if known_hash == fhash:
+            return file_path, fhash, None, None, None
+        source = raw.decode("utf-8", errors="ignore")
+        nodes, edges = parser.parse(file_path, source)
+        return file_path, fhash, nodes, edges, None
+    except Exception as e:
+        return file_path, "", None, None, f"[KG] Failed to parse {file_path}: {e}"
+
+
+def _parse_path(
+    parser: MultiLangParser, file_path: str, known_hash: Optional[str], root: str = ""
+) -> ParsedFile:
+    """Parse `file_path`, read from under `root` (graph paths are repo-relative)."""
+    try:
+        with open(os.path.join(root, file_path), "rb") as f:
+            raw = f.read()
+    except Exception as e:
+        return file_path, "", None, None, f"[KG] Failed to read {file_path}: {e}"
+    return _parse_source(parser, file_path, raw, known_hash)
+
+
+def _parse_job(parser: MultiLangParser, job: ParseJob, root: str) -> ParsedFile:
+    file_path, known_hash, raw = job
+    if raw is None:
+        return _parse_path(parser, file_path, known_hash, root)
+    return _parse_source(parser, file_path, raw, known_hash)
+
+
+def _parse_chunk(jobs: List[ParseJob], root: str) -> List[ParsedFile]:
+    """Pool task: parse jobs with this process's parser."""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = MultiLangParser()
+    return [_parse_job(_worker_parser, job, root) for job in jobs]
+
+
+def _parse_parallel(jobs: Iterable[ParseJob], workers: int, root: str) -> Iterator[ParsedFile]:
+    """Parse jobs in a process pool, yielding results in job order.
+
+    Jobs are pulled lazily and only workers * _CHUNKS_IN_FLIGHT chunks are
+    outstanding at a time, so neither sources nor parsed files pile up when
+    the reader or the writer is slower than the parsers.
+    """
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as pool:
+        pending: Deque[Any] = deque()
+        while True:
+            while len(pending) < workers * _CHUNKS_IN_FLIGHT:
+                chunk = list(itertools.islice(jobs, _PARSE_CHUNK))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_parse_chunk, chunk, root))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
 # ---------------------------------------------------------------------------
 # KnowledgeGraph (Orchestrator)
 # ---------------------------------------------------------------------------
 
 
+def graph_db_path(repo_id: str) -> str:
+    """Graph DB of a repository under KG_DB_DIR; `repo_id` (the git common
+    dir) is the same for all worktrees of the repo, so they share one graph."""
+    repo_id = repo_id.rstrip(os.sep)
+    name = os.path.basename(repo_id)
+    if name == ".git":
+        name = os.path.basename(os.path.dirname(repo_id))
+    digest = hashlib.sha256(repo_id.encode()).hexdigest()[:8]
+    return os.path.join(Config.KG_DB_DIR, f"{name or 'repo'}-{digest}.db")
+
+
 class KnowledgeGraph:
-    """High-level orchestrator for building and querying the code graph."""
+    """High-level orchestrator for building and querying the code graph.
+
+    Files are stored under their path relative to `root_dir`, so checkouts
+    of the same repository in different places can share one graph. The
+    public methods accept absolute or repo-relative paths.
+    """
 
     def __init__(self, root_dir: str, db_path: str = "code_graph.db"):
         self.root_dir = root_dir
         self.store = GraphStore(db_path)
         self.parser = MultiLangParser()
 
+    def _rel(self, path: str) -> str:
+        """Graph key of a file: its path relative to root_dir."""
+        if os.path.isabs(path):
+            return os.path.relpath(path, os.path.abspath(self.root_dir))
+        return os.path.normpath(path)
+
     def parse_project(self, changed_files: Optional[List[str]] = None) -> Dict[str, Any]:
         if changed_files is not None:
-            return self._incremental_build(changed_files)
+            return self._incremental_build([self._rel(f) for f in changed_files])
         return self._full_build()
 
-    def _full_build(self) -> Dict[str, Any]:
-        log.info("[KG] Full graph build from: %s", self.root_dir)
-        all_files: List[str] = []
-        for root, _, files in os.walk(self.root_dir):
-            for f in files:
-                ext = Path(f).suffix.lower()
-                if ext in MultiLangParser.EXT_TO_LANG:
-                    all_files.append(os.path.join(root, f))
+    def build_from_contents(self, files: List[str], read: ContentReader) -> Dict[str, Any]:
+        """Full build of repo-relative `files` with contents from `read`
+        instead of the working tree (e.g. the git objects of a revision).
+
+        Parses in the process pool and resolves calls once, as parse_project().
+        """
+        return self._full_build(files, read)
+
+    def _full_build(
+        self, all_files: Optional[List[str]] = None, read: Optional[ContentReader] = None
+    ) -> Dict[str, Any]:
+        if all_files is None:
+            log.info("[KG] Full graph build from: %s", self.root_dir)
+            all_files = []
+            for root, _, files in os.walk(self.root_dir):
+                for f in files:
+                    ext = Path(f).suffix.lower()
+                    if ext in MultiLangParser.EXT_TO_LANG:
+                        all_files.append(os.path.relpath(os.path.join(root, f), self.root_dir))
+        else:
+            log.info("[KG] Full graph build of %d files from contents", len(all_files))
+            all_files = [self._rel(f) for f in all_files]
 
         existing = set(self.store.get_all_files())
         current = set(all_files)
-        for stale in existing - current:
-            self.store.remove_file_data(stale)
 
         total_nodes = 0
         total_edges = 0
-        for i, fp in enumerate(all_files, 1):
-            nodes, edges = self._process_file(fp)
-            total_nodes += len(nodes)
-            total_edges += len(edges)
-            if i % 50 == 0 or i == len(all_files):
-                log.info("[KG] Progress: %d/%d files parsed", i, len(all_files))
+        with self.store.bulk_load():
+            self.store.remove_files(sorted(existing - current))
+            batch: List[FileGraph] = []
+            parsed = 0
+            for parsed, (fp, fhash, nodes, edges, error) in enumerate(self._parse_all(all_files, read), 1):
+                if error:
+                    log.error(error)
+                elif nodes is not None:
+                    batch.append((fp, nodes, edges, fhash))
+                if len(batch) >= _STORE_BATCH_FILES:
+                    n_nodes, n_edges = self._store_batch(batch)
+                    total_nodes += n_nodes
+                    total_edges += n_edges
+                    batch = []
+                if parsed % 50 == 0:
+                    log.info("[KG] Progress: %d/%d files parsed", parsed, len(all_files))
+            if batch:
+                n_nodes, n_edges = self._store_batch(batch)
+                total_nodes += n_nodes
+                total_edges += n_edges
+            log.info("[KG] Progress: %d/%d files parsed", parsed, len(all_files))
+        calls = self.store.resolve_calls()
 
         stats = self.store.get_stats()
         log.info(
             "[KG] Full build complete. Files: %d | Nodes: %d | Edges: %d",
             len(all_files), stats["total_nodes"], stats["total_edges"],
         )
-        return {"files_parsed": len(all_files), "total_nodes": total_nodes, "total_edges": total_edges}
+        return {"files_parsed": parsed, "total_nodes": total_nodes, "total_edges": total_edges, **calls}
+
+    def _parse_all(self, files: List[str], read: Optional[ContentReader] = None) -> Iterator[ParsedFile]:
+        """Parse files in order, in a process pool for large builds.
+
+        Results come back in `files` order and this process is the only
+        writer, so the graph is the same as after a serial build. With
+        `read`, sources are fetched _READ_BATCH files at a time as the
+        parsers need them; files it does not return are skipped.
+        """
+        hashes = self.store.get_file_hashes()
+
+        def _jobs() -> Iterator[ParseJob]:
+            if read is None:
+                for fp in files:
+                    yield fp, hashes.get(fp), None
+                return
+            for i in range(0, len(files), _READ_BATCH):
+                batch = files[i:i + _READ_BATCH]
+                contents = read(batch)
+                for fp in batch:
+                    if fp in contents:
+                        yield fp, hashes.get(fp), contents[fp]
+                    else:
+                        log.debug("[KG] No contents for %s, skipped", fp)
+
+        jobs = _jobs()
+        workers = min(Config.KG_BUILD_WORKERS or os.cpu_count() or 1, len(files))
+        if workers > 1 and len(files) >= _PARALLEL_MIN_FILES:
+            log.info("[KG] Parsing %d files with %d worker processes", len(files), workers)
+            pulled: Deque[ParseJob] = deque()  # handed to the pool, result not yet yielded
+
+            def _feed() -> Iterator[ParseJob]:
+                for job in jobs:
+                    pulled.append(job)
+                    yield job
+
+            try:
+                for parsed in _parse_parallel(_feed(), workers, self.root_dir):
+                    pulled.popleft()
+                    yield parsed
+                return
+            except Exception as e:
+                log.warning(f"[KG] Parse pool failed ({e}); parsing the rest in-process")
+            jobs = itertools.chain(list(pulled), jobs)
+        for job in jobs:
+            yield _parse_job(self.parser, job, self.root_dir)
 
     def _incremental_build(self, changed_files: List[str]) -> Dict[str, Any]:
         log.info("[KG] Incremental build for %d files", len(changed_files))
@@ -1207,42 +1892,95 @@ class KnowledgeGraph:
             ext = Path(fp).suffix.lower()
             if ext not in MultiLangParser.EXT_TO_LANG:
                 continue
-            abs_path = fp if os.path.isabs(fp) else os.path.join(self.root_dir, fp)
-            if not os.path.exists(abs_path):
-                self.store.remove_file_data(abs_path)
+            if not os.path.exists(os.path.join(self.root_dir, fp)):
+                self.store.remove_file_data(fp)
                 continue
-            nodes, edges = self._process_file(abs_path)
+            nodes, edges = self._process_file(fp)
             total_nodes += len(nodes)
             total_edges += len(edges)
             processed += 1
+        calls = self.store.resolve_calls()
 
         stats = self.store.get_stats()
         log.info(
             "[KG] Incremental build complete. Processed: %d | Nodes: %d | Edges: %d",
             processed, stats["total_nodes"], stats["total_edges"],
         )
-        return {"files_parsed": processed, "total_nodes": total_nodes, "total_edges": total_edges}
+        return {"files_parsed": processed, "total_nodes": total_nodes, "total_edges": total_edges, **calls}
+
+    def update_from_contents(self, contents: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        """Incrementally update the graph from in-memory file contents.
+
+        Used when the reviewed revision is not the working tree (e.g. batch
+        review of historical commits). A None content removes the file.
+        """
+        total_nodes = 0
+        total_edges = 0
+        processed = 0
+        for fp, content in contents.items():
+            if Path(fp).suffix.lower() not in MultiLangParser.EXT_TO_LANG:
+                continue
+            fp = self._rel(fp)
+            if content is None:
+                self.store.remove_file_data(fp)
+                continue
+            nodes, edges = self._process_source(fp, content.encode("utf-8"))
+            total_nodes += len(nodes)
+            total_edges += len(edges)
+            processed += 1
+        calls = self.store.resolve_calls()
+        log.info("[KG] Updated %d files from revision contents", processed)
+        return {"files_parsed": processed, "total_nodes": total_nodes, "total_edges": total_edges, **calls}
 
     def _process_file(self, file_path: str) -> Tuple[List[NodeInfo], List[EdgeInfo]]:
-        try:
-            with open(file_path, "rb") as f:
-                raw = f.read()
-            fhash = hashlib.sha256(raw).hexdigest()
+        known = self.store.get_nodes_by_file(file_path)
+        parsed = _parse_path(
+            self.parser, file_path, known[0].get("file_hash") if known else None, self.root_dir
+        )
+        return self._store_parsed(parsed)
 
-            existing = self.store.get_nodes_by_file(file_path)
-            if existing and existing[0].get("file_hash") == fhash:
-                return [], []
+    def _process_source(self, file_path: str, raw: bytes) -> Tuple[List[NodeInfo], List[EdgeInfo]]:
+        known = self.store.get_nodes_by_file(file_path)
+        parsed = _parse_source(self.parser, file_path, raw, known[0].get("file_hash") if known else None)
+        return self._store_parsed(parsed)
+
+    def _store_batch(self, batch: List[FileGraph]) -> Tuple[int, int]:
+        """Store parsed files in one transaction; file by file if that fails."""
+        try:
+            self.store.store_files(batch)
+            return sum(len(b[1]) for b in batch), sum(len(b[2]) for b in batch)
+        except Exception as e:
+            log.warning(f"[KG] Batch write of {len(batch)} files failed ({e}); retrying per file")
+        total_nodes = total_edges = 0
+        for fp, nodes, edges, fhash in batch:
+            nodes, edges = self._store_parsed((fp, fhash, nodes, edges, None))
+            total_nodes += len(nodes)
+            total_edges += len(edges)
+        return total_nodes, total_edges
 
-            source = raw.decode("utf-8", errors="ignore")
-            nodes, edges = self.parser.parse(file_path, source)
+    def _store_parsed(self, parsed: ParsedFile) -> Tuple[List[NodeInfo], List[EdgeInfo]]:
+        file_path, fhash, nodes, edges, error = parsed
+        if error:
+            log.error(error)
+            return [], []
+        if nodes is None:
+            return [], []
+        try:
             self.store.store_file_nodes_edges(file_path, nodes, edges, fhash)
-            return nodes, edges
         except Exception as e:
-            log.error("[KG] Failed to parse %s: %s", file_path, e)
+            log.error("[KG] Failed to store %s: %s", file_path, e)
             return [], []
+        return nodes, edges
 
-    def get_impact_report(self, changed_files: List[str]) -> str:
-        result = self.store.get_impact_radius(changed_files)
+    def get_impact_report(
+        self,
+        changed_files: List[str],
+        max_depth: int = 2,
+        result: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Markdown impact report; pass `result` to reuse get_impact_data output."""
+        if result is None:
+            result = self.get_impact_data(changed_files, max_depth=max_depth)
         if not result["impacted_nodes"]:
             return "No dependency impact detected beyond changed files."
         lines = [
@@ -1259,8 +1997,11 @@ class KnowledgeGraph:
             lines.append(f"- ... and {len(result['impacted_files']) - 15} more")
         return "\n".join(lines)
 
-    def get_impact_data(self, changed_files: List[str]) -> Dict[str, Any]:
-        return self.store.get_impact_radius(changed_files)
+    def get_impact_data(self, changed_files: List[str], max_depth: int = 2) -> Dict[str, Any]:
+        return self.store.get_impact_radius([self._rel(f) for f in changed_files], max_depth=max_depth)
+
+    def get_nodes_by_file(self, file_path: str) -> List[Dict[str, Any]]:
+        return self.store.get_nodes_by_file(self._rel(file_path))
 
     def close(self) -> None:
         self.store.close()
@@ -0,0 +1,593 @@
+"""
+Durable review job queue with a worker pool.
+
+One host can review many repos / PRs concurrently:
+- SQLite-backed queue (WAL mode), survives worker and host restarts
+- Priorities derived from branch patterns (release branches first)
+- Per-repo concurrency limits; each running job gets its own worktree slot
+- Retries with exponential backoff, leases to recover crashed workers
+- Deduplication of jobs for the same (repo, target, head SHA)
+- Supersede-and-cancel: a newer head for the same review key (branch/PR)
+  drops queued older jobs and cancels the running one between stages
+
+Usage:
+  python job_queue.py enqueue --repo /path/to/repo --branch feature/x
+  python job_queue.py work --workers 8
+  python job_queue.py status --watch
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from cancellation import CancelToken, ReviewCancelled
+from config import Config
+from logger import log
+
+# ---------------------------------------------------------------------------
+# SQLite Schema
+# ---------------------------------------------------------------------------
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    repo_path TEXT NOT NULL,
+    branch TEXT NOT NULL DEFAULT '',
+    review_key TEXT NOT NULL DEFAULT '',
+    target_branch TEXT NOT NULL DEFAULT '',
+    head_sha TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after REAL NOT NULL DEFAULT 0,
+    slot INTEGER,
+    worker TEXT,
+    lease_expires REAL,
+    verdict TEXT,
+    result_path TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedupe
+    ON jobs(repo_path, target_branch, head_sha)
+    WHERE status IN ('queued', 'running', 'done');
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, priority, run_after);
+CREATE INDEX IF NOT EXISTS idx_jobs_repo ON jobs(repo_path, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs(repo_path, review_key, status);
+"""
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "superseded")
+
+
+def _parse_priority_rules(spec: str) -> List[tuple]:
+    rules = []
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        pattern, prio = part.rsplit("=", 1)
+        try:
+            rules.append((pattern.strip(), int(prio)))
+        except ValueError:
+            log.warning(f"Ignoring bad JOB_PRIORITY_RULES entry: {part}")
+    return rules
+
+
+def branch_priority(branch: str) -> int:
+    """Priority for a branch according to JOB_PRIORITY_RULES (default 0)."""
+    for pattern, prio in _parse_priority_rules(Config.JOB_PRIORITY_RULES):
+        if fnmatch.fnmatch(branch, pattern):
+            return prio
+    return 0
+
+
+def _resolve_sha(repo_path: str, rev: str) -> str:
+    return subprocess.run(
+        ["git", "-C", repo_path, "rev-parse", "--verify", f"{rev}^{{commit}}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+# ---------------------------------------------------------------------------
+# JobQueue
+# ---------------------------------------------------------------------------
+
+
+class JobQueue:
+    """SQLite-backed durable queue of review jobs."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.JOB_QUEUE_DB
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._lock = threading.Lock()
+        self._migrate()
+        self._conn.executescript(_SCHEMA_SQL)
+        self._conn.commit()
+
+    def _migrate(self) -> None:
+        """Add columns introduced after the first queue schema."""
+        cols = {r[1] for r in self._conn.execute("PRAGMA table_info(jobs)")}
+        if cols and "cancel_requested" not in cols:
+            self._conn.execute(
+                "ALTER TABLE jobs ADD COLUMN cancel_requested INTEGER NOT NULL DEFAULT 0"
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ----- producer side -----
+
+    def enqueue(
+        self,
+        repo_path: str,
+        head_sha: str,
+        branch: str = "",
+        target_branch: str = "",
+        priority: Optional[int] = None,
+        review_key: str = "",
+        max_attempts: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Add a job; returns the existing job instead when it is a duplicate."""
+        repo_path = os.path.abspath(repo_path)
+        if priority is None:
+            priority = branch_priority(branch)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._conn.execute(
+                    """INSERT OR IGNORE INTO jobs
+                       (repo_path, branch, review_key, target_branch, head_sha,
+                        priority, max_attempts, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        repo_path,
+                        branch,
+                        review_key or branch,
+                        target_branch,
+                        head_sha,
+                        priority,
+                        max_attempts or Config.JOB_MAX_ATTEMPTS,
+                        time.time(),
+                    ),
+                )
+                if cur.rowcount:
+                    job_id, duplicate = cur.lastrowid, False
+                    self._supersede_older(repo_path, review_key or branch, job_id)
+                else:
+                    row = self._conn.execute(
+                        """SELECT id FROM jobs
+                           WHERE repo_path = ? AND target_branch = ? AND head_sha = ?
+                             AND status IN ('queued', 'running', 'done')""",
+                        (repo_path, target_branch, head_sha),
+                    ).fetchone()
+                    job_id, duplicate = row["id"], True
+                    # A duplicate may still raise the priority of a queued job
+                    self._conn.execute(
+                        "UPDATE jobs SET priority = MAX(priority, ?) "
+                        "WHERE id = ? AND status = 'queued'",
+                        (priority, job_id),
+                    )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        job = self.get(job_id)
+        job["duplicate"] = duplicate
+        return job
+
+    def _supersede_older(self, repo_path: str, review_key: str, job_id: int) -> None:
+        """Drop queued and cancel running jobs of the same branch/PR."""
+        if not review_key:
+            return
+        cur = self._conn.execute(
+            """UPDATE jobs SET status = 'superseded', finished_at = ?,
+                 error = 'superseded by job ' || ?
+               WHERE repo_path = ? AND review_key = ? AND id < ? AND status = 'queued'""",
+            (time.time(), job_id, repo_path, review_key, job_id),
+        )
+        if cur.rowcount:
+            log.info(f"[Queue] Job {job_id} superseded {cur.rowcount} queued job(s) for {review_key}")
+        cur = self._conn.execute(
+            """UPDATE jobs SET cancel_requested = 1
+               WHERE repo_path = ? AND review_key = ? AND id < ? AND status = 'running'""",
+            (repo_path, review_key, job_id),
+        )
+        if cur.rowcount:
+            log.info(f"[Queue] Job {job_id} requested cancel of {cur.rowcount} running job(s) for {review_key}")
+
+    def is_cancel_requested(self, job_id: int) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def get(self, job_id: int) -> Dict[str, Any]:
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else {}
+
+    # ----- consumer side -----
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Atomically lease the next runnable job, honoring per-repo limits."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._requeue_expired(now)
+                running = self._conn.execute(
+                    "SELECT repo_path, slot FROM jobs WHERE status = 'running'"
+                ).fetchall()
+                busy: Dict[str, set] = {}
+                for r in running:
+                    busy.setdefault(r["repo_path"], set()).add(r["slot"])
+
+                candidates = self._conn.execute(
+                    """SELECT * FROM jobs
+                       WHERE status = 'queued' AND run_after <= ?
+                       ORDER BY priority DESC, created_at ASC
+                       LIMIT 200""",
+                    (now,),
+                ).fetchall()
+                job = None
+                for c in candidates:
+                    used = busy.get(c["repo_path"], set())
+                    if len(used) >= Config.JOB_REPO_CONCURRENCY:
+                        continue
+                    slot = next(i for i in range(Config.JOB_REPO_CONCURRENCY + 1) if i not in used)
+                    self._conn.execute(
+                        """UPDATE jobs SET status = 'running', slot = ?, worker = ?,
+                             attempts = attempts + 1, started_at = ?, lease_expires = ?
+                           WHERE id = ?""",
+                        (slot, worker, now, now + Config.JOB_LEASE_SEC, c["id"]),
+                    )
+                    job = dict(c)
+                    job.update(slot=slot, worker=worker, attempts=c["attempts"] + 1)
+                    break
+                self._conn.commit()
+                return job
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def _requeue_expired(self, now: float) -> None:
+        """Return jobs whose worker stopped heart-beating to the queue."""
+        expired = self._conn.execute(
+            "SELECT id, worker FROM jobs WHERE status = 'running' AND lease_expires < ?",
+            (now,),
+        ).fetchall()
+        for r in expired:
+            log.warning(f"[Queue] Lease expired for job {r['id']} (worker {r['worker']}), requeueing")
+        self._conn.execute(
+            """UPDATE jobs SET
+                 status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                 finished_at = CASE WHEN attempts >= max_attempts THEN ? ELSE NULL END,
+                 error = 'lease expired', slot = NULL, worker = NULL
+               WHERE status = 'running' AND lease_expires < ?""",
+            (now, now),
+        )
+
+    # heartbeat / complete / supersede / fail only touch a job the calling
+    # worker still holds: once its lease expired and the job was requeued or
+    # claimed by another worker they return False and change nothing.
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                """UPDATE jobs SET lease_expires = ?
+                   WHERE id = ? AND worker = ? AND status = 'running'""",
+                (time.time() + Config.JOB_LEASE_SEC, job_id, worker),
+            )
+            self._conn.commit()
+            return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, verdict: str, result_path: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                """UPDATE jobs SET status = 'done', verdict = ?, result_path = ?,
+                     error = NULL, finished_at = ?, slot = NULL, lease_expires = NULL
+                   WHERE id = ? AND worker = ? AND status = 'running'""",
+                (verdict, result_path, time.time(), job_id, worker),
+            )
+            self._conn.commit()
+            return cur.rowcount == 1
+
+    def supersede(self, job_id: int, worker: str, reason: str) -> bool:
+        """Finish a cancelled job without retrying it."""
+        with self._lock:
+            cur = self._conn.execute(
+                """UPDATE jobs SET status = 'superseded', error = ?, finished_at = ?,
+                     slot = NULL, lease_expires = NULL
+                   WHERE id = ? AND worker = ? AND status = 'running'""",
+                (reason, time.time(), job_id, worker),
+            )
+            self._conn.commit()
+            return cur.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        """Record a failure; reschedules with backoff until attempts run out."""
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT attempts, max_attempts FROM jobs
+                   WHERE id = ? AND worker = ? AND status = 'running'""",
+                (job_id, worker),
+            ).fetchone()
+            if row is None:
+                return False
+            if row["attempts"] < row["max_attempts"]:
+                delay = Config.JOB_RETRY_BACKOFF_SEC * (2 ** max(row["attempts"] - 1, 0))
+                self._conn.execute(
+                    """UPDATE jobs SET status = 'queued', error = ?, run_after = ?,
+                         slot = NULL, worker = NULL, lease_expires = NULL
+                       WHERE id = ?""",
+                    (error, time.time() + delay, job_id),
+                )
+                log.warning(f"[Queue] Job {job_id} failed, retry in {delay}s: {error}")
+            else:
+                self._conn.execute(
+                    """UPDATE jobs SET status = 'failed', error = ?, finished_at = ?,
+                         slot = NULL, lease_expires = NULL
+                       WHERE id = ?""",
+                    (error, time.time(), job_id),
+                )
+                log.error(f"[Queue] Job {job_id} failed permanently: {error}")
+            self._conn.commit()
+            return True
+
+    # ----- reporting -----
+
+    def stats(self) -> Dict[str, int]:
+        counts = {s: 0 for s in JOB_STATUSES}
+        for r in self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[r["status"]] = r["n"]
+        return counts
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        if status:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY priority DESC, id DESC LIMIT ?",
+                (status, limit),
+            )
+        else:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+        return [dict(r) for r in rows]
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+
+def _repo_slug(repo_path: str) -> str:
+    name = os.path.basename(repo_path.rstrip(os.sep)) or "repo"
+    return f"{name}-{hashlib.sha256(repo_path.encode()).hexdigest()[:8]}"
+
+
+def _prepare_worktree(repo_path: str, slot: int, head_sha: str) -> str:
+    """Check out head_sha into the (reused) worktree of this repo slot."""
+    path = os.path.abspath(
+        os.path.join(Config.JOB_WORKTREE_DIR, _repo_slug(repo_path), f"slot-{slot}")
+    )
+    if not os.path.exists(os.path.join(path, ".git")):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        subprocess.run(
+            ["git", "-C", repo_path, "worktree", "add", "--force", "--detach", path, head_sha],
+            capture_output=True, text=True, check=True,
+        )
+    else:
+        subprocess.run(
+            ["git", "-C", path, "checkout", "--force", "--detach", head_sha],
+            capture_output=True, text=True, check=True,
+        )
+        subprocess.run(["git", "-C", path, "clean", "-fdq"], capture_output=True, check=True)
+    return path
+
+
+def _run_job(queue: JobQueue, job: Dict[str, Any]) -> None:
+    # Imported lazily so that `enqueue` / `status` work without LLM deps
+    from review_pipeline import ReviewPipeline
+
+    stop = threading.Event()
+    token = CancelToken()
+
+    def _beat():
+        # Poll for supersede requests often, renew the lease less often
+        beat_every = max(Config.JOB_LEASE_SEC / 3, 1)
+        last_beat = time.time()
+        while not stop.wait(Config.JOB_CANCEL_POLL_SEC):
+            if queue.is_cancel_requested(job["id"]):
+                token.cancel("superseded by a newer job")
+            if time.time() - last_beat >= beat_every:
+                if not queue.heartbeat(job["id"], job["worker"]):
+                    token.cancel("lease lost to another worker")
+                    return
+                last_beat = time.time()
+
+    beat = threading.Thread(target=_beat, daemon=True)
+    beat.start()
+    pipeline = None
+    try:
+        workdir = _prepare_worktree(job["repo_path"], job["slot"], job["head_sha"])
+        pipeline = ReviewPipeline(workdir)
+        result = pipeline.run(
+            target_branch=job["target_branch"] or None,
+            cancel_token=token,
+            review_key=job["review_key"] or None,
+        )
+        result.setdefault("_meta", {}).update(
+            job_id=job["id"], repo=job["repo_path"], branch=job["branch"], head_sha=job["head_sha"],
+        )
+        os.makedirs(Config.JOB_RESULTS_DIR, exist_ok=True)
+        # One file per attempt, so a worker that lost its lease cannot
+        # overwrite the result of the one that took the job over
+        result_path = os.path.abspath(os.path.join(
+            Config.JOB_RESULTS_DIR, f"job_{job['id']}.{job['attempts']}.json"
+        ))
+        with open(result_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        if queue.complete(job["id"], job["worker"], result.get("verdict", "WARN"), result_path):
+            log.info(f"[Worker] Job {job['id']} done: {result.get('verdict')}")
+        else:
+            os.remove(result_path)
+            log.warning(f"[Worker] Job {job['id']} lease lost; result discarded")
+    except ReviewCancelled as e:
+        if queue.supersede(job["id"], job["worker"], str(e)):
+            log.info(f"[Worker] Job {job['id']} cancelled: {e}")
+        else:
+            log.warning(f"[Worker] Job {job['id']} lease lost; stopped ({e})")
+    except Exception as e:
+        if not queue.fail(job["id"], job["worker"], f"{type(e).__name__}: {e}"):
+            log.warning(f"[Worker] Job {job['id']} lease lost; failure not recorded ({e})")
+    finally:
+        stop.set()
+        if pipeline is not None:
+            pipeline.close()
+
+
+def _worker_main(db_path: str, name: str, drain: bool, poll_sec: float) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # parent handles Ctrl-C
+    queue = JobQueue(db_path)
+    log.info(f"[Worker] {name} started")
+    while True:
+        job = queue.claim(name)
+        if job is None:
+            if drain and not queue.stats()["queued"] and not queue.stats()["running"]:
+                break
+            time.sleep(poll_sec)
+            continue
+        log.info(
+            f"[Worker] {name} took job {job['id']} "
+            f"({job['repo_path']} {job['branch'] or job['head_sha'][:10]}, "
+            f"prio {job['priority']}, attempt {job['attempts']})"
+        )
+        _run_job(queue, job)
+    queue.close()
+
+
+def run_workers(
+    workers: Optional[int] = None,
+    db_path: Optional[str] = None,
+    drain: bool = False,
+    poll_sec: float = 2.0,
+) -> None:
+    """Start a pool of worker processes and wait for them."""
+    n = workers or Config.JOB_WORKERS
+    db_path = db_path or Config.JOB_QUEUE_DB
+    JobQueue(db_path).close()  # create schema before workers race on it
+    host = socket.gethostname()
+    procs = [
+        multiprocessing.Process(
+            target=_worker_main,
+            args=(db_path, f"{host}:{os.getpid()}:w{i}", drain, poll_sec),
+            daemon=False,
+        )
+        for i in range(n)
+    ]
+    for p in procs:
+        p.start()
+    log.info(f"[Queue] {n} workers running on {db_path}")
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        log.warning("[Queue] Stopping workers; running jobs will be retried after lease expiry")
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _print_status(queue: JobQueue, limit: int) -> None:
+    counts = queue.stats()
+    print(" | ".join(f"{k}: {v}" for k, v in counts.items()))
+    jobs = queue.list_jobs("running", limit)
+    jobs += [j for j in queue.list_jobs(limit=limit) if j["status"] != "running"]
+    for job in jobs:
+        elapsed = ""
+        if job["status"] == "running" and job["started_at"]:
+            elapsed = f" {time.time() - job['started_at']:.0f}s"
+        print(
+            f"  #{job['id']:<5} {job['status']:<8}{elapsed} prio={job['priority']:<4} "
+            f"{os.path.basename(job['repo_path'])} {job['branch'] or '-'} "
+            f"{job['head_sha'][:10]} {job['verdict'] or ''} {job['error'] or ''}".rstrip()
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Review job queue")
+    parser.add_argument("--db", default=Config.JOB_QUEUE_DB, help="Queue database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_enq = sub.add_parser("enqueue", help="Queue a review job")
+    p_enq.add_argument("--repo", default=Config.PROJECT_ROOT)
+    p_enq.add_argument("--branch", default="", help="Branch / ref to review")
+    p_enq.add_argument("--head", default="", help="Head SHA (default: resolve --branch)")
+    p_enq.add_argument("--target", default=Config.TARGET_BRANCH, help="Target branch")
+    p_enq.add_argument("--priority", type=int, default=None)
+    p_enq.add_argument("--key", default="", help="Review key, e.g. PR number (default: branch)")
+
+    p_work = sub.add_parser("work", help="Run the worker pool")
+    p_work.add_argument("--workers", type=int, default=Config.JOB_WORKERS)
+    p_work.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+
+    p_stat = sub.add_parser("status", help="Show queue progress")
+    p_stat.add_argument("--watch", action="store_true")
+    p_stat.add_argument("--interval", type=float, default=2.0)
+    p_stat.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        rev = args.head or args.branch or "HEAD"
+        try:
+            head_sha = _resolve_sha(args.repo, rev)
+        except subprocess.CalledProcessError as e:
+            log.critical(f"Cannot resolve '{rev}' in {args.repo}: {e.stderr.strip()}")
+            sys.exit(1)
+        queue = JobQueue(args.db)
+        job = queue.enqueue(
+            args.repo, head_sha, branch=args.branch, target_branch=args.target,
+            priority=args.priority, review_key=args.key,
+        )
+        state = "duplicate of" if job["duplicate"] else "queued as"
+        print(f"{head_sha[:10]} {state} job #{job['id']} (status={job['status']}, prio={job['priority']})")
+    elif args.command == "work":
+        run_workers(args.workers, args.db, drain=args.drain)
+    elif args.command == "status":
+        queue = JobQueue(args.db)
+        while True:
+            if args.watch:
+                print("\033[2J\033[H", end="")
+            _print_status(queue, args.limit)
+            if not args.watch:
+                break
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Linter results produced earlier in CI, reused instead of re-running the tools.
+
+LINT_ARTIFACTS lists report files (globs, comma-separated), each optionally
+prefixed with the tool it came from ("checkstyle:build/checkstyle.xml").
+Supported formats, detected from the content:
+  - SARIF 2.1 (tool from runs[].tool.driver.name)
+  - checkstyle XML (also written by eslint -f checkstyle; tool from the
+    error `source`, else the file extension)
+  - golangci-lint JSON (--out-format=json)
+Findings are normalized to linter_runner's issue shape. A (file, tool) pair
+is covered when the artifact lists the file (checkstyle <file>, SARIF
+run.artifacts or a result); with LINT_ARTIFACTS_COVER_ALL an artifact
+covers every file of its tool, for CI jobs that lint the whole tree and
+only report files with findings. Paths are matched to the changed files
+directly, relative to the project root, or, for absolute paths outside it
+(CI checked the repo out elsewhere), by suffix. Artifacts are trusted to
+describe the reviewed revision.
+"""
+
+import codecs
+import glob
+import json
+import os
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlparse
+
+from config import Config
+from logger import log
+
+# SARIF driver names (lower-case) -> linter_runner tool names
+_SARIF_TOOLS: Dict[str, str] = {
+    "eslint": "eslint",
+    "pylint": "pylint",
+    "flake8": "flake8",
+    "golangci-lint": "golangci-lint",
+    "clippy": "cargo",
+    "cppcheck": "cppcheck",
+    "checkstyle": "checkstyle",
+}
+# Issue "linter" field per tool, as in live runs
+_LINTER_NAMES = {"cargo": "clippy"}
+# Tools that may write a checkstyle-format report, by file extension
+_CHECKSTYLE_EXT_TOOLS: Dict[str, str] = {
+    ".java": "checkstyle",
+    ".js": "eslint", ".jsx": "eslint", ".ts": "eslint", ".tsx": "eslint",
+    ".c": "cppcheck", ".cpp": "cppcheck", ".cc": "cppcheck", ".h": "cppcheck", ".hpp": "cppcheck",
+}
+_SARIF_LEVELS = {"error": "error", "warning": "warning", "note": "info", "none": "info"}
+
+Finding = Tuple[str, str, Optional[Dict[str, Any]]]  # (artifact path, tool, issue)
+
+
+class ArtifactResults:
+    """Issues per (changed file, tool) taken from CI artifacts."""
+
+    def __init__(self):
+        self.issues: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self.whole_tree: Set[str] = set()  # tools covering every file (COVER_ALL)
+        self.artifacts = 0
+
+    def covers(self, path: str, tool: str) -> bool:
+        return tool in self.whole_tree or (path, tool) in self.issues
+
+    def get(self, path: str, tool: str) -> Optional[List[Dict[str, Any]]]:
+        """Issues for `path` from `tool`, or None if no artifact covers it."""
+        if not self.covers(path, tool):
+            return None
+        return [dict(i) for i in self.issues.get((path, tool), [])]
+
+    def __len__(self) -> int:
+        return len(self.issues)
+
+
+def _issue(path: str, tool: str, line: Any, column: Any, severity: str, message: str) -> Dict[str, Any]:
+    return {
+        "file": path,
+        "line": int(line or 0),
+        "column": int(column or 0),
+        "severity": severity,
+        "message": message,
+        "linter": _LINTER_NAMES.get(tool, tool),
+    }
+
+
+def _uri_path(uri: str) -> str:
+    if uri.startswith("file:"):
+        return unquote(urlparse(uri).path)
+    return unquote(uri)
+
+
+# ---------------------------------------------------------------------------
+# Format parsers: yield (artifact path, tool, issue or None). A None issue
+# marks a file the tool checked; an empty path marks a run of the tool.
+# ---------------------------------------------------------------------------
+
+def _parse_sarif(data: Dict[str, Any], tool: Optional[str]) -> Iterable[Finding]:
+    for run in data.get("runs", []):
+        driver = run.get("tool", {}).get("driver", {}).get("name", "")
+        run_tool = tool or _SARIF_TOOLS.get(driver.lower())
+        if run_tool is None:
+            log.info(f"Lint artifacts: ignoring SARIF run from '{driver}' (no matching linter)")
+            continue
+        yield "", run_tool, None
+        # uriBaseId -> base URI (e.g. SRCROOT -> file:///ci/checkout/)
+        bases = {
+            k: _uri_path(v.get("uri", "")) for k, v in run.get("originalUriBaseIds", {}).items()
+        }
+
+        def _location_path(location: Dict[str, Any]) -> str:
+            uri = _uri_path(location.get("uri", ""))
+            base = bases.get(location.get("uriBaseId", ""), "")
+            return os.path.join(base, uri) if base and not os.path.isabs(uri) else uri
+
+        for artifact in run.get("artifacts", []):
+            path = _location_path(artifact.get("location", {}))
+            if path:
+                yield path, run_tool, None
+        for result in run.get("results", []):
+            locations = result.get("locations") or [{}]
+            physical = locations[0].get("physicalLocation", {})
+            path = _location_path(physical.get("artifactLocation", {}))
+            if not path:
+                continue
+            region = physical.get("region", {})
+            text = result.get("message", {}).get("text", "")
+            rule = result.get("ruleId")
+            yield path, run_tool, _issue(
+                path, run_tool, region.get("startLine"), region.get("startColumn"),
+                _SARIF_LEVELS.get(result.get("level", "warning"), "warning"),
+                f"[{rule}] {text}" if rule else text,
+            )
+
+
+def _checkstyle_tool(source: str, path: str) -> Optional[str]:
+    source = source.lower()
+    if source.startswith("eslint"):
+        return "eslint"
+    if "puppycrawl" in source or source.startswith("checkstyle"):
+        return "checkstyle"
+    return _CHECKSTYLE_EXT_TOOLS.get(os.path.splitext(path)[1])
+
+
+def _parse_checkstyle(root: ET.Element, tool: Optional[str]) -> Iterable[Finding]:
+    if tool:
+        yield "", tool, None
+    for file_el in root.iter("file"):
+        path = file_el.get("name", "")
+        errors = file_el.findall("error")
+        file_tool = tool or _checkstyle_tool(errors[0].get("source", "") if errors else "", path)
+        if not path or file_tool is None:
+            continue
+        yield path, file_tool, None
+        for err in errors:
+            source = err.get("source", "")
+            rule = source.rsplit(".", 1)[-1] if source else ""
+            message = err.get("message", "")
+            yield path, file_tool, _issue(
+                path, file_tool, err.get("line"), err.get("column"),
+                err.get("severity", "warning"),
+                f"[{rule}] {message}" if rule else message,
+            )
+
+
+def _parse_golangci(data: Dict[str, Any], tool: Optional[str]) -> Iterable[Finding]:
+    run_tool = tool or "golangci-lint"
+    yield "", run_tool, None
+    for issue in data.get("Issues") or []:
+        pos = issue.get("Pos", {})
+        path = pos.get("Filename", "")
+        if not path:
+            continue
+        found = _issue(
+            path, run_tool, pos.get("Line"), pos.get("Column"),
+            "error" if issue.get("Severity", "") == "error" else "warning",
+            issue.get("Text", ""),
+        )
+        found["linter"] = issue.get("FromLinter", "golangci-lint")
+        yield path, run_tool, found
+
+
+def _parse_file(path: str, tool: Optional[str]) -> Iterable[Finding]:
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    if raw.startswith(codecs.BOM_UTF8):
+        raw = raw[len(codecs.BOM_UTF8):]
+    if raw.lstrip()[:1] == b"<":
+        root = ET.fromstring(raw)
+        if root.tag != "checkstyle":
+            raise ValueError(f"unsupported XML report <{root.tag}>")
+        return list(_parse_checkstyle(root, tool))
+    data = json.loads(raw)
+    if "runs" in data:
+        return list(_parse_sarif(data, tool))
+    if "Issues" in data:
+        return list(_parse_golangci(data, tool))
+    raise ValueError("not a SARIF, checkstyle or golangci-lint report")
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _specs(spec: str, known_tools: Set[str]) -> List[Tuple[Optional[str], str]]:
+    """Parse LINT_ARTIFACTS into (tool or None, glob) pairs."""
+    specs = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        tool, sep, pattern = item.partition(":")
+        if sep and tool in known_tools:
+            specs.append((tool, pattern))
+        else:
+            specs.append((None, item))
+    return specs
+
+
+def _matcher(changed_files: List[str], project_root: str):
+    """Map a path from a report to the changed file it names, or None.
+
+    Relative paths are taken as relative to the project root. Absolute
+    paths under the root are mapped exactly; only absolute paths outside
+    it (checked out elsewhere in CI, possibly on Windows) are matched by
+    suffix, and never onto a file when a longer suffix of the path names
+    another file that exists in this tree.
+    """
+    changed = {os.path.normpath(f): f for f in changed_files}
+    root = os.path.realpath(project_root)
+
+    def _match(path: str) -> Optional[str]:
+        path = path.replace("\\", "/")
+        is_windows = len(path) > 2 and path[1] == ":" and path[2] == "/"
+        path = os.path.normpath(path)
+        if not os.path.isabs(path) and not is_windows:
+            return changed.get(path)
+        if not is_windows:
+            rel = os.path.relpath(os.path.realpath(path), root)
+            if rel != os.pardir and not rel.startswith(os.pardir + os.sep):
+                return changed.get(rel)
+        # Outside the project: the longest tail of the path that is a file here
+        parts = path.split(os.sep)
+        for i in range(1, len(parts)):
+            tail = os.path.join(*parts[i:])
+            if tail in changed:
+                return changed[tail]
+            if os.path.exists(os.path.join(root, tail)):
+                return None
+        return None
+
+    return _match
+
+
+def load_artifacts(
+    changed_files: List[str], project_root: str, known_tools: Set[str]
+) -> ArtifactResults:
+    """Read the LINT_ARTIFACTS reports and collect findings for `changed_files`."""
+    results = ArtifactResults()
+    if not Config.LINT_ARTIFACTS.strip():
+        return results
+    match = _matcher(changed_files, project_root)
+    seen: Set[Tuple[str, str, int, int, str]] = set()
+    for tool, pattern in _specs(Config.LINT_ARTIFACTS, known_tools):
+        paths = sorted(glob.glob(os.path.expanduser(pattern), recursive=True))
+        if not paths:
+            log.warning(f"Lint artifacts: nothing matches '{pattern}'")
+        for artifact in paths:
+            try:
+                findings = _parse_file(artifact, tool)
+            except (OSError, ValueError, ET.ParseError) as e:
+                log.warning(f"Lint artifacts: cannot read {artifact}: {e}")
+                continue
+            results.artifacts += 1
+            for path, found_tool, issue in findings:
+                if not path:
+                    if Config.LINT_ARTIFACTS_COVER_ALL:
+                        results.whole_tree.add(found_tool)
+                    continue
+                rel = match(path)
+                if rel is None:
+                    continue
+                issues = results.issues.setdefault((rel, found_tool), [])
+                if issue is None:
+                    continue
+                key = (rel, found_tool, issue["line"], issue["column"], issue["message"])
+                if key not in seen:  # the same finding in overlapping reports
+                    seen.add(key)
+                    issue["file"] = rel
+                    issues.append(issue)
+    return results
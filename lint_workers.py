@@ -0,0 +1,366 @@
+"""
+Persistent linter workers (LINT_PERSISTENT_WORKERS).
+
+Python linters pay interpreter start-up and module import (pylint's astroid
+in particular) on every run. In worker mode each such tool is served by a
+few long-lived Python processes that run the tool's CLI entry point
+in-process and return its stdout / stderr / exit code, so the caller parses
+the output exactly as for a subprocess run.
+
+Protocol: one JSON request per line on the worker's stdin
+  {"tool": "pylint", "args": [...], "cwd": "/path"}
+and one JSON response per line on its protocol channel
+  {"stdout": "...", "stderr": "...", "rc": 0, "rss_mb": 312.5}
+or {"unsupported": true} when the tool cannot be imported in this Python.
+
+A worker is restarted after a crash or timeout, and retired once its
+memory grows past LINT_WORKER_MAX_RSS_MB or it has served
+LINT_WORKER_MAX_REQUESTS runs. Tools without an in-process entry point
+(eslint, checkstyle, ...), and those whose PATH entry point runs under
+another Python environment than this one, keep running as subprocesses:
+the worker would import a different install than the one the lint cache
+is keyed on.
+
+Usage (worker side, spawned by WorkerPool):
+  python lint_workers.py
+"""
+
+import atexit
+import io
+import json
+import os
+import queue
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from logger import log
+
+# Tools that can run in-process in a worker
+WORKER_TOOLS = ("pylint", "flake8")
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _reset_pylint_cache() -> None:
+    """Drop astroid's cache of project modules, keep stdlib / site-packages."""
+    try:
+        from astroid import MANAGER
+    except ImportError:
+        return
+    prefixes = tuple({sys.prefix, sys.base_prefix, sys.exec_prefix})
+    for name, module in list(MANAGER.astroid_cache.items()):
+        path = getattr(module, "file", None) or ""
+        if path and not path.startswith(prefixes):
+            MANAGER.astroid_cache.pop(name, None)
+
+
+def _run_pylint(args: List[str]) -> int:
+    from pylint.lint import Run
+
+    _reset_pylint_cache()
+    run = Run(args, exit=False)
+    return run.linter.msg_status
+
+
+def _run_flake8(args: List[str]) -> int:
+    from flake8.main.cli import main
+
+    try:
+        main(args)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    return 0
+
+
+_ENTRY_POINTS = {"pylint": _run_pylint, "flake8": _run_flake8}
+
+
+def _rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _handle(request: Dict[str, Any]) -> Dict[str, Any]:
+    tool = request.get("tool", "")
+    entry = _ENTRY_POINTS.get(tool)
+    if entry is None:
+        return {"unsupported": True}
+    out, err = io.StringIO(), io.StringIO()
+    try:
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+        with redirect_stdout(out), redirect_stderr(err):
+            rc = entry(list(request.get("args", [])))
+    except ImportError:
+        return {"unsupported": True}
+    except Exception as e:
+        return {"stdout": out.getvalue(), "stderr": f"{err.getvalue()}{e}", "rc": 1, "rss_mb": _rss_mb()}
+    return {"stdout": out.getvalue(), "stderr": err.getvalue(), "rc": rc, "rss_mb": _rss_mb()}
+
+
+def serve() -> None:
+    """Worker main loop: answer requests from stdin until it closes."""
+    # Keep a private copy of stdout for the protocol; stray writes to fd 1
+    # (C extensions, print in plugins) go to stderr instead
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    home = os.getcwd()
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        response = _handle(request)
+        os.chdir(home)
+        channel.write(json.dumps(response) + "\n")
+        channel.flush()
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+def _script_interpreter(path: str) -> Optional[str]:
+    """Interpreter a console script runs under, from its shebang.
+
+    Understands `#!/usr/bin/env python3` and pip's `#!/bin/sh` +
+    `'''exec' "/path/python" "$0"` form for long interpreter paths.
+    """
+    try:
+        with open(path, "rb") as fh:
+            head = fh.read(1024).decode("utf-8", "replace").splitlines()
+    except OSError:
+        return None
+    if not head or not head[0].startswith("#!"):
+        return None
+    parts = head[0][2:].split()
+    if parts and os.path.basename(parts[0]) == "sh" and len(head) > 1:
+        try:
+            parts = shlex.split(head[1])[1:]  # drop the '''exec' token
+        except ValueError:
+            return None
+    if parts and os.path.basename(parts[0]) == "env":
+        parts = [p for p in parts[1:] if not p.startswith("-")]
+        return shutil.which(parts[0]) if parts else None
+    return parts[0] if parts else None
+
+
+def _same_environment(python: str) -> bool:
+    """Whether `python` is this interpreter in this environment: same binary
+    and same bin directory (a venv's python links to the system one)."""
+    here = os.path.abspath(sys.executable)
+    try:
+        return (
+            os.path.dirname(os.path.abspath(python)) == os.path.dirname(here)
+            and os.path.samefile(python, here)
+        )
+    except OSError:
+        return False
+
+
+class _Worker:
+    """One worker process; not thread-safe (the pool hands it to one caller)."""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        self.requests = 0
+        self.rss_mb = 0.0
+        self.timed_out = False
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)  # EOF: the worker exited
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def call(self, request: Dict[str, Any], timeout: float) -> Optional[Dict[str, Any]]:
+        """Send one request; None if the worker died or timed out (it is then killed)."""
+        try:
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self.timed_out = True
+            line = None
+        except (OSError, ValueError):
+            line = None
+        if line is None:
+            self.kill()
+            return None
+        self.requests += 1
+        response = json.loads(line)
+        self.rss_mb = response.get("rss_mb", 0.0)
+        return response
+
+    def worn_out(self) -> bool:
+        return (
+            self.requests >= Config.LINT_WORKER_MAX_REQUESTS
+            or self.rss_mb >= Config.LINT_WORKER_MAX_RSS_MB
+        )
+
+    def kill(self) -> None:
+        if self.alive:
+            self.proc.kill()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+
+class WorkerPool:
+    """Per-tool pools of idle workers, shared by all reviews of a process."""
+
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._idle: Dict[str, List[_Worker]] = {}
+        self._busy: Dict[str, int] = {}
+        self._unsupported: set = set()
+        self._checked: set = set()
+
+    def supports(self, tool: str) -> bool:
+        """Whether `tool` can run in a worker: it has an entry point, and
+        the `tool` on PATH runs under this Python (see _same_environment)."""
+        if tool not in WORKER_TOOLS or tool in self._unsupported:
+            return False
+        if tool not in self._checked:
+            path = shutil.which(tool)
+            python = _script_interpreter(path) if path else None
+            if python is None or not _same_environment(python):
+                log.info(
+                    f"{tool} on PATH runs under {python or 'an unknown interpreter'}, "
+                    f"not {sys.executable}; using subprocesses"
+                )
+                self._unsupported.add(tool)
+                return False
+            self._checked.add(tool)
+        return True
+
+    def _acquire(
+        self, tool: str, max_procs: int, on_start: Optional[Callable[[int], None]] = None
+    ) -> _Worker:
+        with self._lock:
+            while True:
+                idle = self._idle.setdefault(tool, [])
+                while idle:
+                    worker = idle.pop()
+                    if worker.alive:
+                        self._busy[tool] = self._busy.get(tool, 0) + 1
+                        return worker
+                if self._busy.get(tool, 0) < max_procs:
+                    self._busy[tool] = self._busy.get(tool, 0) + 1
+                    break
+                self._lock.wait()
+        try:
+            worker = _Worker()
+        except OSError:
+            self._release(tool, None)
+            raise
+        if on_start is not None:
+            on_start(worker.proc.pid)
+        return worker
+
+    def _release(self, tool: str, worker: Optional[_Worker]) -> None:
+        retire = worker is not None and (not worker.alive or worker.worn_out())
+        with self._lock:
+            self._busy[tool] -= 1
+            if worker is not None and not retire:
+                self._idle.setdefault(tool, []).append(worker)
+            self._lock.notify()
+        if retire and worker.alive:
+            log.debug(
+                f"Retiring {tool} worker after {worker.requests} runs ({worker.rss_mb:.0f} MB)"
+            )
+            worker.close()
+
+    def run(
+        self,
+        tool: str,
+        args: List[str],
+        cwd: Optional[str],
+        timeout: float,
+        max_procs: int,
+        on_start: Optional[Callable[[int], None]] = None,
+    ) -> Optional[Tuple[str, str, int]]:
+        """Run `tool args` in a worker: (stdout, stderr, rc), or None to fall back
+        to a subprocess (tool not importable here, or no worker could be started).
+        `on_start` is called with the pid of each worker started for the run.
+        A crashed worker is replaced and the run retried once; a run that times
+        out is not retried."""
+        request = {"tool": tool, "args": args, "cwd": cwd or os.getcwd()}
+        for attempt in range(2):
+            try:
+                worker = self._acquire(tool, max(1, max_procs), on_start)
+            except OSError as e:
+                log.warning(f"Cannot start {tool} worker: {e}")
+                return None
+            response = worker.call(request, timeout)
+            self._release(tool, worker)
+            if response is None:
+                if worker.timed_out:
+                    return "", f"{tool} timed out", 124
+                if attempt == 0:
+                    log.warning(f"{tool} worker exited unexpectedly; restarting")
+                    continue
+                return "", f"{tool} worker crashed", 1
+            if response.get("unsupported"):
+                log.info(f"{tool} is not importable by {sys.executable}; using subprocesses")
+                self._unsupported.add(tool)
+                return None
+            return response.get("stdout", ""), response.get("stderr", ""), response.get("rc", 1)
+        return None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers = [w for idle in self._idle.values() for w in idle]
+            self._idle.clear()
+        for worker in workers:
+            worker.close()
+
+
+_POOL: Optional[WorkerPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> WorkerPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = WorkerPool()
+            atexit.register(_POOL.shutdown)
+        return _POOL
+
+
+if __name__ == "__main__":
+    serve()
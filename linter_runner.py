@@ -6,12 +6,29 @@ Falls back gracefully when external tools are missing.
 
 import json
 import os
-import py_compile
+import platform
+import signal
+import shutil
 import subprocess
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from cancellation import CancelToken
+from config import Config
+from diff_parser import ParsedDiff
+import lint_artifacts
+import lint_workers
+import py_analyzer
 from logger import log
+from result_cache import ResultCache, content_hash
 
 # ---------------------------------------------------------------------------
 # Normalized issue shape
@@ -22,53 +39,416 @@ from logger import log
 #     "column": 0,
 #     "severity": "error" | "warning" | "info",
 #     "message": "...",
-#     "linter": "tool-name"
+#     "linter": "tool-name",
+#     "scope": "changed" | "context" | "untouched"   (set by scope_issues)
 # }
 
 # ---------------------------------------------------------------------------
-# Tool availability cache
+# Tool availability / version cache
 # ---------------------------------------------------------------------------
-_TOOL_CACHE: Dict[str, bool] = {}
+_TOOL_CACHE: Dict[str, Optional[str]] = {}  # tool -> version line, None if missing
+_PROBE_LOCK = threading.Lock()
+_PROBE_TIMEOUT = 30
+# Tools rustup installs as proxies of itself
+_RUSTUP_PROXIES: FrozenSet[str] = frozenset({"cargo"})
 
 
-def _tool_available(name: str) -> bool:
-    if name not in _TOOL_CACHE:
-        _TOOL_CACHE[name] = subprocess.run(
-            [name, "--version"],
+def _probe_binary(path: str) -> Optional[str]:
+    """First line of `<path> --version`, or None if it does not run."""
+    try:
+        proc = subprocess.run(
+            [path, "--version"],
+            capture_output=True,
+            text=True,
+            shell=False,
+            timeout=_PROBE_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    # some linters exit 1 on --version
+    if proc.returncode not in (0, 1):
+        return None
+    lines = (proc.stdout or proc.stderr).strip().splitlines()
+    return lines[0].strip() if lines else ""
+
+
+def _binary_fingerprint(path: str) -> Optional[str]:
+    """"realpath:mtime:size" of an executable, None if it cannot be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.realpath(path)}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def _tool_fingerprint(tool: str, path: str) -> Optional[str]:
+    """Fingerprint that changes whenever `<path> --version` may change.
+
+    rustup installs cargo as a proxy that stays byte-identical across
+    `rustup update`, so a proxy is fingerprinted by the binary of the
+    active toolchain (`rustup which cargo`). None if nothing can be stat'ed.
+    """
+    rustup = shutil.which("rustup") if tool in _RUSTUP_PROXIES else None
+    try:
+        if not rustup or not os.path.samefile(path, rustup):
+            return _binary_fingerprint(path)
+        proc = subprocess.run(
+            [rustup, "which", tool],
             capture_output=True,
             text=True,
             shell=False,
-        ).returncode in (0, 1)  # some linters exit 1 on --version
+            timeout=_PROBE_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    target = proc.stdout.strip()
+    return _binary_fingerprint(target) if proc.returncode == 0 and target else None
+
+
+def probe_tools(tools: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+    """Resolve availability and version of all external tools at once.
+
+    Tools missing from PATH are settled without a subprocess. The others
+    are looked up in the result cache under their binary fingerprint
+    (path, mtime, size; see _tool_fingerprint), so a re-run costs no
+    `--version` calls until a tool is upgraded; the rest are probed
+    concurrently. Only successful probes are persisted. Later calls in the
+    same process return the in-memory result.
+    """
+    names = [t for t in (tools or _TOOLS) if t not in BUILTIN_TOOLS]
+    with _PROBE_LOCK:
+        todo = [t for t in names if t not in _TOOL_CACHE]
+        if not todo:
+            return {t: _TOOL_CACHE[t] for t in names}
+        cache = ResultCache("tool_probe")
+        to_probe: Dict[str, Tuple[str, str]] = {}  # tool -> (path, fingerprint)
+        for tool in todo:
+            path = shutil.which(tool)
+            if path is None:
+                _TOOL_CACHE[tool] = None
+                continue
+            fingerprint = _tool_fingerprint(tool, path)
+            cached = cache.get(fingerprint) if fingerprint else None
+            if cached is not None and cached.get("version") is not None:
+                _TOOL_CACHE[tool] = cached["version"]
+            else:
+                to_probe[tool] = (path, fingerprint)
+        if to_probe:
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=len(to_probe)) as pool:
+                versions = dict(zip(
+                    to_probe, pool.map(_probe_binary, [path for path, _ in to_probe.values()])
+                ))
+            _TOOL_CACHE.update(versions)
+            # failures (timeouts, crashes) are retried on the next run
+            cache.put_many(
+                (to_probe[t][1], {"version": v})
+                for t, v in versions.items()
+                if v is not None and to_probe[t][1]
+            )
+            log.debug(
+                f"Probed {len(to_probe)} linters in {time.monotonic() - started:.2f}s: "
+                + ", ".join(f"{t}={'yes' if v is not None else 'no'}" for t, v in versions.items())
+            )
+        cache.close()
+        return {t: _TOOL_CACHE[t] for t in names}
+
+
+def _tool_version(name: str) -> Optional[str]:
+    """First line of `<tool> --version`, or None if the tool is not installed."""
+    if name in BUILTIN_TOOLS:
+        return f"python-{platform.python_version()}/{py_analyzer.ANALYZER_VERSION}"
+    if name not in _TOOL_CACHE:
+        probe_tools([name])
     return _TOOL_CACHE[name]
 
 
-def _run_cmd(cmd: List[str], cwd: Optional[str] = None) -> Tuple[str, str, int]:
+def _tool_available(name: str) -> bool:
+    return _tool_version(name) is not None
+
+
+# Tools skipped in fast mode (deadline pressure): slow start-up or whole-crate runs
+SLOW_TOOLS: FrozenSet[str] = frozenset(
+    {"pylint", "cargo", "checkstyle", "golangci-lint", "cppcheck"}
+)
+
+
+# Configuration each tool reads from the ancestor dirs of a file. Part of the
+# lint cache key, and materialized next to the changed files when linting
+# a sparse checkout (review from git objects, batch mode).
+TOOL_CONFIG_FILES: Dict[str, Tuple[str, ...]] = {
+    "golangci-lint": (
+        ".golangci.yml", ".golangci.yaml", ".golangci.toml", ".golangci.json", "go.mod", "go.sum",
+    ),
+    "flake8": ("setup.cfg", "tox.ini", ".flake8"),
+    "pylint": (".pylintrc", "pylintrc", "pyproject.toml", "setup.cfg"),
+    "eslint": (
+        ".eslintrc", ".eslintrc.js", ".eslintrc.cjs", ".eslintrc.json", ".eslintrc.yml",
+        ".eslintrc.yaml", "eslint.config.js", "eslint.config.mjs", "package.json", "tsconfig.json",
+    ),
+    "cargo": ("Cargo.toml", "Cargo.lock", "clippy.toml", ".clippy.toml"),
+    "checkstyle": ("checkstyle.xml",),
+}
+LINTER_CONFIG_FILES: Tuple[str, ...] = tuple(
+    dict.fromkeys(name for names in TOOL_CONFIG_FILES.values() for name in names)
+)
+# Linters that type-check whole packages need the unchanged files next to the changed ones
+LINT_PACKAGE_SIBLINGS: FrozenSet[str] = frozenset({".go"})
+
+
+_CMD_TIMEOUT = 120  # until a tool has runtime history (see RuntimeModel)
+
+
+# ---------------------------------------------------------------------------
+# Process limits
+# ---------------------------------------------------------------------------
+# Every linter process runs in its own session (so a timeout also kills the
+# rustc / java children it spawned), niced by LINT_NICE, pinned to
+# LINT_CPU_AFFINITY and, per LINT_TOOL_MEMORY_MB, capped in data segment
+# size. A run stopped by one of these limits raises LinterLimitExceeded;
+# the executor reports it and the review carries on without its output.
+
+class LinterLimitExceeded(Exception):
+    """A linter run was killed by its timeout or resource limits."""
+
+
+class LinterTimeout(LinterLimitExceeded):
+    pass
+
+
+# stderr of a process whose allocations failed under RLIMIT_DATA
+_OOM_MARKERS = (
+    "out of memory",
+    "memoryerror",
+    "memory allocation of",
+    "cannot allocate memory",
+    "std::bad_alloc",
+)
+
+
+def _cpu_set(spec: str) -> Set[int]:
+    """Parse a CPU list like "0-3,6"."""
+    cpus: Set[int] = set()
+    for part in spec.split(","):
+        lo, sep, hi = part.strip().partition("-")
+        try:
+            cpus.update(range(int(lo), int(hi if sep else lo) + 1))
+        except ValueError:
+            if part.strip():
+                log.warning(f"Ignoring invalid LINT_CPU_AFFINITY entry '{part.strip()}'")
+    return cpus
+
+
+def _memory_limit_mb(tool: str) -> Optional[float]:
+    return _tool_limits(Config.LINT_TOOL_MEMORY_MB).get(tool) or None
+
+
+def _apply_limits(pid: int, tool: str) -> None:
+    """Apply the resource policy to a just-started linter process.
+
+    Done from the parent (prlimit / setpriority / sched_setaffinity on the
+    pid) rather than in a preexec_fn, which is unsafe with the executor's
+    threads. Children the tool spawns afterwards inherit the limits.
+    """
     try:
-        proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, timeout=120)
-        return proc.stdout, proc.stderr, proc.returncode
+        mem = _memory_limit_mb(tool)
+        if mem and resource is not None and hasattr(resource, "prlimit"):
+            limit = int(mem * 1024 * 1024)
+            resource.prlimit(pid, resource.RLIMIT_DATA, (limit, limit))
+        if Config.LINT_NICE > 0 and hasattr(os, "setpriority"):
+            current = os.getpriority(os.PRIO_PROCESS, 0)
+            os.setpriority(os.PRIO_PROCESS, pid, min(19, current + Config.LINT_NICE))
+        cpus = _cpu_set(Config.LINT_CPU_AFFINITY) if Config.LINT_CPU_AFFINITY else None
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, cpus)
+    except (OSError, ValueError) as e:  # exited already, or not permitted
+        log.debug(f"Could not apply limits to {tool} (pid {pid}): {e}")
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (OSError, AttributeError):
+        proc.kill()
+
+
+def _limit_failure(tool: str, rc: int, stderr: str) -> Optional[str]:
+    """Why a finished run counts as killed by a limit, or None."""
+    mem = _memory_limit_mb(tool)
+    if mem and any(m in stderr.lower() for m in _OOM_MARKERS):
+        return f"{tool} ran out of memory (limit {mem:.0f} MB)"
+    if rc < 0:
+        try:
+            name = signal.Signals(-rc).name
+        except ValueError:
+            name = f"signal {-rc}"
+        return f"{tool} was killed by {name}"
+    return None
+
+
+def _run_cmd(
+    cmd: List[str], cwd: Optional[str] = None, timeout: float = _CMD_TIMEOUT
+) -> Tuple[str, str, int]:
+    """Run a linter: (stdout, stderr, returncode).
+
+    Raises LinterLimitExceeded when the run times out or hits its limits.
+    """
+    if Config.LINT_PERSISTENT_WORKERS:
+        pool = lint_workers.get_pool()
+        if pool.supports(cmd[0]):
+            # As many workers as the executor may run this tool in parallel
+            cap = _tool_limits(Config.LINT_TOOL_CONCURRENCY).get(
+                cmd[0], Config.LINT_WORKERS or os.cpu_count() or 1
+            )
+            # Workers are reused across runs, so limits are applied once at start
+            result = pool.run(
+                cmd[0], cmd[1:], cwd, timeout, int(cap),
+                on_start=lambda pid: _apply_limits(pid, cmd[0]),
+            )
+            if result is not None:
+                if result[2] == 124:
+                    raise LinterTimeout(f"{cmd[0]} timed out after {timeout:.0f}s")
+                failure = _limit_failure(cmd[0], result[2], result[1])
+                if failure:
+                    raise LinterLimitExceeded(failure)
+                return result
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+        )
     except FileNotFoundError:
         return "", f"{cmd[0]} not found", 127
-    except subprocess.TimeoutExpired:
-        return "", f"{cmd[0]} timed out", 124
     except Exception as e:
         return "", str(e), 1
+    _apply_limits(proc.pid, cmd[0])
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_group(proc)
+        proc.communicate()
+        raise LinterTimeout(f"{cmd[0]} timed out after {timeout:.0f}s")
+    except BaseException:
+        _kill_group(proc)
+        proc.wait()
+        raise
+    failure = _limit_failure(cmd[0], proc.returncode, stderr)
+    if failure:
+        raise LinterLimitExceeded(failure)
+    return stdout, stderr, proc.returncode
+
+
+_RUNTIME_SAMPLES = 50
+_RUNTIME_MIN_SAMPLES = 5
+
+
+class RuntimeModel:
+    """Learns per-tool run times to size linter timeouts.
+
+    Keeps the last _RUNTIME_SAMPLES seconds-per-file figures (per run for
+    UNIT_TOOLS, which lint a whole module regardless of the file count)
+    in the result cache. The timeout for a run is LINT_TIMEOUT_FACTOR times
+    the 90th percentile for its size, clamped to LINT_TIMEOUT_MIN..MAX;
+    with too little history it stays at _CMD_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._cache = ResultCache("lint_runtime")
+        self._samples: Dict[str, List[float]] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _history(self, tool: str) -> List[float]:
+        if tool not in self._samples:
+            self._samples[tool] = self._cache.get(tool) or []
+        return self._samples[tool]
+
+    @staticmethod
+    def _units(tool: str, n_files: int) -> int:
+        return 1 if tool in UNIT_TOOLS else max(1, n_files)
+
+    def timeout(self, tool: str, n_files: int) -> float:
+        with self._lock:
+            samples = sorted(self._history(tool))
+        if len(samples) < _RUNTIME_MIN_SAMPLES:
+            return float(_CMD_TIMEOUT)
+        p90 = samples[int(0.9 * (len(samples) - 1))]
+        learned = Config.LINT_TIMEOUT_FACTOR * p90 * self._units(tool, n_files)
+        return float(min(Config.LINT_TIMEOUT_MAX, max(Config.LINT_TIMEOUT_MIN, learned)))
+
+    def record(self, tool: str, seconds: float, n_files: int) -> None:
+        with self._lock:
+            samples = self._history(tool)
+            samples.append(round(seconds / self._units(tool, n_files), 3))
+            del samples[:-_RUNTIME_SAMPLES]
+            self._dirty.add(tool)
+
+    def close(self) -> None:
+        with self._lock:
+            self._cache.put_many((tool, self._samples[tool]) for tool in self._dirty)
+            self._dirty.clear()
+        self._cache.close()
 
 
 # ---------------------------------------------------------------------------
 # Per-language linter implementations
 # ---------------------------------------------------------------------------
 
-def _lint_go(file_path: str, project_root: str) -> List[Dict[str, Any]]:
-    issues: List[Dict[str, Any]] = []
-    if not _tool_available("golangci-lint"):
-        log.debug("golangci-lint not available, skipping Go static analysis")
-        return issues
+# Each tool function lints a batch of files in one process:
+# (file_paths, project_root, timeout, base_rev) -> issues. BATCH_TOOLS get
+# chunks of files, UNIT_TOOLS all changed files of one Go module / Cargo
+# workspace, other tools a single file. `base_rev` (the review base, when
+# linting a git checkout) lets a tool report only issues new since then.
 
-    work_dir = os.path.dirname(file_path) or project_root
-    stdout, stderr, rc = _run_cmd(
-        ["golangci-lint", "run", ".", "--out-format=json"],
-        cwd=work_dir,
-    )
+def _unit_root(tool: str, file_path: str, project_root: str) -> str:
+    """Directory (relative to project_root, "" for the root) a UNIT_TOOLS run covers.
+
+    Go: the nearest directory with a go.mod. Rust: the outermost Cargo.toml
+    declaring a [workspace], else the nearest Cargo.toml (the crate).
+    """
+    marker = UNIT_TOOLS[tool]
+    directory = os.path.dirname(os.path.relpath(file_path, project_root))
+    nearest: Optional[str] = None
+    workspace: Optional[str] = None
+    while True:
+        manifest = os.path.join(project_root, directory, marker)
+        if os.path.isfile(manifest):
+            if nearest is None:
+                nearest = directory
+                if tool != "cargo":
+                    break
+            if _is_cargo_workspace(manifest):
+                workspace = directory
+        if not directory:
+            break
+        directory = os.path.dirname(directory)
+    return workspace if workspace is not None else (nearest or "")
+
+
+def _is_cargo_workspace(manifest: str) -> bool:
+    try:
+        with open(manifest, encoding="utf-8", errors="ignore") as fh:
+            return any(line.strip() == "[workspace]" for line in fh)
+    except OSError:
+        return False
+
+
+def _lint_golangci(
+    files: List[str], project_root: str, timeout: float, base_rev: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    issues: List[Dict[str, Any]] = []
+    # One run per Go module, over the packages of the changed files
+    module_dir = os.path.join(project_root, _unit_root("golangci-lint", files[0], project_root))
+    package_dirs = {os.path.relpath(os.path.dirname(f), module_dir) for f in files}
+    packages = sorted("." if d == "." else f"./{d}" for d in package_dirs)
+    cmd = ["golangci-lint", "run", "--out-format=json"]
+    if base_rev:
+        cmd.append(f"--new-from-rev={base_rev}")
+    stdout, stderr, rc = _run_cmd(cmd + packages, cwd=module_dir, timeout=timeout)
     if not stdout:
         return issues
     try:
@@ -77,11 +457,16 @@ def _lint_go(file_path: str, project_root: str) -> List[Dict[str, Any]]:
         log.warning("Failed to parse golangci-lint JSON output")
         return issues
 
+    wanted = {os.path.normpath(f) for f in files}
     for issue in data.get("Issues", []):
         pos = issue.get("Pos", {})
+        file_path = os.path.normpath(os.path.join(module_dir, pos.get("Filename", "")))
+        # Packages also hold unchanged files; report on changed ones only
+        if file_path not in wanted:
+            continue
         issues.append(
             {
-                "file": pos.get("Filename", file_path),
+                "file": file_path,
                 "line": pos.get("Line", 0),
                 "column": pos.get("Column", 0),
                 "severity": "error" if issue.get("Severity", "") == "error" else "warning",
@@ -92,83 +477,76 @@ def _lint_go(file_path: str, project_root: str) -> List[Dict[str, Any]]:
     return issues
 
 
-def _lint_python(file_path: str, _project_root: str) -> List[Dict[str, Any]]:
-    issues: List[Dict[str, Any]] = []
+def _lint_py_analyzer(
+    files: List[str], _project_root: str, _timeout: float, _base_rev: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    # Built-in, zero install, zero config: compile() + ast checks in memory
+    return py_analyzer.analyze_files(files)
 
-    # Always try built-in py_compile first (zero install, zero config)
-    try:
-        py_compile.compile(file_path, doraise=True)
-    except py_compile.PyCompileError as e:
+
+def _lint_flake8(
+    files: List[str], _project_root: str, timeout: float, _base_rev: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    issues: List[Dict[str, Any]] = []
+    stdout, _stderr, _rc = _run_cmd(
+        ["flake8", "--format=%(path)s:%(row)d:%(col)d:%(code)s:%(text)s"] + files,
+        timeout=timeout,
+    )
+    for line in stdout.strip().splitlines():
+        # path:line:col:code:text
+        parts = line.split(":", 4)
+        if len(parts) < 5:
+            continue
         issues.append(
             {
-                "file": file_path,
-                "line": getattr(e, "lineno", 0) or 0,
-                "column": getattr(e, "offset", 0) or 0,
-                "severity": "error",
-                "message": str(e),
-                "linter": "py_compile",
+                "file": parts[0],
+                "line": int(parts[1]) if parts[1].isdigit() else 0,
+                "column": int(parts[2]) if parts[2].isdigit() else 0,
+                "severity": "error" if parts[3].startswith("E") else "warning",
+                "message": f"[{parts[3]}] {parts[4]}",
+                "linter": "flake8",
             }
         )
+    return issues
 
-    # Try flake8 if available
-    if _tool_available("flake8"):
-        stdout, _stderr, _rc = _run_cmd(
-            ["flake8", "--format=%(path)s:%(row)d:%(col)d:%(code)s:%(text)s", file_path]
-        )
-        for line in stdout.strip().splitlines():
-            # path:line:col:code:text
-            parts = line.split(":", 4)
-            if len(parts) < 5:
-                continue
-            issues.append(
-                {
-                    "file": parts[0],
-                    "line": int(parts[1]) if parts[1].isdigit() else 0,
-                    "column": int(parts[2]) if parts[2].isdigit() else 0,
-                    "severity": "error" if parts[3].startswith("E") else "warning",
-                    "message": f"[{parts[3]}] {parts[4]}",
-                    "linter": "flake8",
-                }
-            )
-
-    # Try pylint if available
-    if _tool_available("pylint"):
-        stdout, _stderr, _rc = _run_cmd(
-            [
-                "pylint",
-                "--output-format=json",
-                "--disable=missing-docstring,invalid-name",
-                file_path,
-            ]
-        )
-        if stdout:
-            try:
-                pylint_issues = json.loads(stdout)
-                for issue in pylint_issues:
-                    issues.append(
-                        {
-                            "file": issue.get("path", file_path),
-                            "line": issue.get("line", 0),
-                            "column": issue.get("column", 0),
-                            "severity": issue.get("type", "warning"),
-                            "message": f"[{issue.get('symbol', '')}] {issue.get('message', '')}",
-                            "linter": "pylint",
-                        }
-                    )
-            except json.JSONDecodeError:
-                pass
 
+def _lint_pylint(
+    files: List[str], _project_root: str, timeout: float, _base_rev: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    issues: List[Dict[str, Any]] = []
+    stdout, _stderr, _rc = _run_cmd(
+        [
+            "pylint",
+            "--output-format=json",
+            "--disable=missing-docstring,invalid-name",
+        ] + files,
+        timeout=timeout,
+    )
+    if stdout:
+        try:
+            pylint_issues = json.loads(stdout)
+            for issue in pylint_issues:
+                issues.append(
+                    {
+                        "file": issue.get("path", ""),
+                        "line": issue.get("line", 0),
+                        "column": issue.get("column", 0),
+                        "severity": issue.get("type", "warning"),
+                        "message": f"[{issue.get('symbol', '')}] {issue.get('message', '')}",
+                        "linter": "pylint",
+                    }
+                )
+        except json.JSONDecodeError:
+            pass
     return issues
 
 
-def _lint_javascript(file_path: str, _project_root: str) -> List[Dict[str, Any]]:
+def _lint_eslint(
+    files: List[str], _project_root: str, timeout: float, _base_rev: Optional[str] = None
+) -> List[Dict[str, Any]]:
     issues: List[Dict[str, Any]] = []
-    if not _tool_available("eslint"):
-        log.debug("eslint not available, skipping JS/TS static analysis")
-        return issues
-
     stdout, _stderr, _rc = _run_cmd(
-        ["eslint", "--format=json", file_path]
+        ["eslint", "--format=json"] + files, timeout=timeout
     )
     if not stdout:
         return issues
@@ -181,7 +559,7 @@ def _lint_javascript(file_path: str, _project_root: str) -> List[Dict[str, Any]]
         for msg in file_result.get("messages", []):
             issues.append(
                 {
-                    "file": file_result.get("filePath", file_path),
+                    "file": file_result.get("filePath", ""),
                     "line": msg.get("line", 0),
                     "column": msg.get("column", 0),
                     "severity": "error" if msg.get("severity") == 2 else "warning",
@@ -192,21 +570,23 @@ def _lint_javascript(file_path: str, _project_root: str) -> List[Dict[str, Any]]
     return issues
 
 
-def _lint_rust(file_path: str, project_root: str) -> List[Dict[str, Any]]:
+def _lint_clippy(
+    files: List[str], project_root: str, timeout: float, _base_rev: Optional[str] = None
+) -> List[Dict[str, Any]]:
     issues: List[Dict[str, Any]] = []
-    if not _tool_available("cargo"):
-        log.debug("cargo not available, skipping Rust static analysis")
-        return issues
-
-    # clippy needs to run from the crate root; attempt project_root
+    # One run per Cargo workspace (or crate), from its root
+    unit_dir = os.path.join(project_root, _unit_root("cargo", files[0], project_root))
     stdout, stderr, rc = _run_cmd(
         ["cargo", "clippy", "--message-format=json"],
-        cwd=project_root,
+        cwd=unit_dir,
+        timeout=timeout,
     )
     output = stdout + stderr
     if not output:
         return issues
 
+    wanted = {os.path.normpath(f) for f in files}
+
     for line in output.strip().splitlines():
         try:
             msg = json.loads(line)
@@ -214,12 +594,15 @@ def _lint_rust(file_path: str, project_root: str) -> List[Dict[str, Any]]:
             continue
         if msg.get("reason") != "compiler-message":
             continue
-        sp = msg.get("message", {}).get("spans", [{}])[0]
-        # Only keep messages for the changed file
-        if sp.get("file_name") and file_path.endswith(sp["file_name"]):
+        sp = (msg.get("message", {}).get("spans") or [{}])[0]
+        if not sp.get("file_name"):
+            continue
+        # Span paths are relative to the workspace root; keep changed files only
+        file_path = os.path.normpath(os.path.join(unit_dir, sp["file_name"]))
+        if file_path in wanted:
             issues.append(
                 {
-                    "file": sp.get("file_name", file_path),
+                    "file": file_path,
                     "line": sp.get("line_start", 0),
                     "column": sp.get("column_start", 0),
                     "severity": msg["message"].get("level", "warning"),
@@ -230,56 +613,55 @@ def _lint_rust(file_path: str, project_root: str) -> List[Dict[str, Any]]:
     return issues
 
 
-def _lint_java(file_path: str, _project_root: str) -> List[Dict[str, Any]]:
+def _lint_checkstyle(
+    files: List[str], _project_root: str, timeout: float, _base_rev: Optional[str] = None
+) -> List[Dict[str, Any]]:
     issues: List[Dict[str, Any]] = []
-    # Try checkstyle if available
-    if _tool_available("checkstyle"):
-        stdout, _stderr, _rc = _run_cmd(
-            ["checkstyle", "-f", "plain", file_path]
+    stdout, _stderr, _rc = _run_cmd(
+        ["checkstyle", "-f", "plain"] + files, timeout=timeout
+    )
+    for line in stdout.strip().splitlines():
+        # [SEVERITY] file_path:line: message
+        if "]:" not in line:
+            continue
+        prefix, message = line.split(":", 1)
+        severity = "warning"
+        if "ERROR" in prefix:
+            severity = "error"
+        file_part = prefix.split("]", 1)[-1].strip()
+        line_no = 0
+        if ":" in file_part:
+            file_part, line_str = file_part.rsplit(":", 1)
+            line_no = int(line_str) if line_str.isdigit() else 0
+        issues.append(
+            {
+                "file": file_part,
+                "line": line_no,
+                "column": 0,
+                "severity": severity,
+                "message": message.strip(),
+                "linter": "checkstyle",
+            }
         )
-        for line in stdout.strip().splitlines():
-            # [SEVERITY] file_path:line: message
-            if "]:" not in line:
-                continue
-            prefix, message = line.split(":", 1)
-            severity = "warning"
-            if "ERROR" in prefix:
-                severity = "error"
-            file_part = prefix.split("]", 1)[-1].strip()
-            line_no = 0
-            if ":" in file_part:
-                file_part, line_str = file_part.rsplit(":", 1)
-                line_no = int(line_str) if line_str.isdigit() else 0
-            issues.append(
-                {
-                    "file": file_part,
-                    "line": line_no,
-                    "column": 0,
-                    "severity": severity,
-                    "message": message.strip(),
-                    "linter": "checkstyle",
-                }
-            )
     return issues
 
 
-def _lint_cpp(file_path: str, _project_root: str) -> List[Dict[str, Any]]:
+def _lint_cppcheck(
+    files: List[str], _project_root: str, timeout: float, _base_rev: Optional[str] = None
+) -> List[Dict[str, Any]]:
     issues: List[Dict[str, Any]] = []
-    if not _tool_available("cppcheck"):
-        log.debug("cppcheck not available, skipping C/C++ static analysis")
-        return issues
-
     stdout, _stderr, _rc = _run_cmd(
         [
             "cppcheck",
             "--enable=all",
             "--error-exitcode=0",
             "--template={file}:{line}:{column}:{severity}:{message}",
-            file_path,
-        ]
+        ] + files,
+        timeout=timeout,
     )
+    prefixes = tuple(files)
     for line in stdout.strip().splitlines():
-        if not line.startswith(file_path):
+        if not line.startswith(prefixes):
             continue
         parts = line.split(":", 4)
         if len(parts) < 5:
@@ -300,78 +682,600 @@ def _lint_cpp(file_path: str, _project_root: str) -> List[Dict[str, Any]]:
 # ---------------------------------------------------------------------------
 # Dispatch map
 # ---------------------------------------------------------------------------
-_LINTER_MAP = {
-    ".go": _lint_go,
-    ".py": _lint_python,
-    ".js": _lint_javascript,
-    ".jsx": _lint_javascript,
-    ".ts": _lint_javascript,
-    ".tsx": _lint_javascript,
-    ".rs": _lint_rust,
-    ".java": _lint_java,
-    ".c": _lint_cpp,
-    ".cpp": _lint_cpp,
-    ".cc": _lint_cpp,
-    ".h": _lint_cpp,
-    ".hpp": _lint_cpp,
+LintFn = Callable[[List[str], str, float, Optional[str]], List[Dict[str, Any]]]
+
+# Tool name (as probed / listed in SLOW_TOOLS) -> lint function
+_TOOLS: Dict[str, LintFn] = {
+    "py_analyzer": _lint_py_analyzer,
+    "flake8": _lint_flake8,
+    "pylint": _lint_pylint,
+    "eslint": _lint_eslint,
+    "golangci-lint": _lint_golangci,
+    "cargo": _lint_clippy,
+    "checkstyle": _lint_checkstyle,
+    "cppcheck": _lint_cppcheck,
+}
+# In-process tools, always available; they parallelize internally
+BUILTIN_TOOLS: FrozenSet[str] = frozenset({"py_analyzer"})
+# Tools that take many files per run (one interpreter / JVM / node start-up per batch)
+BATCH_TOOLS: FrozenSet[str] = frozenset(
+    {"py_analyzer", "flake8", "pylint", "eslint", "checkstyle", "cppcheck"}
+)
+# Tools run once per Go module / Cargo workspace: tool -> manifest file
+UNIT_TOOLS: Dict[str, str] = {"golangci-lint": "go.mod", "cargo": "Cargo.toml"}
+# Keep batched command lines well below ARG_MAX (and Windows' 32k limit)
+_ARGV_MAX_CHARS = 30000
+
+# Extension -> tools, in report order
+_LINTER_MAP: Dict[str, Tuple[str, ...]] = {
+    ".go": ("golangci-lint",),
+    ".py": ("py_analyzer", "flake8", "pylint"),
+    ".js": ("eslint",),
+    ".jsx": ("eslint",),
+    ".ts": ("eslint",),
+    ".tsx": ("eslint",),
+    ".rs": ("cargo",),
+    ".java": ("checkstyle",),
+    ".c": ("cppcheck",),
+    ".cpp": ("cppcheck",),
+    ".cc": ("cppcheck",),
+    ".h": ("cppcheck",),
+    ".hpp": ("cppcheck",),
 }
 
 
-def run_linter(file_path: str, project_root: str) -> List[Dict[str, Any]]:
+def _tools_for(ext: str, skip_tools: FrozenSet[str] = frozenset()) -> List[str]:
+    """Tools to run for a file extension: not skipped and installed."""
+    tools = []
+    for tool in _LINTER_MAP.get(ext, ()):
+        if tool in skip_tools:
+            log.debug(f"{tool} skipped (fast mode)")
+        elif tool in BUILTIN_TOOLS or _tool_available(tool):
+            tools.append(tool)
+        else:
+            log.debug(f"{tool} not available, skipping {ext} static analysis")
+    return tools
+
+
+def _run_tool(
+    tool: str,
+    files: List[str],
+    project_root: str,
+    timeout: float = _CMD_TIMEOUT,
+    base_rev: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    try:
+        return _TOOLS[tool](files, project_root, timeout, base_rev)
+    except LinterLimitExceeded:
+        raise
+    except Exception as e:
+        where = files[0] if len(files) == 1 else f"{len(files)} files"
+        log.warning(f"Linter error ({tool}) for {where}: {e}")
+        return []
+
+
+def _batches(tool: str, files: List[str], workers: int, project_root: str) -> List[List[str]]:
+    """Split one tool's files into per-process batches.
+
+    UNIT_TOOLS get one batch per Go module / Cargo workspace and
+    BUILTIN_TOOLS a single batch (they use their own process pool). Other batches
+    hold at most LINT_BATCH_SIZE files and _ARGV_MAX_CHARS of arguments,
+    and are small enough that every worker gets one.
+    """
+    if tool in UNIT_TOOLS:
+        units: Dict[str, List[str]] = {}
+        for f in files:
+            root = _unit_root(tool, os.path.join(project_root, f), project_root)
+            units.setdefault(root, []).append(f)
+        return list(units.values())
+    if tool in BUILTIN_TOOLS:
+        return [list(files)]
+    if tool not in BATCH_TOOLS:
+        return [[f] for f in files]
+    size = max(1, min(Config.LINT_BATCH_SIZE, -(-len(files) // workers)))
+    batches: List[List[str]] = []
+    current: List[str] = []
+    chars = 0
+    for f in files:
+        if current and (len(current) >= size or chars + len(f) + 1 > _ARGV_MAX_CHARS):
+            batches.append(current)
+            current, chars = [], 0
+        current.append(f)
+        chars += len(f) + 1
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run_linter(
+    file_path: str,
+    project_root: str,
+    skip_tools: FrozenSet[str] = frozenset(),
+) -> List[Dict[str, Any]]:
     """Run the appropriate linter(s) for a single file."""
     _, ext = os.path.splitext(file_path)
-    linter_fn = _LINTER_MAP.get(ext)
-    if not linter_fn:
+    if ext not in _LINTER_MAP:
         log.debug(f"No linter configured for extension {ext}")
         return []
-    try:
-        return linter_fn(file_path, project_root)
-    except Exception as e:
-        log.warning(f"Linter error for {file_path}: {e}")
-        return []
+    issues: List[Dict[str, Any]] = []
+    for tool in _tools_for(ext, skip_tools):
+        issues.extend(_run_tool(tool, [file_path], project_root))
+    return issues
 
 
-def run_all_linters(changed_files: List[str], project_root: str) -> List[Dict[str, Any]]:
-    """Run linters for a list of changed files and collect all issues."""
-    all_issues: List[Dict[str, Any]] = []
+# ---------------------------------------------------------------------------
+# Concurrent executor
+# ---------------------------------------------------------------------------
+
+def _tool_limits(spec: str) -> Dict[str, float]:
+    """Parse a "tool=value,tool=value" setting (LINT_TOOL_CONCURRENCY / LINT_TOOL_BUDGETS)."""
+    limits: Dict[str, float] = {}
+    for item in spec.split(","):
+        tool, sep, value = item.partition("=")
+        if not sep:
+            continue
+        try:
+            limits[tool.strip()] = float(value)
+        except ValueError:
+            log.warning(f"Ignoring invalid linter limit '{item.strip()}'")
+    return limits
+
+
+class LintExecutor:
+    """Runs (files, tool) lint jobs on a bounded pool of worker threads.
+
+    The pool is sized to the CPU count (LINT_WORKERS overrides). A worker
+    only picks up a job whose tool is below its LINT_TOOL_CONCURRENCY cap,
+    so heavy tools cannot occupy every worker. Each tool's total run time
+    is bounded by LINT_TOOL_BUDGETS; once a tool's budget is spent its
+    remaining jobs are skipped (counted in `skipped` / `skipped_files`).
+    Each run's timeout comes from the tool's
+    runtime history (RuntimeModel); runs killed by a timeout or resource
+    limit are recorded in `failures` and yield no result. Results come
+    back in job order.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(1, workers or Config.LINT_WORKERS or os.cpu_count() or 1)
+        self.caps = {t: max(1, int(n)) for t, n in _tool_limits(Config.LINT_TOOL_CONCURRENCY).items()}
+        self.budgets = _tool_limits(Config.LINT_TOOL_BUDGETS)
+        self.spent: Dict[str, float] = {}
+        self.skipped: Dict[str, int] = {}  # tool -> runs skipped (budget used up)
+        self.skipped_files: Dict[str, int] = {}
+        self.failures: List[Dict[str, Any]] = []
+        self.runtimes = RuntimeModel()
+        self._cond = threading.Condition()
+
+    def _remaining(self, tool: str) -> Optional[float]:
+        if tool not in self.budgets:
+            return None
+        return self.budgets[tool] - self.spent.get(tool, 0.0)
+
+    def run_tool(
+        self, tool: str, files: List[str], project_root: str, base_rev: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Run one tool on a batch of files.
+
+        None if the tool's budget is used up or the run was killed by a limit.
+        """
+        with self._cond:
+            remaining = self._remaining(tool)
+            if remaining is not None and remaining <= 0:
+                self.skipped[tool] = self.skipped.get(tool, 0) + 1
+                self.skipped_files[tool] = self.skipped_files.get(tool, 0) + len(files)
+                return None
+        learned = self.runtimes.timeout(tool, len(files))
+        timeout = learned if remaining is None else min(learned, remaining)
+        started = time.monotonic()
+        try:
+            issues = _run_tool(tool, files, project_root, timeout, base_rev)
+        except LinterLimitExceeded as e:
+            log.warning(f"Linter stopped: {e} ({len(files)} files not analysed by {tool})")
+            with self._cond:
+                self.failures.append(
+                    {"tool": tool, "files": len(files), "reason": str(e), "kind": "stopped"}
+                )
+            if isinstance(e, LinterTimeout) and timeout == learned:
+                # A censored sample, so a tool that got slower raises its timeout
+                self.runtimes.record(tool, timeout, len(files))
+            return None
+        finally:
+            with self._cond:
+                self.spent[tool] = self.spent.get(tool, 0.0) + time.monotonic() - started
+        if tool not in BUILTIN_TOOLS:
+            self.runtimes.record(tool, time.monotonic() - started, len(files))
+        return issues
+
+    def close(self) -> None:
+        self.runtimes.close()
+
+    def map(self, jobs: List[Tuple[Any, str]], fn: Callable[[Any, str], Any]) -> List[Any]:
+        """Call fn(files, tool) for every job; results are in job order.
+
+        An exception raised by a job (e.g. cancellation) stops the jobs not
+        yet started and is re-raised once the running ones have finished.
+        """
+        results: List[Any] = [None] * len(jobs)
+        pending = list(range(len(jobs)))
+        running: Dict[str, int] = {}
+        errors: List[BaseException] = []
+
+        def _next() -> Optional[int]:
+            with self._cond:
+                while pending and not errors:
+                    for pos, i in enumerate(pending):
+                        tool = jobs[i][1]
+                        if running.get(tool, 0) < self.caps.get(tool, self.workers):
+                            running[tool] = running.get(tool, 0) + 1
+                            return pending.pop(pos)
+                    self._cond.wait()
+                return None
+
+        def _worker() -> None:
+            while True:
+                i = _next()
+                if i is None:
+                    return
+                tool = jobs[i][1]
+                try:
+                    results[i] = fn(*jobs[i])
+                except BaseException as e:
+                    with self._cond:
+                        errors.append(e)
+                finally:
+                    with self._cond:
+                        running[tool] -= 1
+                        self._cond.notify_all()
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs) or 1)) as pool:
+            for _ in range(min(self.workers, len(jobs))):
+                pool.submit(_worker)
+        if errors:
+            raise errors[0]
+        return results
+
+
+def _config_digest(
+    tool: str, rel_path: str, project_root: str, digests: Dict[str, str]
+) -> str:
+    """Hash of the tool's config files in the ancestor dirs of `rel_path`."""
+    parts = []
+    directory = os.path.dirname(rel_path)
+    while True:
+        for name in TOOL_CONFIG_FILES.get(tool, ()):
+            rel = os.path.join(directory, name)
+            if rel not in digests:
+                try:
+                    with open(os.path.join(project_root, rel), "rb") as fh:
+                        digests[rel] = content_hash(fh.read())
+                except OSError:
+                    digests[rel] = ""
+            if digests[rel]:
+                parts.append(f"{rel}={digests[rel]}")
+        if not directory:
+            break
+        directory = os.path.dirname(directory)
+    return content_hash("\n".join(parts))[:16]
+
+
+# Tools whose findings for a file depend on other sources: tool -> (scope,
+# extensions). "package": the file's directory; "unit": its Go module /
+# Cargo workspace (see _unit_root).
+_CONTEXT_SOURCES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "golangci-lint": ("package", (".go",)),
+    "cargo": ("unit", (".rs",)),
+    "pylint": ("package", (".py",)),
+}
+# Never part of a unit's sources
+_SOURCE_SKIP_DIRS: FrozenSet[str] = frozenset({"target", "node_modules", "vendor"})
+
+
+def _sources_digest(
+    tool: str, rel_path: str, project_root: str, digests: Dict[str, str]
+) -> str:
+    """Hash of the sources `tool` reads besides `rel_path` (see _CONTEXT_SOURCES)."""
+    scope, exts = _CONTEXT_SOURCES[tool]
+    if scope == "package":
+        directory = os.path.dirname(rel_path)
+    else:
+        directory = _unit_root(tool, os.path.join(project_root, rel_path), project_root)
+    key = f"{tool}:sources:{directory}"
+    if key in digests:
+        return digests[key]
+    parts = []
+    for root, dirs, files in os.walk(os.path.join(project_root, directory)):
+        if scope == "package":
+            dirs[:] = []
+        else:
+            dirs[:] = sorted(d for d in dirs if d not in _SOURCE_SKIP_DIRS and not d.startswith("."))
+        for name in sorted(files):
+            if os.path.splitext(name)[1] not in exts:
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, "rb") as fh:
+                    parts.append(f"{os.path.relpath(path, project_root)}={content_hash(fh.read())}")
+            except OSError:
+                continue
+    digests[key] = content_hash("\n".join(parts))[:16]
+    return digests[key]
+
+
+def _cache_key(
+    tool: str,
+    rel_path: str,
+    digest: str,
+    project_root: str,
+    digests: Dict[str, str],
+    base_rev: Optional[str] = None,
+) -> str:
+    """Lint cache key: tool, tool version, config hash, file path and content
+    hash, plus for _CONTEXT_SOURCES tools the hash of the package / unit."""
+    version = content_hash(_tool_version(tool) or "")[:12]
+    key = f"{tool}:{version}:{_config_digest(tool, rel_path, project_root, digests)}:{rel_path}:{digest}"
+    if tool in _CONTEXT_SOURCES:
+        key += f":{_sources_digest(tool, rel_path, project_root, digests)}"
+    if base_rev and tool == "golangci-lint":
+        key += f":{base_rev}"  # --new-from-rev output depends on the base
+    return key
+
+
+def run_all_linters(
+    changed_files: List[str],
+    project_root: str,
+    cancel_token: Optional[CancelToken] = None,
+    fast: bool = False,
+    time_budget: Optional[float] = None,
+    base_rev: Optional[str] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    failures: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Run linters for a list of changed files and collect all issues.
+
+    Files are grouped per tool and each batchable tool runs once per batch
+    of files (see _batches; golangci-lint and clippy once per Go module /
+    Cargo workspace) as a job on a LintExecutor; the issues are then
+    split back out per file. They are returned in changed-file order, then
+    tool order, then line order, regardless of batching or completion order.
+    Results are cached per (file, tool) under the file's content hash, the
+    tool version, the hash of the tool's config files and, for tools that
+    type-check across files, the hash of the package / unit (see _cache_key),
+    so unchanged files cost no linter time; the cache is pruned to
+    LINT_CACHE_MAX_ENTRIES least recently used entries. If given, `stats`
+    receives the cache hit counts. (file, tool) pairs covered by a CI
+    report in LINT_ARTIFACTS (see lint_artifacts) take its findings
+    instead of running the tool. `fast` skips SLOW_TOOLS; once
+    `time_budget` seconds are used up no further jobs are started.
+    `base_rev` scopes golangci-lint to issues new since that revision
+    (project_root must then be a git checkout). Runs killed by a timeout or
+    resource limit, and runs skipped because their tool's LINT_TOOL_BUDGETS
+    share is used up, are left out (and not cached); if given, `failures`
+    receives one {tool, files, reason, kind} entry per killed run (kind
+    "stopped") and one per tool with skipped runs (kind "skipped").
+    """
+    probe_tools()
+    cache = ResultCache("lint")
+    artifacts = lint_artifacts.load_artifacts(changed_files, project_root, set(_TOOLS))
+    from_artifacts = 0
+    skip_tools = SLOW_TOOLS if fast else frozenset()
+    started = time.monotonic()
+    file_tools: Dict[str, List[str]] = {}
+    tool_files: Dict[str, List[str]] = {}
+    by_tool: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    cache_keys: Dict[Tuple[str, str], str] = {}
+    hit_keys: List[str] = []
+    digests: Dict[str, str] = {}
     for f in changed_files:
         abs_path = os.path.join(project_root, f)
-        if not os.path.exists(abs_path):
+        ext = os.path.splitext(f)[1]
+        if ext not in _LINTER_MAP or f in file_tools or not os.path.exists(abs_path):
             continue
-        issues = run_linter(abs_path, project_root)
-        # Normalize file paths to repo-relative for consistent reporting
+        with open(abs_path, "rb") as fh:
+            digest = content_hash(fh.read())
+        # Tools covered by a CI artifact count even if missing or slow here
+        available = _tools_for(ext, skip_tools)
+        file_tools[f] = [
+            t for t in _LINTER_MAP[ext] if t in available or artifacts.covers(f, t)
+        ]
+        for tool in file_tools[f]:
+            reported = artifacts.get(f, tool)
+            if reported is not None:
+                by_tool[(f, tool)] = reported
+                from_artifacts += 1
+                continue
+            cache_key = _cache_key(tool, f, digest, project_root, digests, base_rev)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                by_tool[(f, tool)] = cached
+                hit_keys.append(cache_key)
+                continue
+            cache_keys[(f, tool)] = cache_key
+            tool_files.setdefault(tool, []).append(f)
+
+    executor = LintExecutor()
+    jobs: List[Tuple[Tuple[str, ...], str]] = [
+        (tuple(batch), tool)
+        for tool, files in tool_files.items()
+        for batch in _batches(tool, files, executor.workers, project_root)
+    ]
+    over_budget: List[str] = []
+
+    def _job(files: Tuple[str, ...], tool: str) -> Optional[List[Dict[str, Any]]]:
+        if cancel_token:
+            cancel_token.raise_if_cancelled("static analysis")
+        if time_budget is not None and time.monotonic() - started > time_budget:
+            over_budget.extend(files)
+            return None
+        return executor.run_tool(
+            tool, [os.path.join(project_root, f) for f in files], project_root, base_rev
+        )
+
+    try:
+        outputs = executor.map(jobs, _job)
+    except BaseException:
+        cache.close()
+        executor.close()
+        raise
+    executor.close()
+    for tool, n in executor.skipped.items():
+        executor.failures.append({
+            "tool": tool,
+            "files": executor.skipped_files[tool],
+            "reason": f"{tool}: per-tool budget used up, {n} runs skipped",
+            "kind": "skipped",
+        })
+    if failures is not None:
+        failures.extend(executor.failures)
+
+    linted: List[Tuple[str, str]] = []
+    for (files, tool), issues in zip(jobs, outputs):
+        if issues is None:
+            continue
+        linted.extend((f, tool) for f in files)
         for issue in issues:
+            # Normalize file paths to repo-relative for consistent reporting
             issue_file = issue.get("file", "")
+            if issue_file and not os.path.isabs(issue_file) and issue_file not in files:
+                issue_file = os.path.abspath(issue_file)  # relative to our cwd (pylint)
             if os.path.isabs(issue_file):
-                rel = os.path.relpath(issue_file, project_root)
-                issue["file"] = rel
-            elif issue_file.startswith(abs_path):
-                issue["file"] = f
-        all_issues.extend(issues)
+                issue["file"] = os.path.relpath(issue_file, project_root)
+            # Split the batch output back out per changed file
+            if issue["file"] in files:
+                owner = issue["file"]
+            elif len(files) == 1:
+                owner = files[0]
+            else:
+                log.debug(f"{tool}: dropping issue outside the batch ({issue_file})")
+                continue
+            by_tool.setdefault((owner, tool), []).append(issue)
+    all_issues: List[Dict[str, Any]] = []
+    for f, tools in file_tools.items():
+        for tool in tools:
+            issues = by_tool.setdefault((f, tool), [])
+            issues.sort(key=lambda i: (i.get("line") or 0, i.get("column") or 0))
+            all_issues.extend(issues)
+
+    # Runs skipped by a budget or killed by a limit are not cached
+    cache.put_many((cache_keys[job], by_tool[job]) for job in linted)
+    cache.touch(hit_keys)
+    if linted:
+        evicted = cache.prune(Config.LINT_CACHE_MAX_ENTRIES)
+        if evicted:
+            log.debug(f"Lint cache: evicted {evicted} least recently used entries")
+    if cache.enabled and (cache.hits or cache.misses):
+        log.info(
+            f"Lint cache: {cache.hits}/{cache.hits + cache.misses} (file, tool) results "
+            f"reused ({cache.hit_rate:.0%})"
+        )
+    if from_artifacts:
+        log.info(
+            f"Lint artifacts: {from_artifacts} (file, tool) results taken from "
+            f"{artifacts.artifacts} CI reports"
+        )
+    if stats is not None:
+        stats.update(cache.stats())
+        if artifacts.artifacts:
+            stats["from_artifacts"] = from_artifacts
+    cache.close()
+
+    if over_budget:
+        log.warning(f"Linter time budget exhausted; {len(set(over_budget))} files not fully linted")
+    for tool, n in executor.skipped.items():
+        log.warning(f"{tool}: per-tool budget of {executor.budgets[tool]:.0f}s used up, {n} runs skipped")
     return all_issues
 
 
-def format_linter_report(issues: List[Dict[str, Any]]) -> str:
-    """Format a normalized issue list into a markdown report."""
+# ---------------------------------------------------------------------------
+# Diff scoping and report
+# ---------------------------------------------------------------------------
+_SCOPE_RANK = {"changed": 0, "context": 1, "untouched": 2}
+_SEVERITY_RANK = {"error": 0, "fatal": 0, "warning": 1}
+_REPORT_LIMIT = 15
+
+
+def scope_issues(
+    issues: List[Dict[str, Any]], diff: ParsedDiff, context: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Copies of the issues tagged with their scope in `diff`, ranked.
+
+    "changed": on an added/modified line (or file-level, line 0, in a
+    changed file); "context": within `context` lines (LINT_CONTEXT_LINES)
+    of a change; "untouched": anywhere else. The result is ordered by
+    scope, then severity, keeping the original order otherwise. The input
+    dicts (possibly shared with the lint cache) are left unchanged.
+    """
+    context = Config.LINT_CONTEXT_LINES if context is None else context
+    files = {f.path: f for f in diff.files}
+    changed: Dict[str, set] = {}
+    anchors: Dict[str, List[int]] = {}
+    for path, f in files.items():
+        changed[path] = f.added_lines
+        anchors[path] = sorted(f.added_lines | f.deletion_points)
+
+    scoped = []
+    for issue in issues:
+        path = issue.get("file", "")
+        line = issue.get("line") or 0
+        if path not in files:
+            scope = "untouched"
+        elif line == 0 or line in changed[path]:
+            scope = "changed"
+        elif context > 0 and any(abs(line - a) <= context for a in anchors[path]):
+            scope = "context"
+        else:
+            scope = "untouched"
+        scoped.append(dict(issue, scope=scope))
+    return sorted(
+        scoped,
+        key=lambda i: (
+            _SCOPE_RANK[i["scope"]],
+            _SEVERITY_RANK.get(str(i.get("severity", "")).lower(), 2),
+        ),
+    )
+
+
+def format_linter_report(
+    issues: List[Dict[str, Any]], diff: Optional[ParsedDiff] = None
+) -> str:
+    """Format a normalized issue list into a markdown report.
+
+    With `diff`, issues are scoped and ranked (scope_issues): those on
+    changed lines come first, issues on untouched lines are only counted.
+    """
     if not issues:
         return "No static analysis errors found. (Code passed the linter)"
 
+    untouched = 0
+    if diff is not None:
+        ranked = scope_issues(issues, diff)
+        shown = [i for i in ranked if i["scope"] != "untouched"]
+        untouched = len(ranked) - len(shown)
+        if not shown:
+            return (
+                f"No static analysis issues on changed lines "
+                f"({untouched} pre-existing issues on untouched lines omitted)."
+            )
+        issues = shown
+
     report = "### Static Analysis Report (HARD TRUTH)\n"
     report += "The following issues were detected by the linter. **You MUST address them:**\n"
 
     for i, issue in enumerate(issues):
-        if i >= 15:
-            report += f"\n... and {len(issues) - 15} more issues truncated."
+        if i >= _REPORT_LIMIT:
+            report += f"\n... and {len(issues) - _REPORT_LIMIT} more issues truncated."
             break
 
         file_pos = f"{issue.get('file', 'unknown')}:{issue.get('line', 0)}"
         severity = issue.get("severity", "warning").upper()
         linter = issue.get("linter", "linter")
         message = issue.get("message", "Unknown error")
+        near = " (near a change)" if issue.get("scope") == "context" else ""
 
-        report += f"{i+1}. [{linter}/{severity}] {file_pos}\n"
+        report += f"{i+1}. [{linter}/{severity}] {file_pos}{near}\n"
         report += f"   Error: {message}\n"
 
+    if untouched:
+        report += f"\n({untouched} pre-existing issues on untouched lines omitted.)\n"
     return report
 
 
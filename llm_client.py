@@ -4,11 +4,13 @@ Providers: Kimi, DeepSeek, Claude (OpenAI-compatible), OpenAI, etc.
 """
 
 import json
+import threading
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 import requests
 
+from cancellation import CancelToken, ReviewCancelled
 from logger import log
 
 
@@ -41,6 +43,8 @@ class OpenAICompatibleClient:
         temperature: float = 0.1,
         max_tokens: Optional[int] = None,
         response_format: Optional[Dict[str, str]] = None,
+        cancel_token: Optional[CancelToken] = None,
+        timeout: Optional[float] = None,
     ) -> LLMResponse:
         headers = {
             "Content-Type": "application/json",
@@ -65,12 +69,17 @@ class OpenAICompatibleClient:
                 f"LLM Request -> {self.model} | "
                 f"messages={len(messages)} chars={sum(len(m.get('content', '')) for m in messages)}"
             )
-            resp = requests.post(
-                self.chat_url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout,
-            )
+            if cancel_token is None:
+                resp = requests.post(
+                    self.chat_url,
+                    headers=headers,
+                    json=payload,
+                    timeout=timeout or self.timeout,
+                )
+            else:
+                resp = self._post_cancellable(
+                    headers, payload, cancel_token, timeout or self.timeout
+                )
             resp.raise_for_status()
             data = resp.json()
 
@@ -83,6 +92,9 @@ class OpenAICompatibleClient:
                 model=self.model,
             )
 
+        except ReviewCancelled:
+            log.warning(f"LLM Request to {self.model} aborted: run cancelled")
+            raise
         except requests.HTTPError as e:
             log.error(
                 f"LLM HTTP Error {e.response.status_code}: {e.response.text[:300]}"
@@ -92,6 +104,43 @@ class OpenAICompatibleClient:
             log.error(f"LLM Request Failed: {e}")
             raise
 
+    def _post_cancellable(
+        self,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        cancel_token: CancelToken,
+        timeout: float,
+    ) -> requests.Response:
+        """POST on a private session in a helper thread, polling the token.
+
+        On cancellation the session is closed and the call is abandoned, so
+        the run does not wait out the (up to `timeout`) LLM response.
+        """
+        cancel_token.raise_if_cancelled("before LLM request")
+        session = requests.Session()
+        box: Dict[str, Any] = {}
+        done = threading.Event()
+
+        def _call():
+            try:
+                box["resp"] = session.post(
+                    self.chat_url, headers=headers, json=payload, timeout=timeout
+                )
+            except BaseException as e:  # re-raised in the caller thread
+                box["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=_call, daemon=True).start()
+        while not done.wait(0.5):
+            if cancel_token.is_cancelled():
+                session.close()
+                raise ReviewCancelled(f"{cancel_token.reason} (in-flight LLM request)")
+        session.close()
+        if "error" in box:
+            raise box["error"]
+        return box["resp"]
+
 
 def create_client(config: Dict[str, Any]) -> OpenAICompatibleClient:
     """Factory: create client from config dict."""
@@ -16,8 +16,12 @@ Environment variables:
   PROJECT_ROOT        - Path to git repository
   ENABLE_LINTER       - "true" or "false"
   OUTPUT_FORMAT       - "json" or "markdown"
-  GIT_MODE            - "pr" (diff vs branch) or "patch" (HEAD commit)
+  GIT_MODE            - "pr" (diff vs branch), "patch" (HEAD commit) or
+                        "range" (every commit of COMMIT_RANGE)
   TARGET_BRANCH       - Target branch for PR mode
+  COMMIT_RANGE        - Commit range for range mode, e.g. "v1.2..main"
+  REVIEW_FROM_OBJECTS - "true" to review HEAD_REF without a checkout
+                        (automatic for bare / partial clones)
 """
 
 import json
@@ -27,6 +31,7 @@ import sys
 sys.path.append("db")
 
 from config import Config
+from git_helper import GitHelper
 from logger import log
 from review_pipeline import ReviewPipeline
 
@@ -40,25 +45,30 @@ def main():
         sys.exit(1)
 
     project_root = Config.PROJECT_ROOT
-    if not os.path.isdir(os.path.join(project_root, ".git")):
+    if not GitHelper.is_repository(project_root):
         log.critical(f"Not a git repository: {project_root}")
         sys.exit(1)
 
+    if Config.GIT_MODE == "range" and not Config.COMMIT_RANGE:
+        log.critical("GIT_MODE=range requires COMMIT_RANGE (e.g. 'A..B').")
+        sys.exit(1)
+
     # ---- Run pipeline ----
     pipeline = ReviewPipeline(project_root)
-    result = pipeline.run()
-
-    # ---- Save report ----
-    output_path = Config.OUTPUT_REPORT_PATH
     try:
-        with open(output_path, "w", encoding="utf-8") as f:
-            if Config.OUTPUT_FORMAT == "json":
-                json.dump(result, f, ensure_ascii=False, indent=2)
-            else:
-                f.write(_render_markdown(result))
-        log.info(f"Report saved to {os.path.abspath(output_path)}")
-    except Exception as e:
-        log.error(f"Failed to write report: {e}")
+        if Config.GIT_MODE == "range":
+            result = pipeline.run_range(Config.COMMIT_RANGE)
+        else:
+            result = pipeline.run()
+    finally:
+        pipeline.close()
+
+    # ---- Save report(s) ----
+    output_path = Config.OUTPUT_REPORT_PATH
+    _save_report(result, output_path)
+    base, ext = os.path.splitext(output_path)
+    for commit_report in result.get("commits", []):
+        _save_report(commit_report, f"{base}.{commit_report['commit'][:12]}{ext}")
 
     # ---- Console summary ----
     issues = result.get("issues", [])
@@ -83,17 +93,51 @@ def main():
     sys.exit(0)
 
 
+def _save_report(result: dict, output_path: str) -> None:
+    try:
+        with open(output_path, "w", encoding="utf-8") as f:
+            if Config.OUTPUT_FORMAT == "json":
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            else:
+                f.write(_render_markdown(result))
+        log.info(f"Report saved to {os.path.abspath(output_path)}")
+    except Exception as e:
+        log.error(f"Failed to write report: {e}")
+
+
 def _render_markdown(result: dict) -> str:
     lines = ["# Code Review Report\n"]
     lines.append(f"**Verdict:** {result.get('verdict', 'N/A')}\n")
     lines.append(f"**Summary:** {result.get('summary', '')}\n")
+    if result.get("commits"):
+        lines.append("## Commits\n")
+        for c in result["commits"]:
+            lines.append(
+                f"- `{c['commit'][:12]}` {c.get('verdict', 'N/A')} - {c.get('summary', '')}"
+            )
+        lines.append("")
+    if result.get("partitions"):
+        lines.append("## Subprojects\n")
+        for part in result["partitions"]:
+            lines.append(
+                f"- `{part['root']}` {part.get('verdict', 'N/A')} "
+                f"({len(part.get('files', []))} files) - {part.get('summary', '')}"
+            )
+        lines.append("")
+    if result.get("skipped_files"):
+        lines.append("## Skipped Files\n")
+        for item in result["skipped_files"]:
+            lines.append(f"- `{item['file']}` - {item['reason']}")
+        lines.append("")
     lines.append("## Issues\n")
     for issue in result.get("issues", []):
         sev = issue.get("severity", "INFO")
         cat = issue.get("category", "general")
         fp = issue.get("file", "unknown")
         line = issue.get("line", 0)
-        lines.append(f"### [{sev}] {cat} - {fp}:{line}\n")
+        commit = f" @ {issue['commit'][:12]}" if issue.get("commit") else ""
+        part = f" [{issue['partition']}]" if issue.get("partition") else ""
+        lines.append(f"### [{sev}] {cat} - {fp}:{line}{commit}{part}\n")
         lines.append(f"{issue.get('message', '')}\n")
         lines.append(f"**Suggestion:** {issue.get('suggestion', '')}\n")
     return "\n".join(lines)
@@ -0,0 +1,45 @@
+"""
+Monorepo partitioning: group a change set by the subproject it touches.
+
+A subproject root is the nearest directory (walking up from each changed
+file) that contains one of PARTITION_MARKERS, e.g. `services/api/go.mod`
+or `web/package.json`. Files outside any subproject form the "." partition.
+Each partition is linted, analysed and reviewed on its own slice of the diff.
+"""
+
+import os
+from typing import Callable, Dict, List
+
+from config import Config
+
+
+def partition_markers() -> List[str]:
+    return [m.strip() for m in Config.PARTITION_MARKERS.split(",") if m.strip()]
+
+
+def find_partition_root(rel_path: str, exists: Callable[[str], bool]) -> str:
+    """Nearest ancestor dir of `rel_path` holding a marker file ("." if none)."""
+    markers = partition_markers()
+    directory = os.path.dirname(rel_path)
+    while directory:
+        if any(exists(f"{directory}/{m}") for m in markers):
+            return directory
+        directory = os.path.dirname(directory)
+    return "."
+
+
+def partition_files(
+    changed_files: List[str], exists: Callable[[str], bool]
+) -> Dict[str, List[str]]:
+    """Map partition root -> changed files, in changed-file order."""
+    memo: Dict[str, bool] = {}
+
+    def _exists(path: str) -> bool:
+        if path not in memo:
+            memo[path] = exists(path)
+        return memo[path]
+
+    partitions: Dict[str, List[str]] = {}
+    for f in changed_files:
+        partitions.setdefault(find_partition_root(f, _exists), []).append(f)
+    return partitions
@@ -0,0 +1,417 @@
+"""
+In-process Python static analysis: compile() + ast, no subprocess, no .pyc.
+
+Each file is parsed and compiled in memory (syntax and symbol-table errors),
+then checked with a small set of fast pyflakes-style rules:
+  F821 undefined name         F401 unused import
+  F811 redefinition of unused name
+  F402 import shadowed by loop variable
+  E722 bare except
+Name resolution is deliberately conservative (order of definition is not
+checked, `from x import *` disables F821) so findings are worth reporting.
+Many files are analysed in a process pool.
+"""
+
+import ast
+import builtins
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import Config
+from logger import log
+
+# Bump when checks change, so cached results are invalidated
+ANALYZER_VERSION = "1"
+LINTER_NAME = "py_analyzer"
+
+# Below this many files a process pool costs more than it saves
+_POOL_MIN_FILES = 16
+
+_BUILTINS: Set[str] = set(dir(builtins)) | {
+    "__file__", "__name__", "__doc__", "__spec__", "__loader__", "__package__",
+    "__builtins__", "__path__", "__annotations__", "__dict__", "__module__", "__qualname__",
+    "__debug__", "__cached__", "WindowsError",
+}
+
+
+def _issue(path: str, line: int, column: int, severity: str, code: str, message: str) -> Dict[str, Any]:
+    return {
+        "file": path,
+        "line": line or 0,
+        "column": column or 0,
+        "severity": severity,
+        "message": f"[{code}] {message}",
+        "linter": LINTER_NAME,
+    }
+
+
+class _Scope:
+    def __init__(self, kind: str, parent: Optional["_Scope"]):
+        self.kind = kind  # module / function / class / comprehension
+        self.parent = parent
+        self.bindings: Set[str] = set()
+        self.imports: Dict[str, int] = {}  # name -> line of the import
+
+    def function_scope(self) -> "_Scope":
+        """Scope a walrus target binds in (comprehensions bind outward)."""
+        scope = self
+        while scope.kind == "comprehension" and scope.parent is not None:
+            scope = scope.parent
+        return scope
+
+
+def _decorated_overload(node: ast.AST) -> bool:
+    for dec in getattr(node, "decorator_list", []):
+        target = dec.func if isinstance(dec, ast.Call) else dec
+        name = target.attr if isinstance(target, ast.Attribute) else getattr(target, "id", "")
+        if name == "overload":
+            return True
+    return False
+
+
+def _catches_name_error(node: ast.Try) -> bool:
+    for handler in node.handlers:
+        types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+        for t in types:
+            if t is None or (isinstance(t, ast.Name) and t.id in ("NameError", "Exception", "BaseException")):
+                return True
+    return False
+
+
+class _Checker(ast.NodeVisitor):
+    def __init__(self, path: str):
+        self.path = path
+        self.issues: List[Dict[str, Any]] = []
+        self.module = _Scope("module", None)
+        self.scope = self.module
+        self.loads: List[Tuple[str, _Scope, ast.AST]] = []
+        self.used: Set[str] = set()
+        self.imports: List[Tuple[str, int, int, str]] = []  # name, line, col, display
+        self.star_import = False
+        self.all_names: Set[str] = set()
+        self._guarded = 0  # inside try/except NameError
+
+    # ----- scopes -----
+
+    def _push(self, kind: str) -> _Scope:
+        self.scope = _Scope(kind, self.scope)
+        return self.scope
+
+    def _pop(self) -> None:
+        self.scope = self.scope.parent or self.module
+
+    def _bind(self, name: str, scope: Optional[_Scope] = None) -> None:
+        (scope or self.scope).bindings.add(name)
+
+    def _visit_annotation(self, node: Optional[ast.AST]) -> None:
+        if node is None:
+            return
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            # String (forward-reference) annotation
+            try:
+                parsed = ast.parse(node.value, mode="eval")
+            except SyntaxError:
+                return
+            ast.increment_lineno(parsed, node.lineno - 1)
+            node = parsed.body
+        self.visit(node)
+
+    def _visit_arguments(self, args: ast.arguments) -> None:
+        for a in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if a is not None:
+                self._visit_annotation(a.annotation)
+        for default in args.defaults + [d for d in args.kw_defaults if d is not None]:
+            self.visit(default)
+
+    def _bind_arguments(self, args: ast.arguments) -> None:
+        for a in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if a is not None:
+                self._bind(a.arg)
+
+    # ----- definitions -----
+
+    def visit_Module(self, node: ast.Module) -> None:
+        self._check_redefinitions(node.body)
+        for stmt in node.body:
+            if isinstance(stmt, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+                self._collect_all(stmt)
+        self.generic_visit(node)
+
+    def _collect_all(self, stmt: ast.AST) -> None:
+        targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+        if not any(isinstance(t, ast.Name) and t.id == "__all__" for t in targets):
+            return
+        value = stmt.value
+        if isinstance(value, (ast.List, ast.Tuple)):
+            for elt in value.elts:
+                if isinstance(elt, ast.Constant) and isinstance(elt.value, str):
+                    self.all_names.add(elt.value)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._bind(node.name)
+        for dec in node.decorator_list:
+            self.visit(dec)
+        self._visit_arguments(node.args)
+        self._visit_annotation(node.returns)
+        self._push("function")
+        for param in getattr(node, "type_params", []):
+            self._bind(getattr(param, "name", ""))
+        self._bind_arguments(node.args)
+        for stmt in node.body:
+            self.visit(stmt)
+        self._pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        self._visit_arguments(node.args)
+        self._push("function")
+        self._bind_arguments(node.args)
+        self.visit(node.body)
+        self._pop()
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._bind(node.name)
+        for expr in node.decorator_list + node.bases + [k.value for k in node.keywords]:
+            self.visit(expr)
+        self._push("class")
+        for param in getattr(node, "type_params", []):
+            self._bind(getattr(param, "name", ""))
+        self._check_redefinitions(node.body)
+        for stmt in node.body:
+            self.visit(stmt)
+        self._pop()
+
+    def _visit_comprehension(self, node: ast.AST) -> None:
+        generators = node.generators
+        # The first iterable is evaluated in the enclosing scope
+        self.visit(generators[0].iter)
+        self._push("comprehension")
+        for i, gen in enumerate(generators):
+            if i:
+                self.visit(gen.iter)
+            self.visit(gen.target)
+            for cond in gen.ifs:
+                self.visit(cond)
+        if isinstance(node, ast.DictComp):
+            self.visit(node.key)
+            self.visit(node.value)
+        else:
+            self.visit(node.elt)
+        self._pop()
+
+    visit_ListComp = visit_SetComp = visit_GeneratorExp = visit_DictComp = _visit_comprehension
+
+    # ----- bindings -----
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".", 1)[0]
+            self._add_import(name, node, alias.asname and f"{alias.name} as {alias.asname}" or alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module == "__future__":
+            return
+        for alias in node.names:
+            if alias.name == "*":
+                self.star_import = True
+                continue
+            name = alias.asname or alias.name
+            self._add_import(name, node, f"{node.module or '.'}.{alias.name}")
+
+    def _add_import(self, name: str, node: ast.AST, display: str) -> None:
+        self._bind(name)
+        self.scope.imports[name] = node.lineno
+        self.imports.append((name, node.lineno, node.col_offset, display))
+
+    def visit_Global(self, node: ast.Global) -> None:
+        for name in node.names:
+            self._bind(name)
+            self._bind(name, self.module)
+
+    def visit_Nonlocal(self, node: ast.Nonlocal) -> None:
+        for name in node.names:
+            self._bind(name)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Del):
+            self.used.add(node.id)  # `import x; del x` is a deliberate probe
+        elif isinstance(node.ctx, ast.Load):
+            self.used.add(node.id)
+            if not self._guarded:
+                self.loads.append((node.id, self.scope, node))
+        else:
+            self._bind(node.id)
+
+    def visit_NamedExpr(self, node: ast.NamedExpr) -> None:
+        self.visit(node.value)
+        if isinstance(node.target, ast.Name):
+            self._bind(node.target.id, self.scope.function_scope())
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self._visit_annotation(node.annotation)
+        if node.value is not None:
+            self.visit(node.value)
+        self.visit(node.target)
+
+    def visit_arg(self, node: ast.arg) -> None:
+        self._visit_annotation(node.annotation)
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.type is None:
+            self.issues.append(_issue(
+                self.path, node.lineno, node.col_offset, "warning", "E722", "do not use bare 'except'"
+            ))
+        else:
+            self.visit(node.type)
+        if node.name:
+            self._bind(node.name)
+        for stmt in node.body:
+            self.visit(stmt)
+
+    def visit_Try(self, node: ast.Try) -> None:
+        guarded = _catches_name_error(node)
+        self._guarded += guarded
+        for stmt in node.body:
+            self.visit(stmt)
+        self._guarded -= guarded
+        for handler in node.handlers:
+            self.visit(handler)
+        for stmt in node.orelse + node.finalbody:
+            self.visit(stmt)
+
+    visit_TryStar = visit_Try
+
+    def visit_For(self, node: ast.For) -> None:
+        for target in ast.walk(node.target):
+            if isinstance(target, ast.Name) and target.id in self.scope.imports:
+                self.issues.append(_issue(
+                    self.path, target.lineno, target.col_offset, "warning", "F402",
+                    f"import '{target.id}' from line {self.scope.imports[target.id]} "
+                    f"shadowed by loop variable",
+                ))
+        self.generic_visit(node)
+
+    visit_AsyncFor = visit_For
+
+    def visit_MatchAs(self, node: ast.AST) -> None:
+        if getattr(node, "name", None):
+            self._bind(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchStar(self, node: ast.AST) -> None:
+        if getattr(node, "name", None):
+            self._bind(node.name)
+
+    def visit_MatchMapping(self, node: ast.AST) -> None:
+        if getattr(node, "rest", None):
+            self._bind(node.rest)
+        self.generic_visit(node)
+
+    # ----- checks -----
+
+    def _check_redefinitions(self, body: List[ast.stmt]) -> None:
+        """F811: a def/class/import rebinding a name never used since its last binding.
+
+        Checked on module and class bodies (function bodies would make the
+        walk quadratic in nesting depth for little gain).
+        """
+        pending: Dict[str, Tuple[int, bool]] = {}  # name -> (line, overload)
+        for stmt in body:
+            if pending:
+                for sub in ast.walk(stmt):
+                    if isinstance(sub, ast.Name) and isinstance(sub.ctx, ast.Load):
+                        pending.pop(sub.id, None)
+            names: List[str] = []
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names = [stmt.name]
+            elif isinstance(stmt, ast.Import):
+                # `import a.b` after `import a` adds a submodule, not a rebinding
+                names = [a.asname or a.name for a in stmt.names if a.asname or "." not in a.name]
+            elif isinstance(stmt, ast.ImportFrom):
+                names = [a.asname or a.name for a in stmt.names if a.name != "*"]
+            else:
+                if pending:
+                    for sub in ast.walk(stmt):
+                        if isinstance(sub, ast.Name) and not isinstance(sub.ctx, ast.Load):
+                            pending.pop(sub.id, None)
+                continue
+            overload = _decorated_overload(stmt)
+            for name in names:
+                previous = pending.get(name)
+                if previous and not (previous[1] or overload):
+                    self.issues.append(_issue(
+                        self.path, stmt.lineno, stmt.col_offset, "warning", "F811",
+                        f"redefinition of unused '{name}' from line {previous[0]}",
+                    ))
+                pending[name] = (stmt.lineno, overload)
+
+    def _resolves(self, name: str, scope: _Scope) -> bool:
+        current: Optional[_Scope] = scope
+        first = True
+        while current is not None:
+            # Class bodies are not visible from nested scopes
+            if (first or current.kind != "class") and name in current.bindings:
+                return True
+            first = False
+            current = current.parent
+        return name in _BUILTINS or (name == "__class__" and scope.kind == "function")
+
+    def finish(self) -> List[Dict[str, Any]]:
+        if not self.star_import:
+            for name, scope, node in self.loads:
+                if not self._resolves(name, scope):
+                    self.issues.append(_issue(
+                        self.path, node.lineno, node.col_offset, "error", "F821",
+                        f"undefined name '{name}'",
+                    ))
+        # Package __init__ files import to re-export
+        if os.path.basename(self.path) != "__init__.py":
+            for name, line, col, display in self.imports:
+                if name not in self.used and name not in self.all_names and not name.startswith("__"):
+                    self.issues.append(_issue(
+                        self.path, line, col, "warning", "F401", f"'{display}' imported but unused"
+                    ))
+        self.issues.sort(key=lambda i: (i["line"], i["column"]))
+        return self.issues
+
+
+def analyze_source(source: bytes, path: str) -> List[Dict[str, Any]]:
+    """Analyse one file's source in memory; never writes bytecode."""
+    try:
+        tree = ast.parse(source, filename=path)
+        # Symbol-table errors ('return' outside function, ...) surface on compile
+        compile(tree, path, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        return [_issue(path, e.lineno or 0, e.offset or 0, "error", "E999", f"SyntaxError: {e.msg}")]
+    except ValueError as e:  # e.g. source with NUL bytes
+        return [_issue(path, 0, 0, "error", "E999", str(e))]
+    checker = _Checker(path)
+    checker.visit(tree)
+    return checker.finish()
+
+
+def analyze_file(path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(path, "rb") as fh:
+            source = fh.read()
+    except OSError as e:
+        log.warning(f"py_analyzer: cannot read {path}: {e}")
+        return []
+    return analyze_source(source, path)
+
+
+def analyze_files(paths: List[str], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Analyse many files, in a process pool when there are enough of them."""
+    workers = workers or Config.LINT_WORKERS or os.cpu_count() or 1
+    workers = min(workers, len(paths))
+    if workers > 1 and len(paths) >= _POOL_MIN_FILES:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(paths) // (workers * 4))
+                results = list(pool.map(analyze_file, paths, chunksize=chunksize))
+            return [issue for issues in results for issue in issues]
+        except Exception as e:
+            log.warning(f"py_analyzer: process pool failed ({e}); analysing in-process")
+    return [issue for p in paths for issue in analyze_file(p)]
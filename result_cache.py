@@ -0,0 +1,159 @@
+"""
+Persistent result cache shared across review runs and processes.
+
+Stores JSON values in SQLite under (namespace, key). Used for file
+summaries and linter results so a cancelled/superseded or repeated run
+leaves reusable work behind. `created_at` is refreshed when an entry is
+reused (touch), so prune() evicts the least recently used entries.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from config import Config
+from logger import log
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS results (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_results_age ON results(namespace, created_at);
+"""
+
+
+def content_hash(data: Any) -> str:
+    """SHA-256 of str/bytes content, used as the cache key component."""
+    if isinstance(data, str):
+        data = data.encode("utf-8", errors="ignore")
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """Namespaced JSON key/value cache backed by SQLite (WAL mode)."""
+
+    def __init__(self, namespace: str, db_path: Optional[str] = None):
+        self.namespace = namespace
+        self.enabled = Config.ENABLE_RESULT_CACHE
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        if not self.enabled:
+            return
+        try:
+            self._conn = sqlite3.connect(
+                db_path or Config.RESULT_CACHE_DB, timeout=30, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=30000")
+            self._conn.executescript(_SCHEMA_SQL)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"Result cache disabled ({namespace}): {e}")
+            self._conn = None
+
+    def get(self, key: str) -> Optional[Any]:
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return json.loads(row[0]) if row else None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 3)}
+
+    def put(self, key: str, value: Any) -> None:
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (namespace, key, value, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value, ensure_ascii=False), time.time()),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"Result cache write failed ({self.namespace}): {e}")
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """Store several entries in one transaction."""
+        if self._conn is None:
+            return
+        now = time.time()
+        rows = [
+            (self.namespace, key, json.dumps(value, ensure_ascii=False), now)
+            for key, value in items
+        ]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results (namespace, key, value, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"Result cache write failed ({self.namespace}): {e}")
+
+    def touch(self, keys: Iterable[str]) -> None:
+        """Mark entries as just used, so prune() keeps them."""
+        if self._conn is None:
+            return
+        now = time.time()
+        rows = [(now, self.namespace, key) for key in keys]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "UPDATE results SET created_at = ? WHERE namespace = ? AND key = ?", rows
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"Result cache touch failed ({self.namespace}): {e}")
+
+    def prune(self, max_entries: int) -> int:
+        """Evict the least recently used entries beyond `max_entries`; returns the count."""
+        if self._conn is None or max_entries <= 0:
+            return 0
+        try:
+            with self._lock:
+                cur = self._conn.execute(
+                    "DELETE FROM results WHERE namespace = ? AND key IN ("
+                    "  SELECT key FROM results WHERE namespace = ?"
+                    "  ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, max_entries),
+                )
+                self._conn.commit()
+            return cur.rowcount
+        except sqlite3.Error as e:
+            log.warning(f"Result cache prune failed ({self.namespace}): {e}")
+            return 0
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
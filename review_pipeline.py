@@ -8,24 +8,68 @@ Flow:
   4. Sub-Agent       -> cheap model summarizes full files for context
   5. Parent-Agent    -> strong model reviews diff with all context
   6. Persistence     -> save structured result to DB + file
+
+Batch mode (`run_range`) repeats steps 1-6 for every commit of a range in
+one process, updating the graph incrementally and reusing caches.
+
+Incremental mode (REVIEW_INCREMENTAL) diffs the new head against the last
+reviewed head of the same branch/PR and carries forward the findings of
+untouched files.
+
+With REVIEW_DEADLINE_SEC set, stages get a share of the remaining time and
+are downgraded or skipped when it runs short (see deadline.py).
+
+With REVIEW_FROM_OBJECTS (or in a bare / partial clone) no checkout is
+needed: the head revision's files come from the object database and
+linters run on a sparse temp copy of the changed files and their configs.
+
+Stage outputs are checkpointed per (repo, base SHA, head SHA); a retried run
+of the same change set resumes at the stage that failed (see checkpoint.py).
 """
 
 import json
 import os
+import shutil
 import sys
-from typing import Any, Dict, List
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 sys.path.append("db")
 
-from config import Config
+import deadline as deadline_plan
+from cancellation import CancelToken, ReviewCancelled
+from checkpoint import CheckpointStore, RunCheckpoint
+from config import Config, get_sub_llm_config
 from logger import log
 from git_helper import GitHelper
-from linter_runner import format_linter_report, run_all_linters
+from linter_runner import (
+    LINT_PACKAGE_SIBLINGS,
+    LINTER_CONFIG_FILES,
+    format_linter_report,
+    run_all_linters,
+    scope_issues,
+)
 from agents.summarizer import FileSummarizer
 from agents.reviewer import CodeReviewer
-from graph_builder import KnowledgeGraph
+from graph_builder import KnowledgeGraph, MultiLangParser, graph_db_path
+from diff_parser import ParsedDiff
+from file_filter import GENERATED_ATTRS, filter_diff
+from partitions import partition_files
 from db import db
 
+_VERDICT_RANK = {"PASS": 0, "WARN": 1, "BLOCKER": 2}
+
+
+def _verdict_from_issues(issues: List[Dict[str, Any]]) -> str:
+    severities = {i.get("severity") for i in issues}
+    if "BLOCKER" in severities:
+        return "BLOCKER"
+    if "WARN" in severities:
+        return "WARN"
+    return "PASS"
+
 
 class ReviewPipeline:
     def __init__(self, project_root: str):
@@ -33,10 +77,54 @@ class ReviewPipeline:
         self.git = GitHelper(project_root)
         self.summarizer = FileSummarizer()
         self.reviewer = CodeReviewer()
-        self.kg = KnowledgeGraph(project_root) if Config.ENABLE_KG else None
+        self._repo_id: Optional[str] = None
+        self.kg = (
+            KnowledgeGraph(project_root, graph_db_path(self._get_repo_id()))
+            if Config.ENABLE_KG else None
+        )
+        self.cancel_token = CancelToken()
+        self.deadline = deadline_plan.Deadline()
+        self._team_rules: Optional[str] = None
+        self._fast_reviewer_inst: Optional[CodeReviewer] = None
+        self.checkpoints = CheckpointStore()
+        # GraphStore shares one SQLite connection; partitions update it in turn
+        self._kg_lock = threading.Lock()
+        self.from_objects = Config.REVIEW_FROM_OBJECTS or self.git.is_bare()
+
+    def run(
+        self,
+        target_branch: str = None,
+        cancel_token: Optional[CancelToken] = None,
+        review_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Execute the full review pipeline.
+
+        `review_key` (branch / PR id) overrides REVIEW_KEY for incremental mode.
+
+        When `cancel_token` is cancelled (e.g. a newer push superseded this
+        review) the run raises ReviewCancelled at the next stage boundary or
+        from inside an in-flight LLM call. Graph updates, summaries and linter
+        results finished so far stay cached for the next run.
+        """
+        self.cancel_token = cancel_token or CancelToken()
+        self.deadline = deadline_plan.Deadline(Config.REVIEW_DEADLINE_SEC)
+        try:
+            return self._run(target_branch, review_key)
+        except ReviewCancelled as e:
+            log.warning(f"Review cancelled: {e}")
+            raise
+
+    def close(self) -> None:
+        """Stop the git cat-file process, close the checkpoint store and graph."""
+        self.git.close()
+        self.checkpoints.close()
+        if self.kg:
+            self.kg.close()
+
+    def _check_cancel(self, stage: str) -> None:
+        self.cancel_token.raise_if_cancelled(stage)
 
-    def run(self, target_branch: str = None) -> Dict[str, Any]:
-        """Execute the full review pipeline."""
+    def _run(self, target_branch: str = None, review_key: Optional[str] = None) -> Dict[str, Any]:
 
         # ===== Step 0: Git Discovery =====
         log.info("=" * 50)
@@ -44,126 +132,766 @@ class ReviewPipeline:
         if not target_branch:
             target_branch = Config.TARGET_BRANCH or self.git.get_default_branch()
 
+        head_rev = Config.HEAD_REF or "HEAD"
+        head_sha = self.git.resolve_sha(head_rev)
+        if head_sha is None:
+            raise ValueError(f"Cannot resolve head revision '{head_rev}'")
+        review_key = review_key or Config.REVIEW_KEY or Config.HEAD_REF or self.git.get_current_branch()
+        if review_key == "HEAD":
+            # Detached checkout (CI, job worktrees) without a key: unrelated
+            # reviews would share the key "HEAD" and each other's findings
+            review_key = None
+        intent = self.git.get_pr_description_context(head_sha)
+        # Without a checkout, diff two revisions instead of the working tree
+        diff_head = head_sha if self.from_objects else None
+        if self.from_objects:
+            log.info(f"Reviewing {head_sha[:12]} from git objects (no checkout)")
+            self._ensure_graph(head_sha)
+
+        # One git run yields the file list, line counts and patch
         if Config.GIT_MODE == "patch":
             # Gerrit-style: review latest commit only
-            changed_files_rel = self.git.get_latest_commit_files()
-            diff = self.git.get_latest_commit_diff()
+            base = f"{head_sha}~1"
+            checkpoint = self._checkpoint(base, head_sha)
+            discovery = checkpoint.load("discovery")
+            diff = (
+                ParsedDiff.from_dict(discovery) if discovery
+                else self.git.get_parsed_diff(head=head_sha)
+            )
         else:
-            # PR-style: diff against target branch
-            changed_files_rel = self.git.get_changed_files(target_branch)
-            diff = self.git.get_project_diff(target_branch)
+            # PR-style: diff against the merge-base with the target branch,
+            # so commits that landed on the target since are not reviewed
+            base = self.git.get_merge_base(target_branch, head_sha)
+            log.info(f"Merge-base with {target_branch}: {base[:12]}")
+            if Config.REVIEW_INCREMENTAL and review_key is None:
+                log.info("Incremental: no review key on a detached HEAD (set REVIEW_KEY), full review")
+            elif Config.REVIEW_INCREMENTAL:
+                last = db.get_last_review(review_key)
+                if last and self.git.commit_exists(last["head_sha"]):
+                    return self._run_incremental(
+                        last, self.git.get_parsed_diff(base, diff_head),
+                        intent, head_sha, review_key, base,
+                    )
+                log.info(f"Incremental: no usable previous review for '{review_key}', full review")
+            checkpoint = self._checkpoint(base, head_sha)
+            discovery = checkpoint.load("discovery")
+            diff = (
+                ParsedDiff.from_dict(discovery) if discovery
+                else self.git.get_parsed_diff(base, diff_head)
+            )
+        checkpoint.save("discovery", diff.to_dict())
 
-        if not changed_files_rel:
+        return self._review_changes(
+            diff, intent, content_rev=head_sha if self.from_objects else None,
+            head_sha=head_sha, review_key=review_key, checkpoint=checkpoint, base_rev=base,
+        )
+
+    def _run_incremental(
+        self,
+        last: Dict[str, Any],
+        target_diff: ParsedDiff,
+        intent: str,
+        head_sha: str,
+        review_key: str,
+        base_rev: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Review only files touched since the last reviewed head."""
+        last_head = last["head_sha"]
+        since_last = self.git.get_parsed_diff(last_head, head_sha if self.from_objects else None)
+        touched = set(since_last.paths)
+        changed_files_rel = target_diff.paths
+        # Files never reviewed before (e.g. target branch moved) need a full diff
+        unseen = [f for f in changed_files_rel if f not in last["files"] and f not in touched]
+        to_review = [f for f in changed_files_rel if f in touched] + unseen
+        carried = {
+            f: last["files"].get(f, [])
+            for f in changed_files_rel
+            if f not in to_review
+        }
+        log.info(
+            f"Incremental vs {last_head[:12]}: {len(to_review)} files to review, "
+            f"{len(carried)} carried forward"
+        )
+        if not to_review:
+            return self._carry_forward_only(last, carried, head_sha, review_key)
+
+        diff = since_last.for_files([f for f in to_review if f not in unseen]).merge(
+            target_diff.for_files(unseen)
+        )
+        result = self._review_changes(
+            diff, intent, content_rev=head_sha if self.from_objects else None,
+            head_sha=head_sha, review_key=review_key, carried=carried,
+            checkpoint=self._checkpoint(last_head, head_sha), base_rev=base_rev,
+        )
+        result["incremental"] = {"base_head": last_head, "reviewed": to_review, "carried_forward": sorted(carried)}
+        return result
+
+    def _carry_forward_only(
+        self,
+        last: Dict[str, Any],
+        carried: Dict[str, List[Dict[str, Any]]],
+        head_sha: str,
+        review_key: str,
+    ) -> Dict[str, Any]:
+        issues = [dict(i, carried_forward=True) for f in sorted(carried) for i in carried[f]]
+        result = {
+            "verdict": _verdict_from_issues(issues),
+            "summary": f"No changes since last review at {last['head_sha'][:12]}; findings carried forward.",
+            "issues": issues,
+            "files_reviewed": [],
+            "incremental": {"base_head": last["head_sha"], "reviewed": [], "carried_forward": sorted(carried)},
+            "_meta": dict(last["report"].get("_meta", {}), duration_sec=0),
+        }
+        if last["head_sha"] != head_sha:
+            db.save_review_record(
+                "GIT_DIFF_BATCH", result["verdict"], json.dumps(result, ensure_ascii=False),
+                review_key=review_key, head_sha=head_sha, file_results=carried,
+            )
+        return result
+
+    def run_range(
+        self,
+        rev_range: str,
+        cancel_token: Optional[CancelToken] = None,
+    ) -> Dict[str, Any]:
+        """Review each commit of `rev_range` (e.g. "A..B") in one process.
+
+        The graph is built at the range base in a throwaway DB and updated per
+        commit from the commit's blobs, so each commit is analysed against the
+        tree it was written on and the repository's shared graph is left as
+        is; summary and linter caches are content-keyed, so files that do
+        not change between commits are never summarized or linted twice.
+        Returns a combined report with the per-commit reports under "commits".
+        """
+        self.cancel_token = cancel_token or CancelToken()
+        self.deadline = deadline_plan.Deadline(Config.REVIEW_DEADLINE_SEC)
+        commits = self.git.get_commit_range(rev_range)
+        log.info("=" * 50)
+        log.info(f"Batch review: {len(commits)} commits in {rev_range}")
+        if not commits:
+            return {"verdict": "PASS", "summary": f"No commits in {rev_range}.", "issues": [], "commits": []}
+
+        shared_kg, graph_dir = self.kg, None
+        if shared_kg is not None:
+            graph_dir = tempfile.mkdtemp(prefix="review_graph_")
+            self.kg = KnowledgeGraph(self.project_root, os.path.join(graph_dir, "graph.db"))
+            base = self.git.resolve_sha(f"{commits[0]}~1")
+            if base:  # else the range starts at the root commit: empty graph
+                self._ensure_graph(base)
+
+        reports: List[Dict[str, Any]] = []
+        try:
+            for i, sha in enumerate(commits, 1):
+                self._check_cancel(f"commit {sha[:12]}")
+                log.info("=" * 50)
+                log.info(f"Commit {i}/{len(commits)}: {sha[:12]}")
+                diff = self.git.get_parsed_diff(head=sha)
+                report = self._review_changes(
+                    diff,
+                    self.git.get_pr_description_context(sha),
+                    content_rev=sha,
+                    record_key=f"COMMIT:{sha}",
+                    head_sha=sha,
+                    checkpoint=self._checkpoint(f"{sha}~1", sha),
+                )
+                report["commit"] = sha
+                reports.append(report)
+        except ReviewCancelled as e:
+            log.warning(f"Batch review cancelled after {len(reports)} commits: {e}")
+            raise
+        finally:
+            if shared_kg is not None:
+                self.kg.close()
+                shutil.rmtree(graph_dir, ignore_errors=True)
+                self.kg = shared_kg
+        return self._combine_reports(rev_range, reports)
+
+    def _combine_reports(self, rev_range: str, reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        verdict = "PASS"
+        issues: List[Dict[str, Any]] = []
+        for r in reports:
+            v = r.get("verdict", "WARN")
+            if _VERDICT_RANK.get(v, 1) > _VERDICT_RANK[verdict]:
+                verdict = v
+            for issue in r.get("issues", []):
+                issues.append(dict(issue, commit=r["commit"]))
+        flagged = sum(1 for r in reports if r.get("verdict") != "PASS")
+        return {
+            "verdict": verdict,
+            "summary": f"{len(reports)} commits reviewed in {rev_range}; {flagged} flagged.",
+            "issues": issues,
+            "commits": reports,
+            "_meta": {
+                "range": rev_range,
+                "duration_sec": round(
+                    sum(r.get("_meta", {}).get("duration_sec", 0) or 0 for r in reports), 2
+                ),
+                "model": self.reviewer.model,
+            },
+        }
+
+    def _review_changes(
+        self,
+        diff: ParsedDiff,
+        intent: str,
+        content_rev: Optional[str] = None,
+        record_key: str = "GIT_DIFF_BATCH",
+        head_sha: Optional[str] = None,
+        review_key: Optional[str] = None,
+        carried: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        checkpoint: Optional[RunCheckpoint] = None,
+        base_rev: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run steps 1-5 on one change set.
+
+        Every stage takes its file list and patch text from `diff`. With
+        `content_rev` the new file contents are read from that commit instead
+        of the working tree (batch mode, review without a checkout).
+        Binary, generated and oversized files are filtered out first and
+        listed under "skipped_files". `carried` holds per-file issues of
+        files not re-reviewed in incremental mode; they are merged into the
+        result and persisted with it. Stages found in `checkpoint` are not
+        re-run; degraded or failed stages are never checkpointed. `base_rev`
+        is the diff base, used to scope linters that can report new issues only.
+
+        When the files span several subprojects (monorepo), steps 1-4 run
+        per partition in parallel and the reports are merged.
+        """
+        checkpoint = checkpoint or self.checkpoints.run(self._get_repo_id(), None, None)
+        if not diff.paths:
             log.warning("No changed files detected. Exiting.")
             return {"verdict": "PASS", "summary": "No changes to review.", "issues": []}
 
-        if not diff or not diff.strip():
+        diff, skipped = self._filter_files(diff, content_rev)
+        changed_files_rel = diff.paths
+        if not changed_files_rel:
+            log.warning("All changed files were filtered out. Exiting.")
+            return {
+                "verdict": "PASS", "summary": "Only skipped files changed.",
+                "issues": [], "skipped_files": skipped,
+            }
+        contents = self.git.get_head_contents(diff, content_rev) if content_rev else None
+
+        if not diff.text().strip():
             log.warning("Empty diff. Exiting.")
-            return {"verdict": "PASS", "summary": "Empty diff.", "issues": []}
+            return {"verdict": "PASS", "summary": "Empty diff.", "issues": [], "skipped_files": skipped}
+
+        # ===== Step 2: Team Rules =====
+        # Loaded once for the whole change set, before partitions fan out
+        self._check_cancel("Step 2: Team Rules")
+        log.info("Step 2: Loading Team Rules")
+        team_rules = checkpoint.load("rules")
+        if team_rules is None:
+            team_rules = self._load_team_rules()
+            if self._team_rules is not None:
+                checkpoint.save("rules", team_rules)
+
+        partitions = self._partition(changed_files_rel, contents, head_sha)
+        if len(partitions) > 1:
+            review_result = self._review_partitions(
+                partitions, diff, intent, team_rules, contents, checkpoint, head_sha, base_rev
+            )
+        else:
+            review_result = self._review_partition(
+                diff, intent, team_rules, contents, checkpoint, head_sha, base_rev=base_rev
+            )
+
+        if self.deadline.enabled:
+            review_result["degradations"] = list(self.deadline.degradations)
+            review_result.setdefault("_meta", {})["deadline"] = self.deadline.summary()
+        if checkpoint.resumed:
+            review_result.setdefault("_meta", {})["resumed_stages"] = list(checkpoint.resumed)
+        if skipped:
+            review_result["skipped_files"] = skipped
+
+        file_results: Dict[str, List[Dict[str, Any]]] = {f: [] for f in changed_files_rel}
+        for issue in review_result.get("issues", []):
+            file_results.setdefault(issue.get("file", "unknown"), []).append(issue)
+        if carried:
+            for f, issues in carried.items():
+                file_results[f] = issues
+                review_result.setdefault("issues", []).extend(
+                    dict(i, carried_forward=True) for i in issues
+                )
+            carried_verdict = _verdict_from_issues(
+                [i for issues in carried.values() for i in issues]
+            )
+            if _VERDICT_RANK[carried_verdict] > _VERDICT_RANK.get(review_result.get("verdict"), 1):
+                review_result["verdict"] = carried_verdict
+
+        # ===== Step 5: Persistence =====
+        self._check_cancel("Step 5: Persistence")
+        log.info("Step 5: Saving Results")
+        failed = bool(review_result.get("_meta", {}).get("error"))
+        try:
+            verdict = review_result.get("verdict", "WARN")
+            # A failed review is recorded without head / per-file results, so
+            # incremental mode does not take its (missing) findings as reviewed
+            db.save_review_record(
+                record_key, verdict, json.dumps(review_result, ensure_ascii=False),
+                review_key=review_key,
+                head_sha=None if failed else head_sha,
+                file_results=None if failed else file_results,
+            )
+        except Exception as e:
+            log.error(f"DB save failed: {e}")
+
+        # A failed review keeps its checkpoints so the retry resumes here
+        if not failed:
+            checkpoint.clear()
+
+        return review_result
+
+    def _review_partitions(
+        self,
+        partitions: Dict[str, List[str]],
+        diff: ParsedDiff,
+        intent: str,
+        team_rules: str,
+        contents: Optional[Dict[str, Optional[str]]],
+        checkpoint: RunCheckpoint,
+        head_sha: Optional[str] = None,
+        base_rev: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Review each subproject on its own diff slice in parallel, then merge."""
+        log.info(
+            f"Monorepo: {len(partitions)} partitions "
+            f"({', '.join(f'{root}: {len(files)} files' for root, files in partitions.items())})"
+        )
+        workers = max(1, min(Config.PARTITION_WORKERS, len(partitions)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="partition") as pool:
+            futures = {
+                root: pool.submit(
+                    self._review_partition,
+                    diff.for_files(files),
+                    intent,
+                    team_rules,
+                    contents,
+                    checkpoint.scoped(root),
+                    head_sha,
+                    root,
+                    base_rev,
+                )
+                for root, files in partitions.items()
+            }
+            results = {root: fut.result() for root, fut in futures.items()}
+        return self._merge_partitions(results)
+
+    def _merge_partitions(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        verdict = "PASS"
+        issues: List[Dict[str, Any]] = []
+        parts: List[Dict[str, Any]] = []
+        tokens: Dict[str, int] = {}
+        errors: List[str] = []
+        for root, r in results.items():
+            v = r.get("verdict", "WARN")
+            if _VERDICT_RANK.get(v, 1) > _VERDICT_RANK[verdict]:
+                verdict = v
+            issues.extend(dict(i, partition=root) for i in r.get("issues", []))
+            meta = r.get("_meta", {})
+            for k, n in (meta.get("tokens") or {}).items():
+                if isinstance(n, int):
+                    tokens[k] = tokens.get(k, 0) + n
+            if meta.get("error"):
+                errors.append(f"{root}: {meta['error']}")
+            parts.append({
+                "root": root,
+                "verdict": v,
+                "summary": r.get("summary", ""),
+                "files": r.get("files_reviewed", []),
+                "issues_found": len(r.get("issues", [])),
+                "diff_truncated": r.get("diff_truncated", False),
+            })
+        flagged = sum(1 for p in parts if p["verdict"] != "PASS")
+        meta = {
+            "model": self.reviewer.model,
+            "duration_sec": max((r.get("_meta", {}).get("duration_sec") or 0) for r in results.values()),
+            "tokens": tokens,
+        }
+        if errors:
+            meta["error"] = "; ".join(errors)
+        return {
+            "verdict": verdict,
+            "summary": f"{len(parts)} subprojects reviewed; {flagged} flagged.",
+            "issues": issues,
+            "partitions": parts,
+            "static_analysis": {
+                "enabled": Config.ENABLE_LINTER,
+                "issues_found": sum(r.get("static_analysis", {}).get("issues_found", 0) for r in results.values()),
+            },
+            "files_reviewed": [f for p in parts for f in p["files"]],
+            "diff_truncated": any(p["diff_truncated"] for p in parts),
+            "_meta": meta,
+        }
+
+    def _review_partition(
+        self,
+        parsed_diff: ParsedDiff,
+        intent: str,
+        team_rules: str,
+        contents: Optional[Dict[str, Optional[str]]],
+        checkpoint: RunCheckpoint,
+        head_sha: Optional[str] = None,
+        label: str = "",
+        base_rev: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Steps 1, 2.5, 3 and 4 for one subproject (or the whole change set)."""
+        tag = f"[{label}] " if label else ""
+        changed_files_rel = parsed_diff.paths
+        diff = parsed_diff.text()
+        if not diff.strip():
+            log.info(f"{tag}No reviewable diff")
+            return {
+                "verdict": "PASS", "summary": "No reviewable diff.", "issues": [],
+                "files_reviewed": changed_files_rel,
+            }
 
         diff_truncated = False
         if len(diff) > Config.MAX_DIFF_LENGTH:
             log.warning(
-                f"Diff truncated: {len(diff)} -> {Config.MAX_DIFF_LENGTH} chars"
+                f"{tag}Diff truncated: {len(diff)} -> {Config.MAX_DIFF_LENGTH} chars"
             )
             diff = diff[: Config.MAX_DIFF_LENGTH]
             diff_truncated = True
 
-        intent = self.git.get_pr_description_context()
-        log.info(f"Files: {len(changed_files_rel)} | Diff chars: {len(diff)}")
+        log.info(f"{tag}Files: {len(changed_files_rel)} | Diff chars: {len(diff)}")
+        read_file = self._content_reader(contents)
 
         # ===== Step 1: Static Analysis (Hard Truth, Zero Tokens) =====
-        log.info("Step 1: Static Analysis")
+        self._check_cancel("Step 1: Static Analysis")
+        log.info(f"{tag}Step 1: Static Analysis")
         static_report = "Static analysis disabled."
         linter_issues: List[Dict[str, Any]] = []
+        lint_cache: Dict[str, Any] = {}
+        lint_failures: List[Dict[str, Any]] = []
+        lint_budget = self.deadline.budget("lint")
+        lint_done = checkpoint.load("lint") if Config.ENABLE_LINTER else None
 
-        if Config.ENABLE_LINTER:
-            linter_issues = run_all_linters(changed_files_rel, self.project_root)
+        if lint_done is not None:
+            linter_issues = lint_done["issues"]
+            static_report = lint_done["report"]
+        elif Config.ENABLE_LINTER and lint_budget < deadline_plan.LINT_SKIP_BELOW:
+            self.deadline.degrade("static analysis skipped")
+            static_report = "Static analysis skipped (time budget exhausted)."
+        elif Config.ENABLE_LINTER:
+            fast = lint_budget < deadline_plan.LINT_FAST_BELOW
+            if fast:
+                self.deadline.degrade("fast linters only")
+            lint_root = self.project_root
+            if contents is not None:
+                lint_files = {f: contents.get(f) for f in changed_files_rel}
+                if head_sha:
+                    lint_files.update(self._lint_context(head_sha, changed_files_rel))
+                lint_root = self._materialize(lint_files)
+            lint_started = self.deadline.elapsed()
+            try:
+                linter_issues = run_all_linters(
+                    changed_files_rel, lint_root, self.cancel_token,
+                    fast=fast,
+                    time_budget=lint_budget if self.deadline.enabled else None,
+                    # A sparse materialization has no history to compare with
+                    base_rev=base_rev if lint_root == self.project_root else None,
+                    stats=lint_cache,
+                    failures=lint_failures,
+                )
+            finally:
+                if lint_root != self.project_root:
+                    shutil.rmtree(lint_root, ignore_errors=True)
             if linter_issues:
-                static_report = format_linter_report(linter_issues)
+                linter_issues = scope_issues(linter_issues, parsed_diff)
+                static_report = format_linter_report(linter_issues, parsed_diff)
                 log.info(f"Static analysis found {len(linter_issues)} issues")
             else:
                 static_report = "No static analysis issues found."
                 log.info("Static analysis clean")
+            stopped = [f["reason"] for f in lint_failures if f["kind"] == "stopped"]
+            skipped = [f["reason"] for f in lint_failures if f["kind"] == "skipped"]
+            if stopped:
+                static_report += f"\n(Incomplete: some linter runs were stopped: {'; '.join(stopped)}.)"
+            if skipped:
+                static_report += f"\n(Incomplete: some linter runs were skipped: {'; '.join(skipped)}.)"
+            # Killed runs and runs skipped by a per-tool budget both leave
+            # (file, tool) pairs unlinted, so neither result may be checkpointed
+            complete = not fast and not stopped and not skipped
+            if complete and self.deadline.elapsed() - lint_started <= lint_budget:
+                checkpoint.save("lint", {"issues": linter_issues, "report": static_report})
         else:
             log.info("Linter disabled by config")
 
-        # ===== Step 2: Team Rules =====
-        log.info("Step 2: Loading Team Rules")
-        try:
-            db.init_tables()
-            db.sync_rules_from_json(Config.RULES_JSON_PATH)
-            team_rules = db.get_active_rules()
-        except Exception as e:
-            log.error(f"DB error: {e}")
-            team_rules = "No team rules available."
-
         # ===== Step 2.5: Impact Radius (Blast Radius) =====
-        log.info("Step 2.5: Impact Radius Analysis")
+        self._check_cancel("Step 2.5: Impact Radius")
+        log.info(f"{tag}Step 2.5: Impact Radius Analysis")
         impact_report = "Impact analysis disabled."
         impacted_files = []
-        if self.kg and changed_files_rel:
+        impact_budget = self.deadline.budget("impact")
+        impact_done = checkpoint.load("impact") if self.kg else None
+        if impact_done is not None:
+            impact_report = impact_done["report"]
+            impacted_files = impact_done["impacted_files"]
+        elif self.kg and changed_files_rel and impact_budget < deadline_plan.IMPACT_SKIP_BELOW:
+            self.deadline.degrade("impact analysis skipped")
+            impact_report = "Impact analysis skipped (time budget exhausted)."
+        elif self.kg and changed_files_rel:
+            depth = 2
+            if impact_budget < deadline_plan.IMPACT_SHALLOW_BELOW:
+                self.deadline.degrade("impact depth reduced to 1")
+                depth = 1
             try:
-                abs_changed = [
-                    os.path.join(self.project_root, f)
-                    for f in changed_files_rel
-                ]
-                # Incrementally update graph for changed files
-                self.kg.parse_project(changed_files=abs_changed)
-                impact_data = self.kg.get_impact_data(abs_changed)
-                impact_report = self.kg.get_impact_report(abs_changed)
+                # Incrementally update graph for changed files (and drop the
+                # old paths of renamed ones)
+                renamed = [f.old_path for f in parsed_diff.files if f.old_path and f.status == "R"]
+                with self._kg_lock:
+                    if contents is None:
+                        self.kg.parse_project(changed_files=changed_files_rel + renamed)
+                    else:
+                        updates = {f: contents.get(f) for f in changed_files_rel}
+                        updates.update((f, None) for f in renamed)
+                        self.kg.update_from_contents(updates)
+                    impact_data = self.kg.get_impact_data(changed_files_rel, max_depth=depth)
+                    impact_report = self.kg.get_impact_report(changed_files_rel, result=impact_data)
                 impacted_files = impact_data.get("impacted_files", [])
                 log.info(
                     f"Impact: {impact_data.get('seed_count', 0)} changed nodes, "
                     f"{impact_data.get('total_impacted', 0)} impacted nodes, "
                     f"{len(impacted_files)} impacted files"
                 )
+                if depth == 2:
+                    checkpoint.save(
+                        "impact", {"report": impact_report, "impacted_files": impacted_files}
+                    )
             except Exception as e:
                 log.error(f"Impact analysis failed: {e}")
                 impact_report = f"Impact analysis error: {e}"
 
         # ===== Step 3: Sub-Agent Summarization (Cheap) =====
-        log.info("Step 3: File Summarization (Sub-Agent)")
-        summaries = []
-        for f in changed_files_rel:
-            abs_path = os.path.join(self.project_root, f)
-            if not os.path.exists(abs_path):
-                continue
+        self._check_cancel("Step 3: File Summarization")
+        log.info(f"{tag}Step 3: File Summarization (Sub-Agent)")
+        summaries = checkpoint.load("summaries")
+        pending = changed_files_rel if summaries is None else []
+        summaries = summaries or []
+        summary_end = self.deadline.elapsed() + self.deadline.budget("summarize")
+        graph_fallback = 0
+        summary_failed = False
+        for f in pending:
+            self._check_cancel("Step 3: File Summarization")
             try:
-                with open(abs_path, "r", encoding="utf-8", errors="ignore") as fh:
-                    content = fh.read()
-                summary = self.summarizer.summarize(f, content)
+                content = read_file(f)
+                if content is None:
+                    continue
+                time_left = summary_end - self.deadline.elapsed()
+                if time_left < deadline_plan.SUMMARY_LLM_EST_SEC and not self.summarizer.cached(f, content):
+                    summaries.append(self._graph_summary(f, content))
+                    graph_fallback += 1
+                    continue
+                summary = self.summarizer.summarize(
+                    f, content, self.cancel_token,
+                    timeout=time_left if self.deadline.enabled else None,
+                )
                 summaries.append(summary)
+                if summary.get("purpose") in ("N/A", "Parse error") and content.strip():
+                    summary_failed = True
             except Exception as e:
+                summary_failed = True
                 log.warning(f"Failed to summarize {f}: {e}")
+        if graph_fallback:
+            self.deadline.degrade(f"graph-based summaries for {graph_fallback} files")
+        elif pending and not summary_failed:
+            checkpoint.save("summaries", summaries)
 
         # ===== Step 4: Parent-Agent Review (Strong) =====
-        log.info("Step 4: Code Review (Parent-Agent)")
-        review_result = self.reviewer.review(
-            diff=diff,
-            file_summaries=summaries,
-            static_analysis=static_report,
-            team_rules=team_rules,
-            intent=intent,
-            impact_analysis=impact_report,
-        )
+        self._check_cancel("Step 4: Code Review")
+        log.info(f"{tag}Step 4: Code Review (Parent-Agent)")
+        review_time = self.deadline.remaining() - deadline_plan.REVIEW_SAFETY_MARGIN
+        reviewer = self.reviewer
+        if review_time < deadline_plan.REVIEW_SKIP_BELOW:
+            self.deadline.degrade("LLM review skipped")
+            review_result = {
+                "verdict": "WARN",
+                "summary": "Time budget exhausted before the LLM review. Manual review required.",
+                "issues": [],
+                "_meta": {"model": None, "error": "deadline_exceeded"},
+            }
+        else:
+            if review_time < deadline_plan.REVIEW_FAST_MODEL_BELOW:
+                reviewer = self._fast_reviewer()
+                self.deadline.degrade(f"review with smaller model {reviewer.model}")
+            review_result = reviewer.review(
+                diff=diff,
+                file_summaries=summaries,
+                static_analysis=static_report,
+                team_rules=team_rules,
+                intent=intent,
+                impact_analysis=impact_report,
+                cancel_token=self.cancel_token,
+                timeout=review_time if self.deadline.enabled else None,
+            )
 
         # Enrich result with pipeline metadata
         review_result["static_analysis"] = {
             "enabled": Config.ENABLE_LINTER,
             "issues_found": len(linter_issues),
+            "issues_on_changed_lines": sum(
+                1 for i in linter_issues if i.get("scope") == "changed"
+            ),
         }
+        if lint_cache:
+            review_result["static_analysis"]["cache"] = lint_cache
+        if lint_failures:
+            review_result["static_analysis"]["stopped_runs"] = lint_failures
         review_result["files_reviewed"] = changed_files_rel
         review_result["diff_truncated"] = diff_truncated
 
-        # ===== Step 5: Persistence =====
-        log.info("Step 5: Saving Results")
-        try:
-            verdict = review_result.get("verdict", "WARN")
-            db.save_review_record(
-                "GIT_DIFF_BATCH", verdict, json.dumps(review_result, ensure_ascii=False)
+        return review_result
+
+    # ===== Helpers =====
+
+    def _get_repo_id(self) -> str:
+        if self._repo_id is None:
+            try:
+                self._repo_id = self.git.get_repo_id()
+            except Exception:
+                self._repo_id = os.path.realpath(self.project_root)
+        return self._repo_id
+
+    def _checkpoint(self, base_rev: str, head_sha: Optional[str]) -> RunCheckpoint:
+        """Checkpoint handle for base_rev..head_sha (no-op if base does not resolve)."""
+        base_sha = self.git.resolve_sha(base_rev) if Config.ENABLE_CHECKPOINTS else None
+        return self.checkpoints.run(self._get_repo_id(), base_sha, head_sha)
+
+    def _partition(
+        self,
+        changed_files_rel: List[str],
+        contents: Optional[Dict[str, Optional[str]]],
+        head_sha: Optional[str],
+    ) -> Dict[str, List[str]]:
+        """Group files by subproject root; a single group when partitioning is off."""
+        if not Config.ENABLE_PARTITIONS:
+            return {".": list(changed_files_rel)}
+        if contents is None:
+            return partition_files(
+                changed_files_rel,
+                lambda rel: os.path.exists(os.path.join(self.project_root, rel)),
             )
-        except Exception as e:
-            log.error(f"DB save failed: {e}")
+        tree = set(self.git.list_files(head_sha)) if head_sha else set()
+        return partition_files(
+            changed_files_rel,
+            lambda rel: contents.get(rel) is not None if rel in contents else rel in tree,
+        )
 
-        return review_result
+    def _fast_reviewer(self) -> CodeReviewer:
+        """Reviewer on the sub-agent (smaller, faster) model, for deadline pressure."""
+        if self._fast_reviewer_inst is None:
+            self._fast_reviewer_inst = CodeReviewer(config=get_sub_llm_config())
+        return self._fast_reviewer_inst
+
+    def _graph_summary(self, rel: str, content: str) -> Dict[str, Any]:
+        """Zero-token summary from graph nodes (or a direct parse without KG)."""
+        nodes: List[Dict[str, Any]] = []
+        if self.kg:
+            with self._kg_lock:
+                nodes = self.kg.get_nodes_by_file(rel)
+        if not nodes:
+            parsed, _ = MultiLangParser().parse(rel, content)
+            nodes = [n.__dict__ for n in parsed]
+        return self.summarizer.graph_summary(rel, content, nodes)
+
+    def _load_team_rules(self) -> str:
+        """Team rules are loaded once per pipeline (batch mode reuses them)."""
+        if self._team_rules is None:
+            try:
+                db.init_tables()
+                db.sync_rules_from_json(Config.RULES_JSON_PATH)
+                self._team_rules = db.get_active_rules()
+            except Exception as e:
+                log.error(f"DB error: {e}")
+                return "No team rules available."
+        return self._team_rules
+
+    def _content_reader(
+        self, contents: Optional[Dict[str, Optional[str]]]
+    ) -> Callable[[str], Optional[str]]:
+        """Return rel_path -> content (None if missing) for this change set."""
+        if contents is not None:
+            return contents.get
+
+        def _read_worktree(rel: str) -> Optional[str]:
+            abs_path = os.path.join(self.project_root, rel)
+            if not os.path.exists(abs_path):
+                return None
+            with open(abs_path, "r", encoding="utf-8", errors="ignore") as fh:
+                return fh.read()
+
+        return _read_worktree
+
+    def _filter_files(
+        self, diff: ParsedDiff, content_rev: Optional[str]
+    ) -> Tuple[ParsedDiff, List[Dict[str, str]]]:
+        """Drop binary / generated / vendored / oversized files before any stage."""
+        if not Config.ENABLE_FILE_FILTER:
+            return diff, []
+        paths = diff.paths
+        attrs = self.git.get_attributes(paths, GENERATED_ATTRS, rev=content_rev)
+        if content_rev:
+            sizes = self.git.get_blob_sizes(content_rev, paths)
+            # Only files that pass the metadata checks are read for the content check
+            read_head = lambda rel: self.git.get_file_at(rel, content_rev)
+        else:
+            sizes = {}
+            for rel in paths:
+                abs_path = os.path.join(self.project_root, rel)
+                sizes[rel] = os.path.getsize(abs_path) if os.path.isfile(abs_path) else None
+            read_head = self._content_reader(None)
+        kept, skipped = filter_diff(diff, sizes, attrs, read_head)
+        for item in skipped:
+            log.info(f"Skipped {item['file']}: {item['reason']}")
+        return kept, skipped
+
+    def _ensure_graph(self, rev: str) -> None:
+        """Build an empty knowledge graph from the tree of `rev` (no checkout needed)."""
+        if not self.kg or self.kg.store.get_stats()["total_nodes"] > 0:
+            return
+        files = [
+            f for f in self.git.list_files(rev)
+            if os.path.splitext(f)[1].lower() in MultiLangParser.EXT_TO_LANG
+        ]
+        log.info(f"[KG] Building graph for {len(files)} files from {rev[:12]} objects")
+
+        def _read(paths: List[str]) -> Dict[str, bytes]:
+            contents = self.git.get_files_at(rev, paths)
+            return {p: c.encode("utf-8") for p, c in contents.items() if c is not None}
+
+        self.kg.build_from_contents(files, _read)
+
+    def _lint_context(self, rev: str, files: List[str]) -> Dict[str, str]:
+        """Linter configs in ancestor dirs (plus package siblings) of `files` at `rev`."""
+        dirs = set()
+        for f in files:
+            d = os.path.dirname(f)
+            while d:
+                dirs.add(d)
+                d = os.path.dirname(d)
+        dirs.add("")
+        wanted = [f"{d}/{n}" if d else n for d in sorted(dirs) for n in LINTER_CONFIG_FILES]
+        package_dirs = sorted({
+            os.path.dirname(f) for f in files
+            if os.path.splitext(f)[1] in LINT_PACKAGE_SIBLINGS
+        })
+        wanted += [
+            p for p in self.git.list_dir_files(rev, package_dirs)
+            if os.path.splitext(p)[1] in LINT_PACKAGE_SIBLINGS
+        ]
+        changed = set(files)
+        found = self.git.get_files_at(rev, [p for p in wanted if p not in changed])
+        return {p: c for p, c in found.items() if c is not None}
+
+    def _materialize(self, contents: Dict[str, Optional[str]]) -> str:
+        """Write the given files into a temp dir so linters can run on them."""
+        root = tempfile.mkdtemp(prefix="review_lint_")
+        for rel, content in contents.items():
+            if content is None:
+                continue
+            path = os.path.join(root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(content)
+        return root
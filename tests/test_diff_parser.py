@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diff_parser import ParsedDiff, parse_diff_stream  # noqa: E402
+
+# `git diff-tree -r --root --numstat --patch -z -M --src-prefix=a/ --dst-prefix=b/`
+# of a commit that replaces a.txt by a symlink, deletes b.txt and adds c.txt
+TYPECHANGE_DIFF = (
+    b"1\t1\ta.txt\x000\t1\tb.txt\x001\t0\tc.txt\x00\x00"
+    b"diff --git a/a.txt b/a.txt\n"
+    b"deleted file mode 100644\n"
+    b"index 7898192..0000000\n"
+    b"--- a/a.txt\n"
+    b"+++ /dev/null\n"
+    b"@@ -1 +0,0 @@\n"
+    b"-a\n"
+    b"diff --git a/a.txt b/a.txt\n"
+    b"new file mode 120000\n"
+    b"index 0000000..19acdd8\n"
+    b"--- /dev/null\n"
+    b"+++ b/a.txt\n"
+    b"@@ -0,0 +1 @@\n"
+    b"+b.txt\n"
+    b"\\ No newline at end of file\n"
+    b"diff --git a/b.txt b/b.txt\n"
+    b"deleted file mode 100644\n"
+    b"index 6178079..0000000\n"
+    b"--- a/b.txt\n"
+    b"+++ /dev/null\n"
+    b"@@ -1 +0,0 @@\n"
+    b"-b\n"
+    b"diff --git a/c.txt b/c.txt\n"
+    b"new file mode 100644\n"
+    b"index 0000000..f2ad6c7\n"
+    b"--- /dev/null\n"
+    b"+++ b/c.txt\n"
+    b"@@ -0,0 +1 @@\n"
+    b"+c\n"
+)
+
+
+def test_typechange_keeps_later_files_on_their_own_blocks():
+    parsed = parse_diff_stream(io.BytesIO(TYPECHANGE_DIFF))
+
+    assert [(f.path, f.status) for f in parsed.files] == [("a.txt", "T"), ("b.txt", "D"), ("c.txt", "A")]
+    a, b, c = parsed.files
+    assert [h.lines for h in a.hunks] == [["+b.txt", "\\ No newline at end of file"]]
+    assert a.patch.count("diff --git a/a.txt b/a.txt") == 2
+    assert [h.lines for h in b.hunks] == [["-b"]]
+    assert [h.lines for h in c.hunks] == [["+c"]]
+    assert c.added_lines == {1}
+
+
+def test_blocks_matched_by_quoted_and_spaced_paths():
+    diff = (
+        b"1\t0\tsp ace.txt\x001\t0\tt\xc3\xa4.txt\x00\x00"
+        b"diff --git a/sp ace.txt b/sp ace.txt\n"
+        b"new file mode 100644\n"
+        b"@@ -0,0 +1 @@\n"
+        b"+x\n"
+        b'diff --git "a/t\\303\\244.txt" "b/t\\303\\244.txt"\n'
+        b"new file mode 100644\n"
+        b"@@ -0,0 +1 @@\n"
+        b"+y\n"
+    )
+    parsed = parse_diff_stream(io.BytesIO(diff))
+
+    assert [(f.path, [h.lines for h in f.hunks]) for f in parsed.files] == [
+        ("sp ace.txt", [["+x"]]),
+        ("tä.txt", [["+y"]]),
+    ]
+
+
+def test_typechange_round_trips_through_dict():
+    parsed = parse_diff_stream(io.BytesIO(TYPECHANGE_DIFF))
+
+    assert ParsedDiff.from_dict(parsed.to_dict()).text() == parsed.text()